@@ -0,0 +1,18 @@
+def configured_builds(cfg):
+    """
+    The OpenSSH builds of a config as (name, client_binary, server_binary) tuples:
+    every entry of BUILDS, or the single CLIENT_BINARY/SERVER_BINARY pair when
+    BUILDS is not set (name None, so no build column is written).
+    """
+    if not cfg.BUILDS:
+        return [(None, cfg.CLIENT_BINARY, cfg.SERVER_BINARY)]
+    return [(build["name"], build["client"], build["server"]) for build in cfg.BUILDS]
+
+def build_for_slot(builds, slot):
+    """
+    The build measured in a given slot. Builds rotate every slot (A, B, A, B, ...),
+    so thermal and OS drift during a test affect all of them alike. The client
+    counts only successful connections (exit 0) as slots and the server counts its runs, so
+    both sides pick the same build for the same connection.
+    """
+    return builds[slot % len(builds)]
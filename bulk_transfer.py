@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import datetime
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+import config
+from client_perf import CSV_FIELDS, cleanup_and_exit, debug, parse_perf_output, setup_results_dir
+from results_files import check_csv_header, find_test_pairs, test_label
+
+BULK_FIELDS = CSV_FIELDS + ["rekey_limit", "cipher", "bytes", "rekeys", "mb_per_s", "cycles_per_byte", "transfer_id"]
+
+def generate_output_filename():
+    """Client result file of the bulk variant (the server side gets the same '-bulk' label)."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d")
+    hostname = socket.gethostname()
+    return os.path.join(config.RESULTS_DIR, f"{hostname}-{timestamp}-client-{test_label(config)}.csv")
+
+def transfer_command(rekey_limit, cipher, transfer_id):
+    """
+    ssh command that sinks stdin on the server and then signals server_perf.py,
+    so the server side of every transfer is recorded like a regular iteration.
+    The transfer id is written into the signal file; server_perf.py stores it in
+    its row, so both sides pair up. -v makes ssh log each key exchange, which is
+    how rekeys are counted.
+    """
+    args = [arg for arg in config.CLIENT_ARGS if arg != config.REMOTE_COMMAND]
+    options = ["-v", "-o", f"RekeyLimit={rekey_limit}"]
+    if cipher:
+        options += ["-c", cipher]
+    # Renamed into place, so server_perf.py never sees the signal file before the id is in it
+    signal_file = config.SIGNAL_FILE
+    remote = f"cat > /dev/null; echo {transfer_id} > {signal_file}.id && mv {signal_file}.id {signal_file}; {config.REMOTE_COMMAND}"
+    return [config.CLIENT_BINARY] + options + args + [remote]
+
+def count_key_exchanges(output):
+    """Number of key exchanges in an 'ssh -v' log (the initial one included)."""
+    return output.count("SSH2_MSG_KEXINIT sent")
+
+def run_transfer(megabytes, rekey_limit, cipher, transfer_id):
+    """
+    Streams `megabytes` MiB from /dev/zero through one SSH session. Only ssh runs
+    under perf; dd feeds it through a pipe.
+
+    Returns:
+        dict: perf metrics plus bytes and rekeys, or None on failure.
+    """
+    source = subprocess.Popen(["dd", "if=/dev/zero", "bs=1M", f"count={megabytes}", "status=none"],
+                              stdout=subprocess.PIPE)
+    command = config.PERF_COMMAND + ["--"] + transfer_command(rekey_limit, cipher, transfer_id)
+    debug(f"Running command: dd | {' '.join(command)}")
+    try:
+        result = subprocess.run(command, stdin=source.stdout, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, timeout=600)
+    except subprocess.TimeoutExpired:
+        print("[WARN] Transfer timed out.")
+        source.kill()
+        return None
+    finally:
+        source.stdout.close()
+        source.wait()
+    if result.returncode != 0:
+        print(f"[WARN] Transfer failed with exit code {result.returncode}.")
+        return None
+    metrics = parse_perf_output(result.stderr)
+    metrics["bytes"] = megabytes * 1024 * 1024
+    metrics["rekeys"] = max(count_key_exchanges(result.stderr) - 1, 0)
+    return metrics
+
+def summarize(client_csv, server_csv=None):
+    """
+    Prints MB/s, cycles per byte and the cost of one rekey per RekeyLimit value, on
+    the client and (when the server file is given) the server. Server rows are
+    matched to client rows by transfer_id, so failed transfers and earlier runs
+    appended to either file do not shift the pairs.
+
+    The per-rekey cost is the difference in median cycles to the limit with the
+    fewest rekeys, divided by the difference in rekeys.
+    """
+    with open(client_csv, newline='') as f:
+        client_rows = list(csv.DictReader(f))
+    server_cycles = {}
+    if server_csv:
+        with open(server_csv, newline='') as f:
+            server_cycles = {row["transfer_id"]: int(row["cycles"]) for row in csv.DictReader(f) if row.get("transfer_id")}
+        if not server_cycles:
+            print(f"[WARN] {os.path.basename(server_csv)} has no transfer_id column; server side not summarized.")
+
+    groups = {}
+    for row in client_rows:
+        group = groups.setdefault((row["rekey_limit"], row["cipher"]), {"client": [], "server": [], "rekeys": [], "mb_per_s": [], "bytes": []})
+        group["client"].append(int(row["cycles"]))
+        group["rekeys"].append(int(row["rekeys"]))
+        group["mb_per_s"].append(float(row["mb_per_s"]))
+        group["bytes"].append(int(row["bytes"]))
+        if row.get("transfer_id") in server_cycles:
+            group["server"].append(server_cycles[row["transfer_id"]])
+
+    medians = {}
+    for key, group in groups.items():
+        medians[key] = {side: statistics.median(group[side]) if group[side] else None
+                        for side in ("client", "server", "rekeys", "mb_per_s", "bytes")}
+    print(f"\n[INFO] Bulk transfer summary: {os.path.basename(client_csv)}")
+    for (limit, cipher), m in sorted(medians.items(), key=lambda item: item[1]["rekeys"]):
+        baseline = min((v for (_, c), v in medians.items() if c == cipher), key=lambda v: v["rekeys"])
+        line = f"   • RekeyLimit={limit:<14} cipher={cipher or 'default':<24} {m['mb_per_s']:8.1f} MB/s  rekeys={m['rekeys']:.0f}"
+        for side in ("client", "server"):
+            if m[side] is None:
+                continue
+            line += f"  {side}: {m[side] / m['bytes']:.2f} cycles/byte"
+            if m["rekeys"] > baseline["rekeys"] and baseline[side] is not None:
+                per_rekey = (m[side] - baseline[side]) / (m["rekeys"] - baseline["rekeys"])
+                line += f", {per_rekey:,.0f} cycles/rekey"
+        print(line)
+
+def run_bulk_benchmark(megabytes, cipher):
+    setup_results_dir()
+    output_file = generate_output_filename()
+    file_exists = os.path.isfile(output_file)
+    if file_exists:
+        check_csv_header(output_file, BULK_FIELDS)
+    with open(output_file, "a", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=BULK_FIELDS, extrasaction="ignore")
+        if not file_exists:
+            writer.writeheader()
+
+        for i in range(config.ITERATIONS):
+            rekey_limit = config.BULK_REKEY_LIMITS[i % len(config.BULK_REKEY_LIMITS)]
+            print(f"\n--- Starting Iteration {i}: {megabytes} MiB, RekeyLimit={rekey_limit} ---")
+            time.sleep(2)  # Let server_perf.py restart sshd between transfers
+
+            transfer_id = uuid.uuid4().hex[:16]
+            metrics = run_transfer(megabytes, rekey_limit, cipher, transfer_id)
+            if metrics is None:
+                continue
+            seconds = metrics["elapsed_us"] / 1e6
+            metrics.update(
+                iteration=i, timestamp=datetime.datetime.now().isoformat(), rekey_limit=rekey_limit, cipher=cipher or "",
+                transfer_id=transfer_id,
+                mb_per_s=round(megabytes / seconds, 2) if seconds else 0,
+                cycles_per_byte=round(metrics["cycles"] / metrics["bytes"], 4),
+            )
+            writer.writerow(metrics)
+            f.flush()
+            print(f"{metrics['mb_per_s']} MB/s, {metrics['rekeys']} rekeys, {metrics['cycles_per_byte']} cycles/byte")
+
+    print(f"\n[INFO] Todos os resultados foram adicionados em: {output_file}")
+    return output_file
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-transfer and rekey benchmark: streams data through the session under several RekeyLimit values.")
+    parser.add_argument("--megabytes", type=int, default=None, help="MiB per transfer (default: BULK_TRANSFER_MB).")
+    parser.add_argument("--cipher", default=None, help="Cipher passed to ssh -c (default: negotiated).")
+    parser.add_argument("--summarize", nargs="+", metavar="CSV", help="Only summarize: client CSV [server CSV], or a results directory.")
+    args = parser.parse_args()
+
+    if args.summarize:
+        if os.path.isdir(args.summarize[0]):
+            label = test_label(config) if config.BULK_TRANSFER else test_label(config) + "-bulk"
+            pair = find_test_pairs(args.summarize[0]).get(label)
+            if not pair or not pair["client"]:
+                print(f"Error: no bulk results for {label} in {args.summarize[0]}.")
+                return
+            summarize(pair["client"], pair["server"])
+        else:
+            summarize(*args.summarize[:2])
+        return
+
+    if not config.BULK_TRANSFER:
+        print("Error: set BULK_TRANSFER = True in the config (on both hosts) so results get the '-bulk' label.", file=sys.stderr)
+        sys.exit(1)
+
+    signal.signal(signal.SIGINT, cleanup_and_exit)
+    signal.signal(signal.SIGTERM, cleanup_and_exit)
+    output_file = run_bulk_benchmark(args.megabytes or config.BULK_TRANSFER_MB, args.cipher)
+    summarize(output_file)
+
+if __name__ == "__main__":
+    main()
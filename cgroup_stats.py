@@ -0,0 +1,97 @@
+import os
+import time
+
+# Columns added to the client/server CSV when CGROUP_ACCOUNTING is enabled
+CGROUP_FIELDS = [
+    "cpu_usage_usec", "cpu_user_usec", "cpu_system_usec",
+    "memory_peak_bytes", "io_read_bytes", "io_write_bytes"
+]
+
+CONTROLLERS = ["cpu", "memory", "io"]
+
+def enable_controllers(path):
+    """Enables the cpu/memory/io controllers for the children of a cgroup (one at a time: some may be unavailable)."""
+    for controller in CONTROLLERS:
+        try:
+            with open(os.path.join(path, "cgroup.subtree_control"), "w") as f:
+                f.write(f"+{controller}")
+        except OSError:
+            pass
+
+def read_cgroup_stats(path):
+    """
+    Reads the accounting of a cgroup: cpu.stat, memory.peak (kernel >= 5.19) and
+    io.stat summed over all devices. Missing files leave their columns as None.
+    """
+    stats = dict.fromkeys(CGROUP_FIELDS, None)
+    try:
+        with open(os.path.join(path, "cpu.stat")) as f:
+            cpu = dict(line.split() for line in f if line.strip())
+        stats["cpu_usage_usec"] = int(cpu["usage_usec"])
+        stats["cpu_user_usec"] = int(cpu["user_usec"])
+        stats["cpu_system_usec"] = int(cpu["system_usec"])
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        with open(os.path.join(path, "memory.peak")) as f:
+            stats["memory_peak_bytes"] = int(f.read())
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(path, "io.stat")) as f:
+            read_bytes = write_bytes = 0
+            for line in f:
+                fields = dict(item.split("=") for item in line.split()[1:])
+                read_bytes += int(fields.get("rbytes", 0))
+                write_bytes += int(fields.get("wbytes", 0))
+        stats["io_read_bytes"], stats["io_write_bytes"] = read_bytes, write_bytes
+    except (OSError, ValueError):
+        pass
+    return stats
+
+class IterationCgroup:
+    """
+    A transient cgroup v2 for one measured process tree. The process joins it
+    through `preexec_fn` (before exec), so every child it forks is accounted too;
+    perf itself is included when the cgroup wraps the perf command. The stats are
+    read and the cgroup removed when the context exits, after the process ended.
+    """
+
+    def __init__(self, parent, name):
+        self.parent = parent
+        self.path = os.path.join(parent, name)
+        self.stats = dict.fromkeys(CGROUP_FIELDS, None)
+
+    def create(self):
+        """Creates the cgroup (and, on first use, the parent with the controllers enabled)."""
+        if not os.path.isdir(self.parent):
+            os.makedirs(self.parent)
+            enable_controllers(os.path.dirname(self.parent))
+            enable_controllers(self.parent)
+        os.makedirs(self.path, exist_ok=True)
+
+    def preexec_fn(self):
+        """Runs in the forked child: moves it into the cgroup before exec."""
+        with open(os.path.join(self.path, "cgroup.procs"), "w") as f:
+            f.write("0")
+
+    def release(self):
+        """Reads the final stats and removes the cgroup."""
+        self.stats = read_cgroup_stats(self.path)
+        # The cgroup can only be removed once the kernel has released its last process
+        for _ in range(50):
+            try:
+                os.rmdir(self.path)
+                break
+            except OSError:
+                time.sleep(0.01)
+        else:
+            print(f"[WARN] Could not remove cgroup {self.path}")
+
+    def __enter__(self):
+        self.create()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
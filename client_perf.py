@@ -1,14 +1,34 @@
 #!/usr/bin/python3
 
+import atexit
 import subprocess
 import csv
 import sys
 import signal
 import os
+import shutil
 import datetime
 import socket
 import time
+import statistics
+from contextlib import ExitStack
 import config
+from builds import build_for_slot, configured_builds
+from cgroup_stats import CGROUP_FIELDS, IterationCgroup
+from energy import ENERGY_FIELDS, EnergyMeter, detect_backend
+from env_fingerprint import fingerprint_run
+from hdr_histogram import HdrRecorder
+from metrics_exporter import start_exporter
+from netem import apply_profile
+from results_files import check_csv_header, test_label
+from syscall_profile import SYSCALL_FIELDS, SyscallProfile, SyscallTrace
+from wire_stats import WIRE_FIELDS, WireCapture
+
+CSV_FIELDS = [
+    "iteration", "timestamp", "cycles", "instructions", "cache-misses", "branch-misses",
+    "page-faults", "context-switches", "cpu-migrations", "elapsed_us"
+]
+HDR_METRICS = ["cycles", "instructions", "elapsed_us"]
 
 def debug(msg):
     """Prints a debug message if DEBUG_MODE is True."""
@@ -24,13 +44,66 @@ def generate_output_filename():
     # Nome de arquivo só com data (YYYYMMDD), hostname e TEST_NAME, para facilitar append
     timestamp = datetime.datetime.now().strftime("%Y%m%d")
     hostname = socket.gethostname()
-    return os.path.join(config.RESULTS_DIR, f"{hostname}-{timestamp}-client-{config.TEST_NAME}.csv")
-
-def execute_perf_on_client(command):
+    # Each network profile / bulk variant is a separate result set of the same test
+    test_name = test_label(config)
+    return os.path.join(config.RESULTS_DIR, f"{hostname}-{timestamp}-client-{test_name}.csv")
+
+def csv_fields():
+    """Returns the client CSV columns: the perf metrics plus those of each enabled collector."""
+    fields = list(CSV_FIELDS)
+    if config.BUILDS:
+        fields.append("build")
+    if config.NETEM_PROFILE:
+        fields.append("netem_profile")
+    if config.WIRE_CAPTURE:
+        fields += WIRE_FIELDS
+    if config.CGROUP_ACCOUNTING:
+        fields += CGROUP_FIELDS
+    if config.ENERGY_BACKEND:
+        fields += ENERGY_FIELDS
+    if config.SYSCALL_PROFILE:
+        fields += SYSCALL_FIELDS
+    return fields
+
+def iteration_collectors(syscall_profile=None):
+    """
+    Returns the optional collectors wrapped around each measured iteration. Each one
+    is a context manager exposing a `stats` dict that is merged into the CSV row.
+    """
+    collectors = []
+    if config.WIRE_CAPTURE:
+        collectors.append(WireCapture(config.WIRE_CAPTURE_INTERFACE, config.CLIENT_SSH_HOST, config.CLIENT_SSH_PORT))
+    if config.CGROUP_ACCOUNTING:
+        collectors.append(IterationCgroup(config.CGROUP_PARENT, f"client-{os.getpid()}"))
+    if config.ENERGY_BACKEND:
+        collectors.append(EnergyMeter(detect_backend(config.ENERGY_BACKEND)))
+    if syscall_profile:
+        collectors.append(SyscallTrace(syscall_profile))
+    return collectors
+
+def child_setup(collectors):
+    """Combines the hooks of the collectors that must run inside the measured child before exec (e.g. joining a cgroup)."""
+    hooks = [c.preexec_fn for c in collectors if hasattr(c, "preexec_fn")]
+    if not hooks:
+        return None
+
+    def setup():
+        for hook in hooks:
+            hook()
+    return setup
+
+def wrap_command(command, collectors):
+    """Lets the collectors that must run around the measured command (e.g. a syscall tracer) wrap it."""
+    for collector in collectors:
+        if hasattr(collector, "wrap"):
+            command = collector.wrap(command)
+    return command
+
+def execute_perf_on_client(command, preexec_fn=None):
     """Executes a command under 'perf stat' and returns the output and return code."""
     debug(f"Running command: {' '.join(command)}")
     try:
-        result = subprocess.run(command, stderr=subprocess.PIPE, text=True, timeout=10)
+        result = subprocess.run(command, stderr=subprocess.PIPE, text=True, timeout=10, preexec_fn=preexec_fn)
         debug(f"Perf stderr output:\n{result.stderr}")
         return result.stderr, result.returncode
     except subprocess.TimeoutExpired:
@@ -41,10 +114,18 @@ def parse_perf_output(output):
     """Parses the stderr output from 'perf stat' to extract metrics."""
     metrics = {
         "cycles": 0, "instructions": 0, "cache-misses": 0,
-        "branch-misses": 0, "page-faults": 0, "context-switches": 0, "cpu-migrations": 0
+        "branch-misses": 0, "page-faults": 0, "context-switches": 0, "cpu-migrations": 0,
+        "elapsed_us": 0
     }
     for line in output.split('\n'):
         parts = line.strip().split()
+        if "seconds time elapsed" in line:
+            # Wall-clock time of the measured command, i.e. the connection latency
+            try:
+                metrics["elapsed_us"] = round(float(parts[0].replace(',', '.')) * 1e6)
+            except ValueError:
+                pass
+            continue
         if len(parts) > 1:
             value_str = parts[0].replace(',', '').replace('.', '')
             key = parts[1]
@@ -62,20 +143,46 @@ def cleanup_and_exit(signum, frame):
 
 def run_client_benchmark():
     """Main function to run the client-side performance benchmark."""
+    if config.WIRE_CAPTURE and not shutil.which("tcpdump"):
+        print("Error: WIRE_CAPTURE requires tcpdump.", file=sys.stderr)
+        sys.exit(1)
     setup_results_dir()
     output_file = generate_output_filename()
 
-    client_connection_command = [config.CLIENT_BINARY] + config.CLIENT_ARGS
-    full_perf_command = config.PERF_COMMAND + ["--"] + client_connection_command
-
+    builds = configured_builds(config)
+    if len(builds) > 1:
+        print(f"[INFO] Interleaving builds: {', '.join(name for name, _, _ in builds)}")
+    if config.ENV_FINGERPRINT:
+        # Once per run and build (cached in '<result file>.env.json'), never inside the measured loop
+        for build, client_binary, _ in builds:
+            fingerprint = fingerprint_run(output_file, "client", client_binary, config.PERF_COMMAND, build)
+            debug(f"Environment fingerprint {fingerprint['fingerprint_id']}: {fingerprint['cpu_model']}, "
+                  f"{fingerprint['measured_mhz']} MHz, {fingerprint['openssh_version']}")
+
+    exporter = start_exporter("client")
+    if config.NETEM_PROFILE:
+        apply_profile(config.NETEM_PROFILE, config.NETEM_INTERFACE, config.CLIENT_SSH_HOST)
+    latencies_ms = {}
+    energies_uj = []
+    slot = 0
+
+    recorder = None
+    if config.HDR_HISTOGRAMS:
+        recorder = HdrRecorder(output_file, HDR_METRICS, config.HDR_SIGNIFICANT_DIGITS, config.HDR_SNAPSHOT_EVERY)
+        atexit.register(recorder.save)  # last partial snapshot, also on CTRL+C
+    syscall_profile = None
+    if config.SYSCALL_PROFILE:
+        syscall_profile = SyscallProfile(output_file)
+        atexit.register(syscall_profile.save)
+
+    fields = csv_fields()
     file_exists = os.path.isfile(output_file)
+    if file_exists:
+        check_csv_header(output_file, fields)
     with open(output_file, "a", newline='') as f:
-        writer = csv.writer(f)
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
         if not file_exists:
-            writer.writerow([
-                "iteration", "timestamp", "cycles", "instructions", "cache-misses", "branch-misses",
-                "page-faults", "context-switches", "cpu-migrations"
-            ])
+            writer.writeheader()
         
         for i in range(config.ITERATIONS):
             print(f"\n--- Starting Iteration {i} ---")
@@ -83,23 +190,55 @@ def run_client_benchmark():
             # Pausa para garantir o servidor pronto entre iterações
             time.sleep(2)
 
+            # The slot only advances on successful connections (exit 0), the only ones that signal the server loop
+            build, client_binary, _ = build_for_slot(builds, slot)
+            full_perf_command = config.PERF_COMMAND + ["--", client_binary] + config.CLIENT_ARGS
+
             print("Running perf on the client to connect and signal the server...")
-            perf_output, return_code = execute_perf_on_client(full_perf_command)
+            collectors = iteration_collectors(syscall_profile)
+            with ExitStack() as stack:
+                for collector in collectors:
+                    stack.enter_context(collector)
+                perf_output, return_code = execute_perf_on_client(wrap_command(full_perf_command, collectors),
+                                                                  child_setup(collectors))
 
             if "Timeout" in perf_output:
                 print(f"Client measurement timed out. Retrying...")
+                if exporter:
+                    exporter.record_timeout()
                 continue
 
+            if return_code != 0 and exporter:
+                exporter.record_failure()
+
             print("Client measurement captured!")
             metrics = parse_perf_output(perf_output)
             metrics["iteration"] = i
-            writer.writerow([
-                metrics["iteration"], datetime.datetime.now().isoformat(), metrics["cycles"], metrics["instructions"], metrics["cache-misses"],
-                metrics["branch-misses"], metrics["page-faults"], metrics["context-switches"], metrics["cpu-migrations"]
-            ])
+            metrics["timestamp"] = datetime.datetime.now().isoformat()
+            metrics["netem_profile"] = config.NETEM_PROFILE
+            metrics["build"] = build
+            latencies_ms.setdefault(build, []).append(metrics["elapsed_us"] / 1000)
+            for collector in collectors:
+                metrics.update(collector.stats)
+            if metrics.get("energy_pkg_uj") is not None:
+                energies_uj.append(metrics["energy_pkg_uj"])
+            writer.writerow(metrics)
+            if return_code == 0:
+                slot += 1
+            if recorder:
+                recorder.record(metrics)
+            if exporter:
+                exporter.observe(metrics)
 
             print(f"--- Finished Iteration {i} ---")
 
+    for build, values in latencies_ms.items():
+        median_ms = statistics.median(values)
+        label = f" build '{build}'" if build else ""
+        print(f"[INFO] Profile '{config.NETEM_PROFILE or 'none'}'{label}: median connection latency {median_ms:.1f} ms, "
+              f"{1000 / median_ms if median_ms else 0:.2f} handshakes/s per connection slot")
+    if energies_uj:
+        print(f"[INFO] {config.TEST_NAME}: median package energy {statistics.median(energies_uj) / 1e6:.4f} J per handshake")
     print(f"\n[INFO] Todos os resultados foram adicionados em: {output_file}")
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import math
+import os
+import sys
+import numpy as np
+import config
+from results_files import find_test_pairs, parse_result_filename
+
+COMPARE_FIELDS = ["test", "role", "n_a", "n_b", "median_a", "median_b", "delta_pct",
+                  "ci_low_pct", "ci_high_pct", "p_value", "verdict"]
+
+# Metric columns of pqc_results (database/pqc_results_schema.sql); --metric is checked
+# against this list before it is interpolated into the SQL
+DB_METRICS = [
+    "cycles", "instructions", "cache_misses", "branch_misses", "page_faults", "context_switches", "cpu_migrations",
+    "elapsed_us",
+    "bytes_sent", "bytes_received", "packets_sent", "packets_received", "round_trips",
+    "startup_us", "startup_cycles", "startup_instructions", "connection_cycles", "connection_instructions",
+    "listener_cycles", "listener_instructions", "monitor_cycles", "monitor_instructions",
+    "preauth_cycles", "preauth_instructions", "session_cycles", "session_instructions",
+    "cpu_usage_usec", "cpu_user_usec", "cpu_system_usec", "memory_peak_bytes", "io_read_bytes", "io_write_bytes",
+    "energy_pkg_uj", "energy_dram_uj", "energy_window_us",
+    "syscalls", "syscall_errors", "syscall_time_us",
+    "measured_mhz", "cycles_ns",
+]
+
+def read_metric(path, metric, build=None):
+    """
+    Reads one metric column of a result CSV (raw or normalized header) as a float array,
+    keeping only the rows of `build` when given (interleaved runs, see builds.py).
+    Returns None when the file has no such column (e.g. elapsed_us in a server CSV).
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip().replace("-", "_") for h in next(reader)]
+        if metric not in header or (build is not None and "build" not in header):
+            return None
+        column = header.index(metric)
+        build_column = header.index("build") if build is not None else None
+        values = [row[column] for row in reader
+                  if len(row) > column and row[column].strip()
+                  and (build_column is None or (len(row) > build_column and row[build_column] == build))]
+    return np.array(values, dtype=np.float64)
+
+def load_csv_run(base_dir, metric, roles, build=None):
+    """Loads {(test, role): values} from the result files below base_dir, optionally of one build."""
+    samples = {}
+    for test, pair in find_test_pairs(base_dir).items():
+        for role in roles:
+            if not pair[role]:
+                continue
+            values = read_metric(pair[role], metric, build)
+            if values is None:
+                column = f"'{metric}'" if build is None else f"'{metric}' or 'build'"
+                print(f"[WARN] {os.path.basename(pair[role])} has no {column} column; skipping {test} ({role}).")
+                continue
+            samples[(test, role)] = values
+    return samples
+
+def load_db_run(cursor, test_run_id, metric, roles, build=None):
+    """
+    Loads {(test, role): values} of one test_run_id from pqc_results; the test comes from
+    source_file. With `build`, only the rows imported with that openssh_branch are kept.
+    """
+    samples = {}
+    query = (f"SELECT source_file, role, {metric} FROM pqc_results "
+             f"WHERE test_run_id = %s AND {metric} IS NOT NULL")
+    params = [test_run_id]
+    if build is not None:
+        query += " AND openssh_branch = %s"
+        params.append(build)
+    cursor.execute(query + " ORDER BY source_file, iteration", tuple(params))
+    grouped = {}
+    for source_file, role, value in cursor.fetchall():
+        info = parse_result_filename(source_file)
+        if info and role in roles:
+            grouped.setdefault((info["test"], role), []).append(value)
+    for key, values in grouped.items():
+        samples[key] = np.array(values, dtype=np.float64)
+    return samples
+
+def bootstrap_delta_ci(a, b, n_boot, confidence, rng):
+    """
+    Percentile bootstrap CI of the relative median difference (b - a) / a, in %.
+    All resamples are drawn at once as (n_boot, n) index matrices and reduced
+    with a single np.median(axis=1) per sample, so there is no Python loop.
+    Resamples whose baseline median is 0 have no relative delta and are dropped;
+    if none is left the CI is (nan, nan).
+    """
+    medians_a = np.median(a[rng.integers(0, len(a), size=(n_boot, len(a)))], axis=1)
+    medians_b = np.median(b[rng.integers(0, len(b), size=(n_boot, len(b)))], axis=1)
+    valid = medians_a != 0
+    if not valid.any():
+        return math.nan, math.nan
+    deltas = 100.0 * (medians_b[valid] - medians_a[valid]) / medians_a[valid]
+    tail = (1.0 - confidence) / 2.0
+    low, high = np.quantile(deltas, [tail, 1.0 - tail])
+    return float(low), float(high)
+
+def rankdata(values):
+    """Average ranks (1-based) with ties sharing their mean rank; also returns the tie group sizes."""
+    sorter = np.argsort(values, kind="mergesort")
+    ordered = values[sorter]
+    starts = np.r_[True, ordered[1:] != ordered[:-1]]
+    dense = np.cumsum(starts)[np.argsort(sorter, kind="mergesort")]
+    bounds = np.r_[np.nonzero(starts)[0], len(values)]
+    return 0.5 * (bounds[dense] + bounds[dense - 1] + 1), np.diff(bounds)
+
+def mann_whitney_p(a, b):
+    """Two-sided Mann-Whitney U test p-value (normal approximation with tie correction)."""
+    n_a, n_b = len(a), len(b)
+    ranks, ties = rankdata(np.concatenate([a, b]))
+    u = ranks[:n_a].sum() - n_a * (n_a + 1) / 2.0
+    n = n_a + n_b
+    variance = n_a * n_b / 12.0 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n_a * n_b / 2.0) - 0.5) / math.sqrt(variance)
+    return math.erfc(max(z, 0.0) / math.sqrt(2.0))
+
+def compare(samples_a, samples_b, threshold, alpha, n_boot, confidence, seed):
+    """
+    Compares every (test, role) present in both runs. A regression is a median
+    increase above `threshold` % that is also significant (p < alpha); an equally
+    large significant decrease is reported as an improvement. A baseline median
+    of 0 (common for cpu-migrations) has no relative delta: the row keeps its
+    p-value with empty delta/CI fields and the verdict "zero-baseline".
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for key in sorted(set(samples_a) & set(samples_b)):
+        a, b = samples_a[key], samples_b[key]
+        if len(a) < 2 or len(b) < 2:
+            continue
+        median_a, median_b = float(np.median(a)), float(np.median(b))
+        p_value = mann_whitney_p(a, b)
+        if median_a == 0:
+            rows.append({
+                "test": key[0], "role": key[1], "n_a": len(a), "n_b": len(b),
+                "median_a": median_a, "median_b": median_b, "delta_pct": "",
+                "ci_low_pct": "", "ci_high_pct": "", "p_value": p_value, "verdict": "zero-baseline",
+            })
+            continue
+        delta = 100.0 * (median_b - median_a) / median_a
+        low, high = bootstrap_delta_ci(a, b, n_boot, confidence, rng)
+        verdict = "ok"
+        if p_value < alpha and delta > threshold:
+            verdict = "REGRESSION"
+        elif p_value < alpha and delta < -threshold:
+            verdict = "improvement"
+        rows.append({
+            "test": key[0], "role": key[1], "n_a": len(a), "n_b": len(b),
+            "median_a": median_a, "median_b": median_b, "delta_pct": round(delta, 3),
+            "ci_low_pct": round(low, 3), "ci_high_pct": round(high, 3),
+            "p_value": p_value, "verdict": verdict,
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="A/B regression gate: compare two runs per test with bootstrap CIs and Mann-Whitney tests.")
+    parser.add_argument("run_a", help="Baseline: results directory, or test_run_id with --db.")
+    parser.add_argument("run_b", help="Candidate: results directory, or test_run_id with --db.")
+    parser.add_argument("--metric", default="cycles", help="Metric to compare (default: cycles).")
+    parser.add_argument("--role", choices=["client", "server", "both"], default="both")
+    parser.add_argument("--threshold", type=float, default=config.REGRESSION_THRESHOLD_PCT, help="Median increase (%%) that fails the gate.")
+    parser.add_argument("--alpha", type=float, default=config.REGRESSION_ALPHA, help="Significance level of the Mann-Whitney test.")
+    parser.add_argument("--bootstrap", type=int, default=2000, help="Bootstrap resamples (default: 2000).")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Bootstrap CI level (default: 0.95).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible CIs.")
+    parser.add_argument("--build-a", help="Only compare the rows of this build in run A (CSV 'build' column, or openssh_branch with --db).")
+    parser.add_argument("--build-b", help="Only compare the rows of this build in run B (same column as --build-a).")
+    parser.add_argument("--csv", help="Also write the comparison to this CSV.")
+    parser.add_argument("--db", action="store_true", help="Read runs from pqc_results by test_run_id.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="pqc_framework")
+    args = parser.parse_args()
+
+    metric = args.metric.replace("-", "_")
+    roles = ["client", "server"] if args.role == "both" else [args.role]
+    if args.db:
+        if metric not in DB_METRICS:
+            print(f"Error: unknown metric '{metric}' for pqc_results. Choose one of: {', '.join(DB_METRICS)}")
+            sys.exit(2)
+        import mysql.connector
+        cnx = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                      password=args.password, database=args.database)
+        cursor = cnx.cursor()
+        samples_a = load_db_run(cursor, args.run_a, metric, roles, args.build_a)
+        samples_b = load_db_run(cursor, args.run_b, metric, roles, args.build_b)
+        cnx.close()
+    else:
+        for run in (args.run_a, args.run_b):
+            if not os.path.isdir(run):
+                print(f"Error: results directory not found: {run}")
+                sys.exit(2)
+        samples_a = load_csv_run(args.run_a, metric, roles, args.build_a)
+        samples_b = load_csv_run(args.run_b, metric, roles, args.build_b)
+
+    rows = compare(samples_a, samples_b, args.threshold, args.alpha, args.bootstrap, args.confidence, args.seed)
+    if not rows:
+        print("Error: the two runs have no tests in common.")
+        sys.exit(2)
+
+    label_a = args.run_a if args.build_a is None else f"{args.run_a}[{args.build_a}]"
+    label_b = args.run_b if args.build_b is None else f"{args.run_b}[{args.build_b}]"
+    print(f"[INFO] {metric}: {label_a} → {label_b} (threshold {args.threshold}%, alpha {args.alpha})")
+    for row in rows:
+        if row["verdict"] == "zero-baseline":
+            print(f"   • {row['test']:<30} {row['role']:<6} median 0 → {row['median_b']:g}  "
+                  f"p={row['p_value']:.2g}  {row['verdict']}")
+            continue
+        print(f"   • {row['test']:<30} {row['role']:<6} {row['delta_pct']:+7.2f}% "
+              f"[{row['ci_low_pct']:+.2f}, {row['ci_high_pct']:+.2f}]  p={row['p_value']:.2g}  {row['verdict']}")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COMPARE_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"[INFO] Comparison written to {args.csv}")
+
+    regressions = [row for row in rows if row["verdict"] == "REGRESSION"]
+    if regressions:
+        print(f"[ERROR] {len(regressions)} regression(s) above {args.threshold}%.")
+        sys.exit(1)
+    print("[INFO] No regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -38,12 +38,99 @@ CLIENT_ARGS = [
 
 TEST_NAME = "Test-H-Rsa-4096"
 
+# --- Metrics Exporter Settings ---
+METRICS_EXPORTER = None        # None (disabled), "http" or "textfile"
+METRICS_HTTP_PORT = 9464       # Port of the /metrics endpoint in "http" mode
+METRICS_TEXTFILE_DIR = "/var/lib/node_exporter/textfile_collector"
+METRICS_INTERVAL = 5           # Seconds between textfile updates
+METRICS_WINDOW = 100           # Iterations in the rolling statistics window
+
+# --- Wire Capture Settings ---
+WIRE_CAPTURE = False           # Capture each client connection with tcpdump: bytes, packets and round trips
+WIRE_CAPTURE_INTERFACE = "any" # Interface passed to tcpdump -i
+
+# --- Network Emulation Settings ---
+# Named profile from netem.py (e.g. "metro", "intercontinental", "lossy-mobile") applied
+# with tc netem by client_perf.py for the duration of the run; None leaves the link unshaped.
+# Set the same value on the server so both result files carry the same test label.
+NETEM_PROFILE = None
+NETEM_INTERFACE = None         # None shapes the interface routing to CLIENT_SSH_HOST (ip route get)
+
+# --- Bulk Transfer Settings ---
+# With BULK_TRANSFER = True, bulk_transfer.py replaces client_perf.py: each iteration streams
+# BULK_TRANSFER_MB from /dev/zero to /dev/null through the session, cycling through the
+# client-side RekeyLimit values below. Result files get the "-bulk" test label on both sides.
+BULK_TRANSFER = False
+BULK_TRANSFER_MB = 256
+BULK_REKEY_LIMITS = ["default none", "64M", "16M"]
+
+# --- Server Phase Settings ---
+SERVER_PHASE_SPLIT = False     # Split server counters into startup (exec -> listen) and connection (accept -> exit) columns
+SERVER_PHASE_INTERVAL_MS = 10  # perf stat -I interval; phase boundaries are exact to half an interval
+
+# --- Server Process Breakdown Settings ---
+# Record the server with 'perf record -s' and attribute cycles/instructions to the listener,
+# privsep monitor, pre-auth child and post-auth session (mutually exclusive with SERVER_PHASE_SPLIT)
+SERVER_PROCESS_BREAKDOWN = False
+
+# --- Cgroup Accounting Settings ---
+CGROUP_ACCOUNTING = False                  # Run each measured process tree in a transient cgroup v2 (CPU, memory.peak, I/O columns)
+CGROUP_PARENT = "/sys/fs/cgroup/pqc-bench" # Parent cgroup of the per-iteration cgroups (created on first use, requires root)
+
+# --- Energy Settings ---
+ENERGY_BACKEND = None          # None (disabled), "powercap", "perf" (power/energy-pkg/) or "auto"; skipped on hosts without RAPL
+
+# --- Regression Gate Settings ---
+REGRESSION_THRESHOLD_PCT = 5.0   # compare_runs.py fails when a median grows more than this (%)...
+REGRESSION_ALPHA = 0.01          # ...and the Mann-Whitney p-value is below this
+
+# --- Build Comparison Settings ---
+# None measures CLIENT_BINARY/SERVER_BINARY. A list of builds interleaves them iteration by
+# iteration within the test (A, B, A, B, ...) and tags every row with the build name, e.g.:
+# BUILDS = [
+#     {"name": "oqs-9.9", "client": "/usr/bin/ssh-pqc", "server": "/usr/sbin/sshd-pqc"},
+#     {"name": "oqs-main", "client": "/opt/oqs-main/bin/ssh", "server": "/opt/oqs-main/sbin/sshd"},
+# ]
+BUILDS = None
+
+# --- HDR Histogram Settings ---
+HDR_HISTOGRAMS = False         # Also keep constant-memory histograms of cycles/instructions/latency in '<result file>.hdr.json'
+HDR_SIGNIFICANT_DIGITS = 3     # Relative precision of the histogram buckets (3 = 0.1%)
+HDR_SNAPSHOT_EVERY = 100       # Iterations between snapshots (and at the end of the run)
+
+# --- Soak Settings ---
+SOAK_DURATION_H = 8            # Active duration of soak.py (time the harness was down does not count)
+SOAK_WINDOW_MIN = 5            # Window of the soak statistics and trend fit
+SOAK_PAUSE_S = 1               # Pause between soak connections (client)
+SOAK_SAMPLE_S = 10             # Interval between listener samples (server)
+SOAK_ALPHA = 0.01              # Significance level of the growth trend...
+SOAK_GROWTH_PCT = 5.0          # ...and minimum fitted growth over the run (%) to flag a metric
+
+# --- Syscall Profile Settings ---
+SYSCALL_PROFILE = False        # Trace each iteration with 'perf trace -s' (per-syscall profile in '<result file>.syscalls.csv'); adds tracing overhead to the counters
+
+# --- Environment Fingerprint Settings ---
+ENV_FINGERPRINT = True         # Capture CPU/microcode/governor/kernel/OpenSSH/liboqs/perf events once per run in '<result file>.env.json'
+
+# --- Server Loop Settings ---
+SERVER_FLUSH_EVERY = 1         # Server rows between flushes of the result CSV; 1 keeps live_dashboard.py current and loses nothing on a crash
+
 # --- Graph Settings ---
 DEFAULT_SINGLE_AXIS_PLOT_OUTPUT = "performance_plot.html"
 DEFAULT_DUAL_AXIS_PLOT_OUTPUT = "dual_axis_plot.html"
+DEFAULT_DISTRIBUTION_PLOT_OUTPUT = "distribution_plot.html"
 PLOT_WIDTH = 1200
 PLOT_HEIGHT = 800
 PLOT_BG_COLOR = "#f3f3f3"
 TITLE_FONT_SIZE = "18pt"
 AXIS_LABEL_FONT_SIZE = "12pt"
 MAJOR_LABEL_FONT_SIZE = "10pt"
+# Series longer than this are LTTB-downsampled in the HTML output (full resolution on zoom)
+PLOT_DOWNSAMPLE_THRESHOLD = 5000
+
+# --- Live Dashboard Settings ---
+LIVE_POLL_MS = 1000            # How often the dashboard tails the result files
+LIVE_WINDOW = 50               # Rows in the rolling median/variance window
+LIVE_BASELINE = 100            # First rows used as the drift baseline
+LIVE_DRIFT_THRESHOLD = 0.05    # Flag drift when the rolling median moves more than 5% from the baseline
+LIVE_ROLLOVER = 5000           # Points kept in the browser per file
@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import datetime
+import os
+import re
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+import config
+from client_perf import debug, parse_perf_output, setup_results_dir
+from results_files import test_label
+
+REUSE_FIELDS = ["iteration", "timestamp", "mode", "elapsed_us", "cycles", "instructions", "master_cycles"]
+
+def ssh_base_args():
+    """CLIENT_ARGS without the remote command (the harness's REMOTE_COMMAND signals server_perf.py)."""
+    return [arg for arg in config.CLIENT_ARGS if arg != config.REMOTE_COMMAND]
+
+def generate_output_filename():
+    """Same name as the client result file with a '.reuse.csv' suffix, so it is never taken for one."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d")
+    hostname = socket.gethostname()
+    return os.path.join(config.RESULTS_DIR, f"{hostname}-{timestamp}-client-{test_label(config)}.reuse.csv")
+
+def run_measured(ssh_command):
+    """Runs an ssh command under config.PERF_COMMAND and returns its parsed metrics, or None on failure."""
+    command = config.PERF_COMMAND + ["--"] + ssh_command
+    debug(f"Running command: {' '.join(command)}")
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=30)
+    except subprocess.TimeoutExpired:
+        print("[WARN] Command timed out.")
+        return None
+    if result.returncode != 0:
+        print(f"[WARN] Command failed with exit code {result.returncode}.")
+        debug(result.stderr)
+        return None
+    return parse_perf_output(result.stderr)
+
+class MasterConnection:
+    """
+    An OpenSSH ControlMaster connection used by the multiplexed mode. The master
+    is started (and its handshake measured) on enter and closed with '-O exit',
+    which also removes the temporary directory of its control socket.
+    """
+
+    def __init__(self, base_args):
+        self.base_args = base_args
+        self.socket_dir = tempfile.mkdtemp(prefix="pqc-mux-")
+        self.socket_path = os.path.join(self.socket_dir, "master.sock")
+        self.pid = None
+        self.setup_metrics = None
+
+    def control(self, *args):
+        """Runs an ssh control command ('-O check', '-O exit') against the master."""
+        command = [config.CLIENT_BINARY, "-o", f"ControlPath={self.socket_path}"] + list(args) + self.base_args
+        return subprocess.run(command, capture_output=True, text=True)
+
+    def client_args(self):
+        return ["-o", f"ControlPath={self.socket_path}", "-o", "ControlMaster=no"] + self.base_args
+
+    def close(self):
+        self.control("-O", "exit")
+        shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+    def __enter__(self):
+        master = ["-o", f"ControlPath={self.socket_path}", "-o", "ControlMaster=yes",
+                  "-o", "ControlPersist=yes", "-f", "-N"] + self.base_args
+        try:
+            self.setup_metrics = run_measured([config.CLIENT_BINARY] + master)
+            check = self.control("-O", "check")
+        except BaseException:
+            self.close()
+            raise
+        match = re.search(r"pid=(\d+)", check.stderr)
+        if self.setup_metrics is None or not match:
+            self.close()
+            raise RuntimeError(f"could not start the master connection: {check.stderr.strip()}")
+        self.pid = int(match.group(1))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def count_during(self):
+        """Starts 'perf stat -p' on the master; returns the process to pass to stop_counting()."""
+        command = config.PERF_COMMAND + ["-p", str(self.pid)]
+        return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    @staticmethod
+    def stop_counting(perf_process):
+        perf_process.send_signal(signal.SIGINT)
+        _, stderr_output = perf_process.communicate(timeout=10)
+        return parse_perf_output(stderr_output)
+
+def run_mode(mode, commands, remote_command, writer):
+    """
+    Runs `commands` executions of remote_command in one mode and returns its summary:
+      - fresh: one full connection (handshake + authentication) per command,
+      - multiplexed: one session per command over an existing ControlMaster connection.
+    In multiplexed mode the master's own CPU during the loop is counted with
+    'perf stat -p' and spread evenly over the commands (master_cycles).
+    """
+    base_args = ssh_base_args()
+    rows = []
+    master_cycles = 0
+    with (MasterConnection(base_args) if mode == "multiplexed" else nullcontext()) as master:
+        if master:
+            print(f"[INFO] Master connection up (pid {master.pid}), "
+                  f"handshake {master.setup_metrics['cycles']:,} cycles / {master.setup_metrics['elapsed_us'] / 1000:.1f} ms")
+            perf_master = master.count_during()
+            time.sleep(0.5)  # let perf attach before the first session
+        ssh_command = [config.CLIENT_BINARY] + (master.client_args() if master else base_args) + [remote_command]
+
+        start = time.perf_counter()
+        for i in range(commands):
+            metrics = run_measured(ssh_command)
+            if metrics is None:
+                continue
+            metrics.update(iteration=i, timestamp=datetime.datetime.now().isoformat(), mode=mode)
+            rows.append(metrics)
+        wall = time.perf_counter() - start
+
+        if master:
+            master_cycles = MasterConnection.stop_counting(perf_master)["cycles"] / max(len(rows), 1)
+
+    for metrics in rows:
+        metrics["master_cycles"] = round(master_cycles) if master else ""
+        writer.writerow(metrics)
+
+    if not rows:
+        return None
+    return {
+        "mode": mode,
+        "commands": len(rows),
+        "latency_ms": statistics.median(r["elapsed_us"] for r in rows) / 1000,
+        "cycles": statistics.median(r["cycles"] for r in rows) + master_cycles,
+        "throughput": len(rows) / wall,
+        "setup_cycles": master.setup_metrics["cycles"] if master else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fresh SSH connections with ControlMaster-multiplexed sessions for the current config.")
+    parser.add_argument("--commands", type=int, default=100, help="Remote commands per mode (default: 100).")
+    parser.add_argument("--remote-command", default="true", help="Workload run on the server for each command (default: true).")
+    parser.add_argument("--mode", choices=["both", "fresh", "multiplexed"], default="both")
+    args = parser.parse_args()
+
+    print("[INFO] The sshd under test must be running standalone (not under server_perf.py, which stops after one connection).")
+    setup_results_dir()
+    output_file = generate_output_filename()
+    modes = ["fresh", "multiplexed"] if args.mode == "both" else [args.mode]
+
+    summaries = []
+    with open(output_file, "w", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REUSE_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for mode in modes:
+            print(f"\n--- {test_label(config)}: {args.commands} commands, {mode} ---")
+            try:
+                summary = run_mode(mode, args.commands, args.remote_command, writer)
+            except RuntimeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                continue
+            if summary:
+                summaries.append(summary)
+
+    print(f"\n[INFO] {test_label(config)}")
+    for s in summaries:
+        print(f"   • {s['mode']:<12} latency {s['latency_ms']:8.1f} ms/command   CPU {s['cycles']:>14,.0f} cycles/command   "
+              f"{s['throughput']:6.2f} commands/s")
+    if len(summaries) == 2:
+        fresh, mux = summaries
+        saved = fresh["cycles"] - mux["cycles"]
+        print(f"   • Multiplexing saves {saved:,.0f} cycles and {fresh['latency_ms'] - mux['latency_ms']:.1f} ms per command; "
+              f"the master handshake ({mux['setup_cycles']:,} cycles) pays off after "
+              f"{mux['setup_cycles'] / saved if saved > 0 else float('inf'):.1f} commands.")
+    print(f"\n[INFO] Per-command results written to: {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import config
+from results_files import test_label
+
+TRACE_FIELDS = ["library", "function", "calls", "avg_us", "total_us", "p50_us", "p99_us", "max_us"]
+
+# Crypto entry points traced in each object (wildcards are expanded with 'bpftrace -l')
+PROBE_PATTERNS = {
+    "ssh": ["sshkey_sign", "sshkey_verify", "kex_kem_*_keypair", "kex_kem_*_enc", "kex_kem_*_dec",
+            "kex_c25519_*", "kex_derive_keys"],
+    "liboqs": ["OQS_SIG_keypair", "OQS_SIG_sign", "OQS_SIG_verify",
+               "OQS_KEM_keypair", "OQS_KEM_encaps", "OQS_KEM_decaps"],
+    "libcrypto": ["EVP_DigestSign", "EVP_DigestVerify", "EVP_PKEY_sign", "EVP_PKEY_verify",
+                  "EVP_PKEY_derive", "EVP_PKEY_keygen"],
+}
+
+LIBRARY_RE = {
+    "liboqs": re.compile(r"\s(/\S*liboqs\.so[.\d]*)\s"),
+    "libcrypto": re.compile(r"\s(/\S*libcrypto\.so[.\d]*)\s"),
+}
+
+def trace_targets(binary):
+    """
+    The objects to probe for a binary: the binary itself plus the liboqs and
+    libcrypto it loads (from ldd). liboqs is often linked statically into the
+    OQS OpenSSH build, in which case its symbols are looked up in the binary.
+    """
+    targets = {"ssh": binary}
+    result = subprocess.run(["ldd", binary], capture_output=True, text=True)
+    for library, pattern in LIBRARY_RE.items():
+        match = pattern.search(result.stdout)
+        targets[library] = match.group(1) if match else binary
+    return targets
+
+def available_probes(path, patterns):
+    """Expands probe patterns against one object with 'bpftrace -l'; symbols that do not exist are dropped."""
+    functions = []
+    for pattern in patterns:
+        result = subprocess.run(["bpftrace", "-l", f"uprobe:{path}:{pattern}"], capture_output=True, text=True)
+        for line in result.stdout.splitlines():
+            function = line.strip().rsplit(":", 1)[-1]
+            if function and function not in functions:
+                functions.append(function)
+    return functions
+
+def comm_filter(binaries):
+    """
+    bpftrace predicate matching the processes of the traced binaries by comm (the
+    basename, truncated by the kernel to 15 characters). The probes on the shared
+    libcrypto/liboqs fire in every process of the host that calls them.
+    """
+    names = dict.fromkeys(os.path.basename(binary)[:15] for binary in binaries)
+    return " || ".join(f'comm == "{name}"' for name in names)
+
+def build_script(probes, binaries):
+    """
+    Generates the bpftrace program: one uprobe/uretprobe pair per function, the
+    entry filtered to the processes of `binaries`. Entry timestamps are keyed by
+    thread and probe, and latencies are aggregated in kernel maps (a log2
+    histogram and count/avg/total per function), so nothing is sent to user
+    space until the tracer stops.
+    """
+    predicate = comm_filter(binaries)
+    lines = []
+    for index, (library, path, function) in enumerate(probes):
+        key = f'"{library}:{function}"'
+        lines.append(f"uprobe:{path}:{function} /{predicate}/ {{ @start[tid, {index}] = nsecs; }}")
+        lines.append(
+            f"uretprobe:{path}:{function} /@start[tid, {index}]/ {{ "
+            f"$us = (nsecs - @start[tid, {index}]) / 1000; "
+            f"@hist[{key}] = hist($us); @stats[{key}] = stats($us); @max[{key}] = max($us); "
+            f"delete(@start[tid, {index}]); }}"
+        )
+    lines.append("END { clear(@start); }")
+    return "\n".join(lines)
+
+def histogram_percentile(buckets, fraction):
+    """Approximates a percentile from log2 histogram buckets (linear within a bucket)."""
+    total = sum(b["count"] for b in buckets)
+    if not total:
+        return None
+    target = fraction * total
+    seen = 0
+    for bucket in buckets:
+        low = bucket.get("min", 0)
+        high = bucket.get("max", low * 2 or 1)
+        if seen + bucket["count"] >= target:
+            return low + (high - low) * (target - seen) / bucket["count"]
+        seen += bucket["count"]
+    return buckets[-1].get("max")
+
+def parse_bpftrace_json(output):
+    """Collects the @hist, @stats and @max maps printed by 'bpftrace -f json' at exit, by probe key."""
+    maps = {}
+    for line in output.splitlines():
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if message.get("type") in ("hist", "stats", "map"):
+            for name, values in message["data"].items():
+                maps[name.lstrip("@")] = values
+    rows = []
+    for key, stats in sorted(maps.get("stats", {}).items()):
+        library, function = key.split(":", 1)
+        buckets = maps.get("hist", {}).get(key, [])
+        p50, p99 = histogram_percentile(buckets, 0.50), histogram_percentile(buckets, 0.99)
+        maximum = maps.get("max", {}).get(key)
+        if maximum is not None:
+            # Buckets are powers of two; the exact maximum bounds the interpolation
+            p50, p99 = (min(p, maximum) if p is not None else None for p in (p50, p99))
+        rows.append({
+            "library": library, "function": function, "calls": stats["count"],
+            "avg_us": stats["average"], "total_us": stats["total"],
+            "p50_us": round(p50, 1) if p50 is not None else None,
+            "p99_us": round(p99, 1) if p99 is not None else None,
+            "max_us": maximum,
+        })
+    return rows, maps.get("hist", {})
+
+def generate_output_filename(role):
+    """Auxiliary output next to the result file of the same role/test ('.crypto.csv')."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d")
+    return os.path.join(config.RESULTS_DIR, f"{socket.gethostname()}-{timestamp}-{role}-{test_label(config)}.crypto.csv")
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace the latency of crypto functions inside ssh/sshd with bpftrace uprobes.")
+    parser.add_argument("--role", choices=["client", "server"], required=True, help="Trace CLIENT_BINARY or SERVER_BINARY of the current config.")
+    parser.add_argument("--binary", action="append", default=[], help="Additional binary to trace (e.g. sshd-session).")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds (default: until CTRL+C).")
+    args = parser.parse_args()
+
+    binaries = [config.CLIENT_BINARY if args.role == "client" else config.SERVER_BINARY] + args.binary
+    probes = []
+    for binary in binaries:
+        for library, path in trace_targets(binary).items():
+            for function in available_probes(path, PROBE_PATTERNS[library]):
+                if not any(p[1] == path and p[2] == function for p in probes):
+                    probes.append((library, path, function))
+    if not probes:
+        print("Error: no traceable crypto functions found (missing symbols, or bpftrace not available).", file=sys.stderr)
+        sys.exit(1)
+    for library, path, function in probes:
+        print(f"   • {library}: {function} ({path})")
+
+    tracer = subprocess.Popen(["bpftrace", "-f", "json", "-e", build_script(probes, binaries)],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    print(f"[INFO] Tracing {len(probes)} functions for {test_label(config)} ({args.role}). Run the benchmark now; CTRL+C to stop.")
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            tracer.wait()
+    except KeyboardInterrupt:
+        pass
+    tracer.send_signal(signal.SIGINT)
+    output, errors = tracer.communicate()
+    if tracer.returncode not in (0, -signal.SIGINT) and not output:
+        print(f"Error: bpftrace failed: {errors.strip()}", file=sys.stderr)
+        sys.exit(1)
+
+    rows, histograms = parse_bpftrace_json(output)
+    output_file = generate_output_filename(args.role)
+    os.makedirs(config.RESULTS_DIR, exist_ok=True)
+    with open(output_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TRACE_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(output_file.replace(".crypto.csv", ".crypto-hist.json"), "w") as f:
+        json.dump(histograms, f, indent=2)
+
+    for row in rows:
+        print(f"   • {row['library']}:{row['function']:<28} calls={row['calls']:<6} avg={row['avg_us']} µs  p99≈{row['p99_us']} µs")
+    print(f"\n[INFO] Crypto latency summary written to: {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Import a microbench.py CSV into MariaDB (table: pqc_microbench).
+- One file per run (--file)
+- Idempotent via SHA256 row_hash (UNIQUE in DB)
+"""
+
+import argparse
+import csv
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import mysql.connector
+from dateutil import parser as dtparser
+
+
+CSV_COLUMNS = [
+    "timestamp", "host", "test_name", "kind", "algorithm", "operation", "backend",
+    "cores", "ops", "seconds", "ops_per_sec", "cycles_per_op", "instructions_per_op"
+]
+
+INSERT_COLUMNS = [
+    "test_run_id", "source_file", "ts", "host", "test_name", "kind", "algorithm", "operation", "backend",
+    "cores", "ops", "seconds", "ops_per_sec", "cycles_per_op", "instructions_per_op", "row_hash"
+]
+
+INSERT_SQL = f"""
+INSERT IGNORE INTO pqc_microbench
+({", ".join(INSERT_COLUMNS)})
+VALUES
+({", ".join(f"%({c})s" for c in INSERT_COLUMNS)})
+"""
+
+def parse_int(v: Optional[str]) -> Optional[int]:
+    """Parse integer or return None."""
+    if v is None or str(v).strip() == "":
+        return None
+    return int(str(v).strip())
+
+def parse_float(v: Optional[str]) -> Optional[float]:
+    """Parse float or return None."""
+    if v is None or str(v).strip() == "":
+        return None
+    return float(str(v).strip())
+
+def build_row_hash(payload: Dict[str, Any]) -> str:
+    """Build a stable SHA256 hash of normalized content."""
+    parts = [f"{k}={'' if payload[k] is None else payload[k]}" for k in sorted(payload.keys())]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+def main():
+    ap = argparse.ArgumentParser(description="Import a microbench.py CSV into MariaDB (pqc_microbench).")
+    ap.add_argument("--host", required=True)
+    ap.add_argument("--port", type=int, default=3306)
+    ap.add_argument("--user", required=True)
+    ap.add_argument("--password", required=True)
+    ap.add_argument("--db", required=True)
+    ap.add_argument("--file", required=True, help="Path to the microbenchmark CSV")
+    ap.add_argument("--test-run-id", required=True, help="Identifier of the run the microbenchmarks belong to")
+    ap.add_argument("--dry-run", action="store_true", help="Parse/validate only; do not write to DB")
+    args = ap.parse_args()
+
+    csv_path = Path(args.file)
+    if not csv_path.is_file():
+        raise SystemExit(f"[FATAL] CSV not found: {csv_path}")
+
+    cnx = None
+    if not args.dry_run:
+        print("[DB] Connecting…")
+        cnx = mysql.connector.connect(
+            host=args.host, port=args.port, user=args.user,
+            password=args.password, database=args.db, autocommit=False
+        )
+    cur = cnx.cursor() if cnx else None
+
+    inserted = ignored = errors = total = 0
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as fh:
+        reader = csv.DictReader(fh)
+        if not set(CSV_COLUMNS).issubset(reader.fieldnames or []):
+            raise SystemExit(f"[FATAL] Unexpected header: {reader.fieldnames}")
+        try:
+            for file_line, raw in enumerate(reader, start=1):
+                total += 1
+                try:
+                    row = {
+                        "test_run_id": args.test_run_id,
+                        "source_file": csv_path.name,
+                        "ts": dtparser.parse(raw["timestamp"]) if raw["timestamp"] else None,
+                        "host": raw["host"],
+                        "test_name": raw["test_name"],
+                        "kind": raw["kind"],
+                        "algorithm": raw["algorithm"],
+                        "operation": raw["operation"],
+                        "backend": raw["backend"],
+                        "cores": parse_int(raw["cores"]),
+                        "ops": parse_int(raw["ops"]),
+                        "seconds": parse_float(raw["seconds"]),
+                        "ops_per_sec": parse_float(raw["ops_per_sec"]),
+                        "cycles_per_op": parse_int(raw["cycles_per_op"]),
+                        "instructions_per_op": parse_int(raw["instructions_per_op"]),
+                    }
+                    payload = dict(row, ts=row["ts"].isoformat(timespec="microseconds") if row["ts"] else "")
+                    row["row_hash"] = build_row_hash(payload)
+                    if cur:
+                        cur.execute(INSERT_SQL, row)
+                        if cur.rowcount == 1:
+                            inserted += 1
+                        else:
+                            ignored += 1
+                except Exception as e:
+                    errors += 1
+                    print(f"[ERROR] {csv_path.name}:{file_line}: {e}")
+            if cnx:
+                cnx.commit()
+                print("[DB] COMMIT done.")
+        except Exception as e:
+            print(f"[FATAL] Exception during import, rolling back: {e}")
+            if cnx:
+                cnx.rollback()
+            raise
+        finally:
+            if cnx:
+                cur.close()
+                cnx.close()
+
+    print(f"[SUMMARY] file={csv_path.name} total={total} inserted={inserted} ignored={ignored} errors={errors}")
+    if args.dry_run:
+        print("[NOTE] DRY-RUN mode: no data written to DB.")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,13 @@ Import a single PQC benchmarking CSV file into MariaDB (table: pqc_results).
 - Robust logging and diagnostics
 - Handles UTF-8 with BOM (utf-8-sig)
 - Auto-detects client/server layout (validated against --role)
+- Accepts raw (cache-misses) and normalized (cache_misses) headers
+- Imports optional collector columns (e.g. wire size, server phases and processes, cgroup accounting, energy, syscalls) when present
+- Records the netem network profile of the run (CSV column or --netem-profile)
+- Uses the build column of interleaved multi-build runs as openssh_branch
+- Imports the environment fingerprints of the '.env.json' next to the CSV (pqc_env_fingerprint),
+  links each row to the one of its build in effect at its timestamp, and stores the measured frequency
+  used to derive cycles_ns with the row
 - Computes iteration for server (iteration = file_line - 1)
 - Idempotent via SHA256 row_hash (UNIQUE in DB)
 """
@@ -14,9 +21,10 @@ Import a single PQC benchmarking CSV file into MariaDB (table: pqc_results).
 import argparse
 import csv
 import hashlib
+import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 import mysql.connector
 from dateutil import parser as dtparser
@@ -31,21 +39,49 @@ SERVER_COLUMNS = [
     "branch-misses", "page-faults", "context-switches", "cpu-migrations"
 ]
 
-INSERT_SQL = """
+# Metric columns written only when an optional collector was enabled (same name in CSV and DB)
+OPTIONAL_COLUMNS = [
+    "elapsed_us",
+    "bytes_sent", "bytes_received", "packets_sent", "packets_received", "round_trips",
+    "startup_us", "startup_cycles", "startup_instructions", "connection_cycles", "connection_instructions",
+    "listener_cycles", "listener_instructions", "monitor_cycles", "monitor_instructions",
+    "preauth_cycles", "preauth_instructions", "session_cycles", "session_instructions",
+    "cpu_usage_usec", "cpu_user_usec", "cpu_system_usec", "memory_peak_bytes", "io_read_bytes", "io_write_bytes",
+    "energy_pkg_uj", "energy_dram_uj", "energy_window_us",
+    "syscalls", "syscall_errors", "syscall_time_us"
+]
+
+INSERT_COLUMNS = [
+    "test_run_id", "role", "source_file", "file_line", "ts", "iteration",
+    "test_type", "openssh_branch", "netem_profile",
+    "key_type_primary", "key_size_primary", "key_type_secondary", "key_size_secondary",
+    "cycles", "instructions", "cache_misses", "branch_misses", "page_faults", "context_switches", "cpu_migrations",
+] + OPTIONAL_COLUMNS + ["fingerprint_id", "measured_mhz", "cycles_ns", "row_hash"]
+
+INSERT_SQL = f"""
 INSERT IGNORE INTO pqc_results
-(test_run_id, role, source_file, file_line, ts, iteration,
- test_type, openssh_branch,
- key_type_primary, key_size_primary, key_type_secondary, key_size_secondary,
- cycles, instructions, cache_misses, branch_misses, page_faults, context_switches, cpu_migrations,
- row_hash)
+({", ".join(INSERT_COLUMNS)})
+VALUES
+({", ".join(f"%({c})s" for c in INSERT_COLUMNS)})
+"""
+
+FINGERPRINT_COLUMNS = [
+    "fingerprint_id", "host", "role", "captured_at", "cpu_model", "microcode", "logical_cpus", "physical_cores",
+    "governor", "max_mhz", "measured_mhz", "kernel", "binary_path", "openssh_version", "liboqs_version",
+    "openssl_version", "perf_events",
+]
+
+INSERT_FINGERPRINT_SQL = f"""
+INSERT IGNORE INTO pqc_env_fingerprint
+({", ".join(FINGERPRINT_COLUMNS)})
 VALUES
-(%(test_run_id)s, %(role)s, %(source_file)s, %(file_line)s, %(ts)s, %(iteration)s,
- %(test_type)s, %(openssh_branch)s,
- %(key_type_primary)s, %(key_size_primary)s, %(key_type_secondary)s, %(key_size_secondary)s,
- %(cycles)s, %(instructions)s, %(cache_misses)s, %(branch_misses)s, %(page_faults)s, %(context_switches)s, %(cpu_migrations)s,
- %(row_hash)s)
+({", ".join(f"%({c})s" for c in FINGERPRINT_COLUMNS)})
 """
 
+def normalize_column(name: str) -> str:
+    """Raw CSVs use hyphens (cache-misses), normalized ones underscores (cache_misses)."""
+    return name.strip().replace("-", "_")
+
 def parse_int(v: Optional[str]) -> Optional[int]:
     """Parse integer or return None."""
     if v is None:
@@ -69,6 +105,35 @@ def build_row_hash(payload: Dict[str, Any]) -> str:
     parts = [f"{k}={'' if payload[k] is None else payload[k]}" for k in sorted(payload.keys())]
     return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
 
+def load_fingerprints(csv_path: Path) -> List[Dict[str, Any]]:
+    """Fingerprints of the '.env.json' next to the CSV (oldest first), or [] when there is none."""
+    env_path = csv_path.with_name(csv_path.name[:-len(".csv")] + ".env.json")
+    if not env_path.is_file():
+        return []
+    with env_path.open("r", encoding="utf-8") as fh:
+        fingerprints = json.load(fh)
+    for fp in fingerprints:
+        fp["captured_at"] = parse_ts_iso_to_dt6(fp.get("captured_at"))
+        fp["binary_path"] = fp.get("binary")
+        fp["perf_events"] = json.dumps(fp.get("perf_events"))
+    return sorted(fingerprints, key=lambda fp: fp["captured_at"] or datetime.min)
+
+def fingerprint_at(fingerprints: List[Dict[str, Any]], ts: Optional[datetime],
+                   build: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    The fingerprint in effect at a row timestamp: among those of the row's build,
+    the last one captured before it (else the first). Files written before
+    fingerprints recorded their build fall back to all of them.
+    """
+    fingerprints = [fp for fp in fingerprints if fp.get("build") == build] or fingerprints
+    if not fingerprints:
+        return None
+    current = fingerprints[0]
+    for fp in fingerprints:
+        if ts and fp["captured_at"] and fp["captured_at"] <= ts:
+            current = fp
+    return current
+
 def print_preview(label: str, row: Dict[str, Any]):
     """Pretty-print a small subset for diagnostics."""
     keys = ["file_line","iteration","ts","cycles","instructions","cache_misses","branch_misses","page_faults","context_switches","cpu_migrations"]
@@ -89,11 +154,12 @@ def main():
     ap.add_argument("--role", required=True, choices=["client", "server"], help="Measurement side")
     ap.add_argument("--test-run-id", required=True, help="Identifier for this run/batch")
     ap.add_argument("--test-type", required=True, choices=["classical", "pqc", "hybrid"], help="Test type")
-    ap.add_argument("--openssh-branch", required=True, help="OpenSSH branch/version label")
+    ap.add_argument("--openssh-branch", required=True, help="OpenSSH branch/version label (overridden by the build column, if any)")
     ap.add_argument("--key-type-primary", required=True, help="Primary key type (e.g., RSA, ECDSA, ML-KEM)")
     ap.add_argument("--key-size-primary", required=True, help="Primary key size (e.g., 2048, 3072, 44)")
     ap.add_argument("--key-type-secondary", default=None, help="Secondary key type (for hybrid)")
     ap.add_argument("--key-size-secondary", default=None, help="Secondary key size (for hybrid)")
+    ap.add_argument("--netem-profile", default=None, help="Network profile of the run (default: netem_profile column of the CSV, if any)")
     # Behavior
     ap.add_argument("--dry-run", action="store_true", help="Parse/validate only; do not write to DB")
     ap.add_argument("--progress-every", type=int, default=200, help="Print progress every N rows")
@@ -123,16 +189,27 @@ def main():
     cur.execute("SELECT DATABASE()")
     print(f"[DB] Current database: {cur.fetchone()[0]}")
 
+    fingerprints = load_fingerprints(csv_path)
+    if fingerprints:
+        print(f"[ENV] {len(fingerprints)} environment fingerprint(s): {[fp['fingerprint_id'] for fp in fingerprints]}")
+        if not args.dry_run:
+            for fp in fingerprints:
+                cur.execute(INSERT_FINGERPRINT_SQL, {c: fp.get(c) for c in FINGERPRINT_COLUMNS})
+
     inserted = ignored = errors = total = 0
 
     # Open CSV with utf-8-sig to strip BOM if present
     with csv_path.open("r", encoding="utf-8-sig", newline="") as fh:
         reader = csv.DictReader(fh)
-        header = [h.strip() for h in reader.fieldnames] if reader.fieldnames else []
+        header = [normalize_column(h) for h in reader.fieldnames] if reader.fieldnames else []
+        reader.fieldnames = header
         print(f"[CSV] Header: {header}")
 
         role = args.role.lower()
-        required = set(CLIENT_COLUMNS if role == "client" else SERVER_COLUMNS)
+        required = {normalize_column(c) for c in (CLIENT_COLUMNS if role == "client" else SERVER_COLUMNS)}
+        optional = [c for c in OPTIONAL_COLUMNS if c in header]
+        if optional:
+            print(f"[CSV] Optional columns: {optional}")
 
         # Layout detection (allow any order; require all names)
         if not required.issubset(set(header)):
@@ -153,20 +230,31 @@ def main():
                         "ts": ts,
                         "iteration": None,  # set below
                         "test_type": args.test_type.lower(),
-                        "openssh_branch": args.openssh_branch,
+                        # Interleaved multi-build runs tag each row with its build
+                        "openssh_branch": raw.get("build") or args.openssh_branch,
+                        "netem_profile": args.netem_profile or raw.get("netem_profile") or None,
                         "key_type_primary": args.key_type_primary,
                         "key_size_primary": parse_int(args.key_size_primary),
                         "key_type_secondary": args.key_type_secondary,
                         "key_size_secondary": parse_int(args.key_size_secondary) if args.key_size_secondary else None,
                         "cycles": parse_int(raw.get("cycles")),
                         "instructions": parse_int(raw.get("instructions")),
-                        "cache_misses": parse_int(raw.get("cache-misses")),
-                        "branch_misses": parse_int(raw.get("branch-misses")),
-                        "page_faults": parse_int(raw.get("page-faults")),
-                        "context_switches": parse_int(raw.get("context-switches")),
-                        "cpu_migrations": parse_int(raw.get("cpu-migrations")),
+                        "cache_misses": parse_int(raw.get("cache_misses")),
+                        "branch_misses": parse_int(raw.get("branch_misses")),
+                        "page_faults": parse_int(raw.get("page_faults")),
+                        "context_switches": parse_int(raw.get("context_switches")),
+                        "cpu_migrations": parse_int(raw.get("cpu_migrations")),
                         "row_hash": None,
                     }
+                    for column in OPTIONAL_COLUMNS:
+                        row[column] = parse_int(raw.get(column))
+
+                    fp = fingerprint_at(fingerprints, ts, raw.get("build") or None)
+                    row["fingerprint_id"] = fp["fingerprint_id"] if fp else None
+                    # Stored per row: pqc_env_fingerprint keeps the frequency of the first capture only
+                    row["measured_mhz"] = fp.get("measured_mhz") if fp else None
+                    row["cycles_ns"] = (round(row["cycles"] * 1000 / row["measured_mhz"])
+                                        if row["measured_mhz"] and row["cycles"] is not None else None)
 
                     if role == "client":
                         row["iteration"] = parse_int(raw.get("iteration"))
@@ -194,6 +282,10 @@ def main():
                         "context_switches": row["context_switches"],
                         "cpu_migrations": row["cpu_migrations"],
                     }
+                    # Optional metrics only enter the hash when present, so rows of
+                    # files without them keep the hash they had before these columns existed.
+                    # fingerprint_id/measured_mhz/cycles_ns are derived from the .env.json and never hashed.
+                    payload.update({c: row[c] for c in OPTIONAL_COLUMNS + ["netem_profile"] if row[c] is not None})
                     row["row_hash"] = build_row_hash(payload)
 
                     if total <= 3 or args.verbose:
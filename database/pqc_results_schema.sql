@@ -25,6 +25,7 @@ CREATE TABLE IF NOT EXISTS pqc_results (
   -- Test characterization
   test_type ENUM('classical','pqc','hybrid') NOT NULL,  -- test type: classical, PQC, or hybrid
   openssh_branch VARCHAR(64) NOT NULL,           -- OpenSSH branch/version label (e.g., LibOQS-Debian12, Debian13, OpenSSH_9.9p1)
+  netem_profile VARCHAR(32) NULL,                -- Network profile applied with tc netem (NULL = unshaped)
 
   -- Key material (hybrid uses both primary and secondary; otherwise secondary is NULL)
   key_type_primary  VARCHAR(16) NOT NULL,        -- e.g., RSA | ECDSA | ML-KEM
@@ -50,6 +51,56 @@ CREATE TABLE IF NOT EXISTS pqc_results (
   context_switches INT UNSIGNED NULL,
   cpu_migrations INT UNSIGNED NULL,
 
+  -- Connection latency measured by perf (client CSV); NULL in older files
+  elapsed_us BIGINT UNSIGNED NULL,
+
+  -- Handshake wire size (client CSV, WIRE_CAPTURE); NULL when not captured
+  bytes_sent BIGINT UNSIGNED NULL,               -- TCP payload bytes client -> server
+  bytes_received BIGINT UNSIGNED NULL,           -- TCP payload bytes server -> client
+  packets_sent INT UNSIGNED NULL,
+  packets_received INT UNSIGNED NULL,
+  round_trips SMALLINT UNSIGNED NULL,            -- client flights answered by a server flight
+
+  -- Server phase split (server CSV, SERVER_PHASE_SPLIT); NULL when not split
+  startup_us BIGINT UNSIGNED NULL,               -- exec -> listening socket
+  startup_cycles BIGINT UNSIGNED NULL,           -- one-time cost: config parse, host key load
+  startup_instructions BIGINT UNSIGNED NULL,
+  connection_cycles BIGINT UNSIGNED NULL,        -- per-connection cost: accept -> session exit
+  connection_instructions BIGINT UNSIGNED NULL,
+
+  -- Server process breakdown (server CSV, SERVER_PROCESS_BREAKDOWN); NULL when not recorded
+  listener_cycles BIGINT UNSIGNED NULL,          -- sshd -D listener
+  listener_instructions BIGINT UNSIGNED NULL,
+  monitor_cycles BIGINT UNSIGNED NULL,           -- per-connection privsep monitor (KEX signing happens here)
+  monitor_instructions BIGINT UNSIGNED NULL,
+  preauth_cycles BIGINT UNSIGNED NULL,           -- unprivileged pre-auth child (transport, KEX math)
+  preauth_instructions BIGINT UNSIGNED NULL,
+  session_cycles BIGINT UNSIGNED NULL,           -- post-auth session child and the commands it runs
+  session_instructions BIGINT UNSIGNED NULL,
+
+  -- Cgroup v2 accounting of the measured process tree (CGROUP_ACCOUNTING); NULL when disabled
+  cpu_usage_usec BIGINT UNSIGNED NULL,           -- cpu.stat
+  cpu_user_usec BIGINT UNSIGNED NULL,
+  cpu_system_usec BIGINT UNSIGNED NULL,
+  memory_peak_bytes BIGINT UNSIGNED NULL,        -- memory.peak
+  io_read_bytes BIGINT UNSIGNED NULL,            -- io.stat, all devices
+  io_write_bytes BIGINT UNSIGNED NULL,
+
+  -- RAPL energy during the measurement window (ENERGY_BACKEND); host-wide, NULL without RAPL
+  energy_pkg_uj BIGINT UNSIGNED NULL,            -- package domains, microjoules
+  energy_dram_uj BIGINT UNSIGNED NULL,           -- DRAM domains, when exposed
+  energy_window_us BIGINT UNSIGNED NULL,         -- length of the window, to subtract idle power
+
+  -- perf trace -s totals of the iteration (SYSCALL_PROFILE); per-syscall detail in the .syscalls.csv
+  syscalls INT UNSIGNED NULL,
+  syscall_errors INT UNSIGNED NULL,
+  syscall_time_us BIGINT UNSIGNED NULL,
+
+  -- Environment of the run (pqc_env_fingerprint); cycles converted with the frequency measured for it
+  fingerprint_id CHAR(16) NULL,
+  measured_mhz DOUBLE NULL,
+  cycles_ns BIGINT UNSIGNED NULL,
+
   -- Integrity / idempotency
   row_hash CHAR(64) NOT NULL,                    -- SHA256 of normalized row content
 
@@ -62,6 +113,100 @@ CREATE TABLE IF NOT EXISTS pqc_results (
   KEY idx_run_role_iter (test_run_id, role, iteration),
   KEY idx_type (test_type),
   KEY idx_branch (openssh_branch),
+  KEY idx_netem (netem_profile),
+  KEY idx_fingerprint (fingerprint_id),
   KEY idx_keylabel (key_label),
   KEY idx_ts (ts)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Migration for tables created before the optional metric columns existed
+ALTER TABLE pqc_results
+  ADD COLUMN IF NOT EXISTS netem_profile VARCHAR(32) NULL AFTER openssh_branch,
+  ADD COLUMN IF NOT EXISTS elapsed_us BIGINT UNSIGNED NULL AFTER cpu_migrations,
+  ADD COLUMN IF NOT EXISTS bytes_sent BIGINT UNSIGNED NULL AFTER elapsed_us,
+  ADD COLUMN IF NOT EXISTS bytes_received BIGINT UNSIGNED NULL AFTER bytes_sent,
+  ADD COLUMN IF NOT EXISTS packets_sent INT UNSIGNED NULL AFTER bytes_received,
+  ADD COLUMN IF NOT EXISTS packets_received INT UNSIGNED NULL AFTER packets_sent,
+  ADD COLUMN IF NOT EXISTS round_trips SMALLINT UNSIGNED NULL AFTER packets_received,
+  ADD COLUMN IF NOT EXISTS startup_us BIGINT UNSIGNED NULL AFTER round_trips,
+  ADD COLUMN IF NOT EXISTS startup_cycles BIGINT UNSIGNED NULL AFTER startup_us,
+  ADD COLUMN IF NOT EXISTS startup_instructions BIGINT UNSIGNED NULL AFTER startup_cycles,
+  ADD COLUMN IF NOT EXISTS connection_cycles BIGINT UNSIGNED NULL AFTER startup_instructions,
+  ADD COLUMN IF NOT EXISTS connection_instructions BIGINT UNSIGNED NULL AFTER connection_cycles,
+  ADD COLUMN IF NOT EXISTS listener_cycles BIGINT UNSIGNED NULL AFTER connection_instructions,
+  ADD COLUMN IF NOT EXISTS listener_instructions BIGINT UNSIGNED NULL AFTER listener_cycles,
+  ADD COLUMN IF NOT EXISTS monitor_cycles BIGINT UNSIGNED NULL AFTER listener_instructions,
+  ADD COLUMN IF NOT EXISTS monitor_instructions BIGINT UNSIGNED NULL AFTER monitor_cycles,
+  ADD COLUMN IF NOT EXISTS preauth_cycles BIGINT UNSIGNED NULL AFTER monitor_instructions,
+  ADD COLUMN IF NOT EXISTS preauth_instructions BIGINT UNSIGNED NULL AFTER preauth_cycles,
+  ADD COLUMN IF NOT EXISTS session_cycles BIGINT UNSIGNED NULL AFTER preauth_instructions,
+  ADD COLUMN IF NOT EXISTS session_instructions BIGINT UNSIGNED NULL AFTER session_cycles,
+  ADD COLUMN IF NOT EXISTS cpu_usage_usec BIGINT UNSIGNED NULL AFTER session_instructions,
+  ADD COLUMN IF NOT EXISTS cpu_user_usec BIGINT UNSIGNED NULL AFTER cpu_usage_usec,
+  ADD COLUMN IF NOT EXISTS cpu_system_usec BIGINT UNSIGNED NULL AFTER cpu_user_usec,
+  ADD COLUMN IF NOT EXISTS memory_peak_bytes BIGINT UNSIGNED NULL AFTER cpu_system_usec,
+  ADD COLUMN IF NOT EXISTS io_read_bytes BIGINT UNSIGNED NULL AFTER memory_peak_bytes,
+  ADD COLUMN IF NOT EXISTS io_write_bytes BIGINT UNSIGNED NULL AFTER io_read_bytes,
+  ADD COLUMN IF NOT EXISTS energy_pkg_uj BIGINT UNSIGNED NULL AFTER io_write_bytes,
+  ADD COLUMN IF NOT EXISTS energy_dram_uj BIGINT UNSIGNED NULL AFTER energy_pkg_uj,
+  ADD COLUMN IF NOT EXISTS energy_window_us BIGINT UNSIGNED NULL AFTER energy_dram_uj,
+  ADD COLUMN IF NOT EXISTS syscalls INT UNSIGNED NULL AFTER energy_window_us,
+  ADD COLUMN IF NOT EXISTS syscall_errors INT UNSIGNED NULL AFTER syscalls,
+  ADD COLUMN IF NOT EXISTS syscall_time_us BIGINT UNSIGNED NULL AFTER syscall_errors,
+  ADD COLUMN IF NOT EXISTS fingerprint_id CHAR(16) NULL AFTER syscall_time_us,
+  ADD COLUMN IF NOT EXISTS measured_mhz DOUBLE NULL AFTER fingerprint_id,
+  ADD COLUMN IF NOT EXISTS cycles_ns BIGINT UNSIGNED NULL AFTER measured_mhz,
+  ADD INDEX IF NOT EXISTS idx_fingerprint (fingerprint_id);
+
+-- Primitive-level microbenchmarks (microbench.py): one row per test, primitive, operation and core count.
+-- Joined to pqc_results through test_run_id and the TEST_NAME contained in source_file.
+CREATE TABLE IF NOT EXISTS pqc_microbench (
+  id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  test_run_id VARCHAR(64) NOT NULL,
+  source_file VARCHAR(255) NOT NULL,
+  ts DATETIME(6) NULL,
+  host VARCHAR(64) NOT NULL,
+  test_name VARCHAR(64) NOT NULL,                -- TEST_NAME of the config the primitive belongs to
+  kind ENUM('signature','kem') NOT NULL,
+  algorithm VARCHAR(64) NOT NULL,                -- e.g., ML-DSA-44 | RSA-3072 | ML-KEM-768 | X25519
+  operation ENUM('keygen','sign','verify','encaps','decaps') NOT NULL,
+  backend VARCHAR(16) NOT NULL,                  -- openssl | liboqs
+  cores SMALLINT UNSIGNED NOT NULL,              -- 1 = pinned single core (with cycle counts)
+  ops BIGINT UNSIGNED NOT NULL,
+  seconds DOUBLE NOT NULL,
+  ops_per_sec DOUBLE NOT NULL,
+  cycles_per_op BIGINT UNSIGNED NULL,            -- single-core rows only
+  instructions_per_op BIGINT UNSIGNED NULL,
+  row_hash CHAR(64) NOT NULL,
+
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_rowhash (row_hash),
+  KEY idx_run_test (test_run_id, test_name),
+  KEY idx_alg_op (algorithm, operation, cores)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Measurement environments (env_fingerprint.py): one row per distinct fingerprint, imported from the
+-- '.env.json' next to each result CSV. pqc_results rows reference it through fingerprint_id.
+CREATE TABLE IF NOT EXISTS pqc_env_fingerprint (
+  fingerprint_id CHAR(16) NOT NULL,              -- hash of the stable fields below
+  host VARCHAR(64) NOT NULL,
+  role ENUM('client','server') NOT NULL,
+  captured_at DATETIME(6) NULL,                  -- first capture of this fingerprint
+  cpu_model VARCHAR(128) NULL,
+  microcode VARCHAR(32) NULL,
+  logical_cpus SMALLINT UNSIGNED NULL,
+  physical_cores SMALLINT UNSIGNED NULL,
+  governor VARCHAR(32) NULL,                     -- cpufreq scaling governor (NULL without cpufreq)
+  max_mhz INT UNSIGNED NULL,
+  measured_mhz DOUBLE NULL,                      -- cycles / task-clock of a busy loop at the first capture
+                                                 -- (pqc_results.measured_mhz holds the one each row used)
+  kernel VARCHAR(128) NULL,
+  binary_path VARCHAR(255) NULL,
+  openssh_version VARCHAR(64) NULL,
+  liboqs_version VARCHAR(32) NULL,               -- 'static' when linked into the binary
+  openssl_version VARCHAR(32) NULL,
+  perf_events JSON NULL,                         -- event -> countable on this host
+
+  PRIMARY KEY (fingerprint_id),
+  KEY idx_host (host, role)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,279 @@
+import argparse
+import numpy as np
+import pandas as pd
+from bokeh.plotting import figure, show
+from bokeh.io import output_file, save
+from bokeh.models import ColumnDataSource, FixedTicker, HoverTool, Legend, NumeralTickFormatter, TabPanel, Tabs
+from bokeh.palettes import turbo
+import config
+from results_files import find_test_pairs
+
+METRIC_LABELS = {
+    "cycles": "CPU Cycles",
+    "instructions": "CPU Instructions",
+    "cpi": "Cycles per Instruction",
+}
+SUMMARY_PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+KDE_GRID_POINTS = 256
+HISTOGRAM_BINS = 60
+
+def load_metric(csv_path, metric):
+    """
+    Loads one metric column from a result CSV as a float64 array. 'cpi' is derived
+    as cycles / instructions; rows with missing or zero counters are dropped.
+    """
+    df = pd.read_csv(csv_path)
+    df.columns = [c.replace("-", "_") for c in df.columns]
+    if metric == "cpi":
+        values = df["cycles"].to_numpy(dtype=np.float64) / df["instructions"].to_numpy(dtype=np.float64)
+    else:
+        values = df[metric].to_numpy(dtype=np.float64)
+    return values[np.isfinite(values) & (values > 0)]
+
+def summarize(values):
+    """Returns the summary percentiles plus mean and standard deviation of a sample."""
+    summary = dict(zip((f"p{q}" for q in SUMMARY_PERCENTILES), np.percentile(values, SUMMARY_PERCENTILES)))
+    summary["mean"] = float(values.mean())
+    summary["std"] = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+    summary["count"] = len(values)
+    return summary
+
+def ecdf(values):
+    """Empirical CDF: sorted values and their cumulative fractions."""
+    x = np.sort(values)
+    return x, np.arange(1, len(x) + 1) / len(x)
+
+def kde_bandwidth(values):
+    """Silverman's rule of thumb, robust to outliers through the IQR."""
+    q75, q25 = np.percentile(values, [75, 25])
+    spread = min(values.std(ddof=1), (q75 - q25) / 1.34) if len(values) > 1 else 0.0
+    if spread <= 0:
+        spread = values.std(ddof=1) if len(values) > 1 and values.std(ddof=1) > 0 else max(abs(values.mean()) * 1e-3, 1e-12)
+    return 0.9 * spread * len(values) ** (-0.2)
+
+def gaussian_kde(values, grid, chunk_size=4096):
+    """
+    Gaussian kernel density of `values` evaluated on `grid`. Each chunk of samples
+    is evaluated against the whole grid with one broadcast, so memory stays bounded
+    at len(grid) * chunk_size.
+    """
+    bandwidth = kde_bandwidth(values)
+    density = np.zeros(len(grid))
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        z = (grid[:, None] - chunk[None, :]) / bandwidth
+        density += np.exp(-0.5 * z * z).sum(axis=1)
+    return density / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+
+def log_axis_for(metric):
+    """Cycles and instructions span orders of magnitude across algorithms; CPI does not."""
+    return metric != "cpi"
+
+def value_grid(values, metric, points):
+    """Evaluation grid (log-spaced for counters) spanning the sample with a small margin."""
+    low, high = values.min(), values.max()
+    if log_axis_for(metric):
+        return np.geomspace(low * 0.95, high * 1.05, points)
+    margin = (high - low) * 0.05 or abs(low) * 0.05 or 1.0
+    return np.linspace(low - margin, high + margin, points)
+
+def load_samples(results_dir, role, metric, tests=None):
+    """Loads the metric sample of every test found in results_dir for the given role."""
+    samples = {}
+    for test_name, pair in find_test_pairs(results_dir).items():
+        if tests and not any(t in test_name for t in tests):
+            continue
+        if not pair[role]:
+            continue
+        values = load_metric(pair[role], metric)
+        if len(values):
+            samples[test_name] = values
+        else:
+            print(f"[INFO] Skipping {test_name}: no valid {metric} values.")
+    return samples
+
+def styled_figure(title, x_label, y_label, metric, **kwargs):
+    """Creates a figure with the shared config.PLOT_* styling."""
+    p = figure(
+        title=title,
+        x_axis_label=x_label,
+        y_axis_label=y_label,
+        width=config.PLOT_WIDTH,
+        height=kwargs.pop("height", config.PLOT_HEIGHT),
+        background_fill_color=config.PLOT_BG_COLOR,
+        x_axis_type="log" if log_axis_for(metric) else "linear",
+        output_backend="webgl",
+        **kwargs
+    )
+    p.title.text_font_size = config.TITLE_FONT_SIZE
+    p.xaxis.axis_label_text_font_size = config.AXIS_LABEL_FONT_SIZE
+    p.yaxis.axis_label_text_font_size = config.AXIS_LABEL_FONT_SIZE
+    p.xaxis.major_label_text_font_size = config.MAJOR_LABEL_FONT_SIZE
+    p.yaxis.major_label_text_font_size = config.MAJOR_LABEL_FONT_SIZE
+    if metric != "cpi":
+        p.xaxis.formatter = NumeralTickFormatter(format="0,0")
+    return p
+
+def add_legend(p, items):
+    """Places a clickable legend outside the plot area, since there is one entry per test."""
+    legend = Legend(items=items, click_policy="hide", label_text_font_size="8pt")
+    p.add_layout(legend, "right")
+
+def ecdf_view(samples, colors, metric, label):
+    """ECDF of every test, with the p99 of each marked so tail differences stand out."""
+    p = styled_figure(f"ECDF of {label}", label, "Fraction of iterations", metric)
+    items = []
+    for (test_name, values), color in zip(samples.items(), colors):
+        x, y = ecdf(values)
+        line = p.step(x, y, line_color=color, line_width=2, mode="after")
+        p99 = np.percentile(values, 99)
+        marker = p.scatter([p99], [0.99], size=9, color=color, marker="triangle")
+        items.append((test_name, [line, marker]))
+    p.add_tools(HoverTool(tooltips=[(label, "@x{0,0.000}"), ("Fraction", "@y{0.000}")]))
+    add_legend(p, items)
+    return p
+
+def histogram_view(samples, colors, metric, label):
+    """Histograms on shared bin edges (log-spaced for counters), normalized to fractions of iterations."""
+    all_values = np.concatenate(list(samples.values()))
+    edges = value_grid(all_values, metric, HISTOGRAM_BINS + 1)
+    p = styled_figure(f"Histogram of {label}", label, "Fraction of iterations", metric)
+    items = []
+    for (test_name, values), color in zip(samples.items(), colors):
+        counts, _ = np.histogram(values, bins=edges)
+        quad = p.quad(top=counts / len(values), bottom=0, left=edges[:-1], right=edges[1:],
+                      fill_color=color, fill_alpha=0.35, line_color=color)
+        items.append((test_name, [quad]))
+    add_legend(p, items)
+    return p
+
+def kde_view(samples, colors, metric, label):
+    """Kernel density estimate per test."""
+    p = styled_figure(f"Kernel Density of {label}", label, "Density", metric)
+    items = []
+    for (test_name, values), color in zip(samples.items(), colors):
+        grid = value_grid(values, metric, KDE_GRID_POINTS)
+        line = p.line(grid, gaussian_kde(values, grid), line_color=color, line_width=2)
+        items.append((test_name, [line]))
+    add_legend(p, items)
+    return p
+
+def box_violin_view(samples, colors, metric, label):
+    """
+    One row per test: a violin (mirrored KDE), a box (p25-p75 with the median),
+    whiskers from p5 to p95 and a red marker at p99.
+    """
+    names = list(samples)
+    p = styled_figure(f"Box/Violin of {label} (whiskers p5-p95, marker p99)", label, "Test", metric,
+                      height=max(config.PLOT_HEIGHT, 40 * len(names)))
+    rows = {key: [] for key in ["y", "name", "p5", "p25", "p50", "p75", "p95", "p99", "mean", "count"]}
+    for row, ((test_name, values), color) in enumerate(zip(samples.items(), colors)):
+        grid = value_grid(values, metric, KDE_GRID_POINTS)
+        density = gaussian_kde(values, grid)
+        half_width = 0.4 * density / density.max() if density.max() > 0 else density
+        p.patch(np.concatenate([grid, grid[::-1]]),
+                np.concatenate([row + half_width, (row - half_width)[::-1]]),
+                fill_color=color, fill_alpha=0.3, line_color=color)
+        summary = summarize(values)
+        rows["y"].append(row)
+        rows["name"].append(test_name)
+        for key in ["p5", "p25", "p50", "p75", "p95", "p99", "mean", "count"]:
+            rows[key].append(summary[key])
+
+    source = ColumnDataSource(data=rows)
+    p.segment("p5", "y", "p95", "y", source=source, line_color="black", line_width=1)
+    p.hbar(y="y", left="p25", right="p75", height=0.3, source=source,
+           fill_color="white", fill_alpha=0.8, line_color="black")
+    p.scatter("p50", "y", source=source, size=7, color="black")
+    p99 = p.scatter("p99", "y", source=source, size=10, color="red", marker="triangle")
+    p.add_tools(HoverTool(renderers=[p99], tooltips=[
+        ("Test", "@name"), ("Iterations", "@count"), ("p50", "@p50{0,0.000}"),
+        ("p95", "@p95{0,0.000}"), ("p99", "@p99{0,0.000}"), ("Mean", "@mean{0,0.000}")
+    ]))
+    p.yaxis.ticker = FixedTicker(ticks=list(range(len(names))))
+    p.yaxis.major_label_overrides = {i: name for i, name in enumerate(names)}
+    return p
+
+def tail_view(samples, metric, label):
+    """Tail amplification (p99 / p50) per test, sorted, so heavy tails are visible at a glance."""
+    summaries = {name: summarize(values) for name, values in samples.items()}
+    names = sorted(summaries, key=lambda n: summaries[n]["p99"] / summaries[n]["p50"])
+    ratios = [summaries[n]["p99"] / summaries[n]["p50"] for n in names]
+    source = ColumnDataSource(data={
+        "y": list(range(len(names))), "name": names, "ratio": ratios,
+        "p50": [summaries[n]["p50"] for n in names], "p99": [summaries[n]["p99"] for n in names],
+    })
+    # Ratios are dimensionless, so the figure uses the linear (CPI) axis styling
+    p = styled_figure(f"Tail Amplification of {label} (p99 / p50)", "p99 / p50", "Test", "cpi",
+                      height=max(config.PLOT_HEIGHT, 40 * len(names)))
+    bars = p.hbar(y="y", left=1, right="ratio", height=0.6, source=source, fill_color="indigo", fill_alpha=0.7)
+    p.add_tools(HoverTool(renderers=[bars], tooltips=[
+        ("Test", "@name"), ("p50", "@p50{0,0.000}"), ("p99", "@p99{0,0.000}"), ("p99/p50", "@ratio{0.000}")
+    ]))
+    p.yaxis.ticker = FixedTicker(ticks=list(range(len(names))))
+    p.yaxis.major_label_overrides = {i: name for i, name in enumerate(names)}
+    return p
+
+def create_distribution_plot(results_dir, output_html, role="client", metric="cycles", tests=None, show_plot=True):
+    """
+    Generates a tabbed Bokeh page with histogram, ECDF, KDE, box/violin and tail
+    views of one metric for every test in a results directory.
+
+    Args:
+        results_dir (str): Directory holding the result CSVs (searched recursively).
+        output_html (str): Path to save the output HTML file.
+        role (str): 'client' or 'server'.
+        metric (str): 'cycles', 'instructions' or 'cpi'.
+        tests (list): Optional substrings; only matching test names are plotted.
+        show_plot (bool): Open the plot in a browser; when False the HTML is only written.
+
+    Returns:
+        The Bokeh layout, or None if no data was found.
+    """
+    samples = load_samples(results_dir, role, metric, tests)
+    if not samples:
+        print(f"Error: no {role} results found in {results_dir}.")
+        return None
+
+    label = f"{role.capitalize()} {METRIC_LABELS[metric]}"
+    colors = turbo(max(len(samples), 3))[:len(samples)]
+    layout = Tabs(tabs=[
+        TabPanel(child=box_violin_view(samples, colors, metric, label), title="Box/Violin"),
+        TabPanel(child=ecdf_view(samples, colors, metric, label), title="ECDF"),
+        TabPanel(child=histogram_view(samples, colors, metric, label), title="Histogram"),
+        TabPanel(child=kde_view(samples, colors, metric, label), title="KDE"),
+        TabPanel(child=tail_view(samples, metric, label), title="Tail (p99/p50)"),
+    ])
+
+    output_file(output_html)
+    if show_plot:
+        show(layout)
+    else:
+        save(layout)
+    print(f"Plot saved to {output_html}")
+    return layout
+
+def main():
+    """
+    Main function to parse command-line arguments and generate the plot.
+    """
+    parser = argparse.ArgumentParser(description="Generate distribution views (histogram, ECDF, KDE, box/violin) per test.")
+    parser.add_argument("results_dir", help="Directory with the result CSV files (searched recursively).")
+    parser.add_argument("--role", choices=["client", "server"], default="client", help="Measurement side (default: client).")
+    parser.add_argument("--metric", choices=sorted(METRIC_LABELS), default="cycles", help="Metric to plot (default: cycles).")
+    parser.add_argument("--test", action="append", help="Only include tests whose name contains this text (repeatable).")
+    parser.add_argument(
+        "-o", "--output",
+        default=config.DEFAULT_DISTRIBUTION_PLOT_OUTPUT,
+        help=f"Output HTML file name (default: {config.DEFAULT_DISTRIBUTION_PLOT_OUTPUT})."
+    )
+    parser.add_argument(
+        "--no-show", action="store_true",
+        help="Only write the HTML file; do not open a browser."
+    )
+    args = parser.parse_args()
+
+    create_distribution_plot(args.results_dir, args.output, args.role, args.metric, args.test, show_plot=not args.no_show)
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,93 @@
 import argparse
-import pandas as pd
 from bokeh.plotting import figure, show
-from bokeh.io import output_file
-from bokeh.models import DataRange1d, NumeralTickFormatter, LinearAxis, HoverTool, Legend
+from bokeh.io import output_file, save
+from bokeh.models import DataRange1d, NumeralTickFormatter, LinearAxis, HoverTool, Legend, Range1d
 import config
+from plot_utils import load_merged_results, build_shared_source, attach_full_resolution_zoom
 
-def create_dual_axis_plot(server_csv, client_csv, output_html):
+def create_dual_axis_plot(server_csv, client_csv, output_html, show_plot=True):
     """
     Reads performance data and generates an interactive Bokeh plot with a dual Y-axis
-    for comparing CPU Cycles and Instructions.
+    for comparing CPU Cycles and Instructions. Long series are LTTB-downsampled;
+    zooming in restores full resolution.
 
     Args:
         server_csv (str): Path to the server's performance data CSV file.
         client_csv (str): Path to the client's performance data CSV file.
         output_html (str): Path to save the output HTML file.
+        show_plot (bool): Open the plot in a browser; when False the HTML is only written.
+
+    Returns:
+        The Bokeh figure, or None if the CSV files could not be read or are empty.
     """
     try:
-        df_server = pd.read_csv(server_csv)
-        df_client = pd.read_csv(client_csv)
+        data = load_merged_results(server_csv, client_csv)
     except FileNotFoundError as e:
         print(f"Error: {e}. Please provide valid file paths.")
-        return
+        return None
+    if len(data["iteration"]) == 0:
+        print(f"Error: {server_csv} and {client_csv} hold no iterations to plot.")
+        return None
+
+    # A single source feeds every renderer, so the hover can show all four series at once
+    source, full_data = build_shared_source(data, config.PLOT_DOWNSAMPLE_THRESHOLD)
 
     # Create a new plot
     p = figure(
         title="CPU Performance: Cycles & Instructions per Iteration",
         x_axis_label="Iteration",
         y_axis_label="CPU Cycles",
+        x_range=Range1d(data["iteration"][0], data["iteration"][-1]),
         width=config.PLOT_WIDTH,
         height=config.PLOT_HEIGHT,
-        background_fill_color=config.PLOT_BG_COLOR
+        background_fill_color=config.PLOT_BG_COLOR,
+        output_backend="webgl"
     )
 
     # --- Primary Y-Axis (CPU Cycles) ---
     server_cycles = p.line(
-        df_server["iteration"], df_server["cycles"],
+        "iteration", "server_cycles", source=source,
         line_color="dodgerblue", line_width=3, alpha=0.8
     )
     client_cycles = p.line(
-        df_client["iteration"], df_client["cycles"],
+        "iteration", "client_cycles", source=source,
         line_color="purple", line_width=3, alpha=0.8
     )
-    p.y_range = DataRange1d()
+    p.y_range = DataRange1d(renderers=[server_cycles, client_cycles])
     p.yaxis.formatter = NumeralTickFormatter(format="0,0")
 
     # --- Secondary Y-Axis (CPU Instructions) ---
     p.extra_y_ranges = {"instructions_range": DataRange1d()}
-    p.add_layout(
-        LinearAxis(y_range_name="instructions_range", axis_label="CPU Instructions"),
-        'right'
-    )
+    instructions_axis = LinearAxis(y_range_name="instructions_range", axis_label="CPU Instructions")
+    p.add_layout(instructions_axis, 'right')
     server_instructions = p.line(
-        df_server["iteration"], df_server["instructions"],
+        "iteration", "server_instructions", source=source,
         line_width=3, line_dash="dashed", color="darkorange", alpha=0.9,
         y_range_name="instructions_range"
     )
     client_instructions = p.line(
-        df_client["iteration"], df_client["instructions"],
+        "iteration", "client_instructions", source=source,
         line_width=3, line_dash="dashed", color="red", alpha=0.9,
         y_range_name="instructions_range"
     )
-    p.extra_y_ranges["instructions_range"].formatter = NumeralTickFormatter(format="0,0")
+    p.extra_y_ranges["instructions_range"].renderers = [server_instructions, client_instructions]
+    instructions_axis.formatter = NumeralTickFormatter(format="0,0")
 
     # --- Tools and Styling ---
-    hover = HoverTool(tooltips=[
-        ("Iteration", "@x"),
-        ("Cycles", "@y{0,0}"),
-        ("Instructions", "@instructions{0,0}") # Requires mapping 'instructions' in ColumnDataSource
-    ])
-    # Note: For hover to work on both axes, a more complex ColumnDataSource setup is needed.
-    # This implementation keeps it simple and hovers over the primary Y-axis.
-    p.add_tools(HoverTool(tooltips=[("Iteration", "@x"), ("Value", "@y{0,0}")]))
+    p.add_tools(HoverTool(
+        renderers=[server_cycles],
+        mode="vline",
+        tooltips=[
+            ("Iteration", "@iteration"),
+            ("Server Cycles", "@server_cycles{0,0}"),
+            ("Client Cycles", "@client_cycles{0,0}"),
+            ("Server Instructions", "@server_instructions{0,0}"),
+            ("Client Instructions", "@client_instructions{0,0}")
+        ]
+    ))
+
+    if full_data is not None:
+        attach_full_resolution_zoom(p, source, full_data, config.PLOT_DOWNSAMPLE_THRESHOLD, output_html)
 
     # --- Legend ---
     legend = Legend(items=[
@@ -92,8 +109,12 @@ def create_dual_axis_plot(server_csv, client_csv, output_html):
 
     # --- Output ---
     output_file(output_html)
-    show(p)
+    if show_plot:
+        show(p)
+    else:
+        save(p)
     print(f"Plot saved to {output_html}")
+    return p
 
 
 def main():
@@ -108,9 +129,13 @@ def main():
         default=config.DEFAULT_DUAL_AXIS_PLOT_OUTPUT,
         help=f"Output HTML file name (default: {config.DEFAULT_DUAL_AXIS_PLOT_OUTPUT})."
     )
+    parser.add_argument(
+        "--no-show", action="store_true",
+        help="Only write the HTML file; do not open a browser."
+    )
     args = parser.parse_args()
 
-    create_dual_axis_plot(args.server_csv, args.client_csv, args.output)
+    create_dual_axis_plot(args.server_csv, args.client_csv, args.output, show_plot=not args.no_show)
 
 if __name__ == "__main__":
     main()
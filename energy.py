@@ -0,0 +1,114 @@
+import functools
+import glob
+import os
+import signal
+import subprocess
+import sys
+import time
+
+# Columns added to the client/server CSV when ENERGY_BACKEND is set
+ENERGY_FIELDS = ["energy_pkg_uj", "energy_dram_uj", "energy_window_us"]
+
+POWERCAP_DIR = "/sys/class/powercap"
+PERF_POWER_EVENTS = "/sys/bus/event_source/devices/power/events"
+
+def read_int(path):
+    with open(path) as f:
+        return int(f.read())
+
+def powercap_zones():
+    """
+    RAPL zones readable through powercap: (kind, energy_uj path, max_energy_range_uj).
+    Only package and DRAM domains are kept; core/uncore are already part of the package.
+    """
+    zones = []
+    for zone in sorted(glob.glob(os.path.join(POWERCAP_DIR, "intel-rapl:*"))):
+        try:
+            with open(os.path.join(zone, "name")) as f:
+                name = f.read().strip()
+            kind = "pkg" if name.startswith("package") else "dram" if name == "dram" else None
+            if kind:
+                energy = os.path.join(zone, "energy_uj")
+                read_int(energy)  # energy_uj is root-only on most kernels
+                zones.append((kind, energy, read_int(os.path.join(zone, "max_energy_range_uj"))))
+        except (OSError, ValueError):
+            continue
+    return zones
+
+def perf_energy_events():
+    """The RAPL perf events available on this host (power/energy-pkg/, power/energy-ram/)."""
+    return [f"power/{event}/" for event in ("energy-pkg", "energy-ram")
+            if os.path.exists(os.path.join(PERF_POWER_EVENTS, event))]
+
+@functools.lru_cache(maxsize=None)
+def detect_backend(requested):
+    """
+    Resolves ENERGY_BACKEND ("powercap", "perf" or "auto") to an available backend,
+    or None (with a warning) on hosts without RAPL. Resolved once per process.
+    """
+    candidates = ["powercap", "perf"] if requested == "auto" else [requested]
+    for backend in candidates:
+        if backend == "powercap" and powercap_zones():
+            return backend
+        if backend == "perf" and perf_energy_events():
+            return backend
+    print(f"[WARN] Energy measurement disabled: no RAPL counters available for '{requested}'.", file=sys.stderr)
+    return None
+
+def counter_delta(start, end, max_range):
+    """Difference of a wrapping energy counter (at most one wrap per measurement)."""
+    return end - start if end >= start else end + max_range - start
+
+class EnergyMeter:
+    """
+    Measures package and DRAM energy between start() and stop(). RAPL counters are
+    per socket, not per process: the values include everything running on the host
+    during the window, so idle power should be subtracted using energy_window_us.
+
+    With backend None every column stays empty, so callers need no special case.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = dict.fromkeys(ENERGY_FIELDS, None)
+        self.zones = powercap_zones() if backend == "powercap" else []
+        self.readings = None
+        self.perf_process = None
+        self.started = None
+
+    def start(self):
+        if self.backend == "powercap":
+            self.readings = [read_int(path) for _, path, _ in self.zones]
+        elif self.backend == "perf":
+            command = ["perf", "stat", "-a", "-x", ",", "-e", ",".join(perf_energy_events())]
+            self.perf_process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            time.sleep(0.05)  # let perf open the counters before the measured work starts
+        self.started = time.monotonic()
+
+    def stop(self):
+        if self.backend is None:
+            return
+        window = time.monotonic() - self.started
+        energy = {"pkg": 0, "dram": None}
+        if self.backend == "powercap":
+            for (kind, path, max_range), start in zip(self.zones, self.readings):
+                delta = counter_delta(start, read_int(path), max_range)
+                energy[kind] = (energy[kind] or 0) + delta
+        else:
+            self.perf_process.send_signal(signal.SIGINT)
+            _, output = self.perf_process.communicate(timeout=10)
+            for line in output.splitlines():
+                fields = line.split(",")
+                if len(fields) > 2 and fields[1] == "Joules":
+                    kind = "pkg" if "energy-pkg" in fields[2] else "dram"
+                    energy[kind] = (energy[kind] or 0) + round(float(fields[0]) * 1e6)
+        self.stats = {"energy_pkg_uj": energy["pkg"], "energy_dram_uj": energy["dram"],
+                      "energy_window_us": round(window * 1e6)}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
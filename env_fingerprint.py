@@ -0,0 +1,140 @@
+import datetime
+import hashlib
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+from results_files import sibling_filename, write_atomically
+
+# Stable description of a measurement environment; fingerprint_id hashes these fields
+IDENTITY_FIELDS = [
+    "host", "role", "cpu_model", "microcode", "logical_cpus", "physical_cores", "governor", "max_mhz",
+    "kernel", "binary", "openssh_version", "liboqs_version", "openssl_version", "perf_events",
+]
+
+OPENSSH_RE = re.compile(r"OpenSSH_\S+")
+CPUFREQ_DIR = "/sys/devices/system/cpu/cpu0/cpufreq"
+
+def read_text(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def cpu_info():
+    """CPU model, microcode and core counts from /proc/cpuinfo."""
+    info = {"cpu_model": None, "microcode": None, "logical_cpus": os.cpu_count(), "physical_cores": None}
+    cores = set()
+    physical_id = None
+    for line in (read_text("/proc/cpuinfo") or "").splitlines():
+        key, _, value = (part.strip() for part in line.partition(":"))
+        if key == "model name" and info["cpu_model"] is None:
+            info["cpu_model"] = value
+        elif key == "microcode" and info["microcode"] is None:
+            info["microcode"] = value
+        elif key == "physical id":
+            physical_id = value
+        elif key == "core id":
+            cores.add((physical_id, value))
+    info["physical_cores"] = len(cores) or None
+    return info
+
+def library_version(binary, name):
+    """Version of a shared library loaded by the binary (from the real file name), or 'static'."""
+    result = subprocess.run(["ldd", binary], capture_output=True, text=True)
+    match = re.search(rf"\s(/\S*{name}\.so[.\d]*)\s", result.stdout)
+    if not match:
+        return "static"
+    version = re.search(rf"{name}\.so\.([\d.]+)$", os.path.realpath(match.group(1)))
+    return version.group(1) if version else os.path.basename(match.group(1))
+
+def openssh_version(binary):
+    """'ssh -V' prints the version; sshd has no such option but prints it in the usage message."""
+    result = subprocess.run([binary, "-V"], capture_output=True, text=True)
+    match = OPENSSH_RE.search(result.stdout + result.stderr)
+    return match.group(0).rstrip(",") if match else None
+
+def perf_events(perf_command):
+    """Which events of PERF_COMMAND this host can count (a short 'perf stat' of 'true')."""
+    events = perf_command[perf_command.index("-e") + 1]
+    result = subprocess.run(["perf", "stat", "-x", ",", "-e", events, "--", "true"], capture_output=True, text=True)
+    available = {}
+    for line in result.stderr.splitlines():
+        fields = line.split(",")
+        if len(fields) > 2 and fields[2] in events.split(","):
+            available[fields[2]] = not fields[0].startswith("<")
+    return available
+
+def measured_mhz():
+    """
+    Effective core frequency under load: cycles / task-clock of a short busy loop.
+    Used to convert cycles to nanoseconds, so hosts with different clocks compare.
+    """
+    loop = "i=0; while [ $i -lt 200000 ]; do i=$((i+1)); done"
+    result = subprocess.run(["perf", "stat", "-x", ",", "-e", "cycles,task-clock", "--", "sh", "-c", loop],
+                            capture_output=True, text=True)
+    values = {}
+    for line in result.stderr.splitlines():
+        fields = line.split(",")
+        if len(fields) > 2:
+            try:
+                values[fields[2].split(":")[0]] = float(fields[0])
+            except ValueError:
+                pass
+    if values.get("cycles") and values.get("task-clock"):
+        return round(values["cycles"] / (values["task-clock"] * 1000), 1)  # task-clock is in msec
+    return None
+
+def capture(role, binary, perf_command):
+    """Captures the full fingerprint of this host for one role and binary."""
+    fingerprint = {
+        "host": socket.gethostname(),
+        "role": role,
+        **cpu_info(),
+        "governor": read_text(f"{CPUFREQ_DIR}/scaling_governor"),
+        "max_mhz": int(read_text(f"{CPUFREQ_DIR}/cpuinfo_max_freq") or 0) // 1000 or None,
+        "kernel": platform.release(),
+        "binary": binary,
+        "openssh_version": openssh_version(binary),
+        "liboqs_version": library_version(binary, "liboqs"),
+        "openssl_version": library_version(binary, "libcrypto"),
+        "perf_events": perf_events(perf_command),
+    }
+    identity = json.dumps({field: fingerprint[field] for field in IDENTITY_FIELDS}, sort_keys=True)
+    fingerprint["fingerprint_id"] = hashlib.sha256(identity.encode()).hexdigest()[:16]
+    fingerprint["measured_mhz"] = measured_mhz()
+    fingerprint["captured_at"] = datetime.datetime.now().isoformat()
+    return fingerprint
+
+def cache_key(binary):
+    """What invalidates a cached fingerprint: a reboot (kernel, microcode) or a rebuilt binary."""
+    try:
+        binary_mtime = os.path.getmtime(binary)
+    except OSError:
+        binary_mtime = None
+    return {"boot_id": read_text("/proc/sys/kernel/random/boot_id"), "binary_mtime": binary_mtime}
+
+def fingerprint_run(output_file, role, binary, perf_command, build=None):
+    """
+    Returns the fingerprint of the current run, capturing it only when the cached
+    one no longer applies. Every distinct fingerprint is kept in the '.env.json'
+    of the result file with the build it measures, so the importer can match
+    rows to it by build and timestamp.
+    """
+    path = sibling_filename(output_file, ".env.json")
+    history = []
+    if os.path.isfile(path):
+        with open(path) as f:
+            history = json.load(f)
+    key = cache_key(binary)
+    for fingerprint in reversed(history):
+        # Interleaved builds alternate binaries, each keeps its own cached fingerprint
+        if (fingerprint["binary"], fingerprint.get("build")) == (binary, build) and fingerprint.get("cache_key") == key:
+            return fingerprint
+    fingerprint = dict(capture(role, binary, perf_command), build=build, cache_key=key)
+    history.append(fingerprint)
+    write_atomically(path, json.dumps(history, indent=2))
+    return fingerprint
@@ -1,53 +1,76 @@
 import argparse
-import pandas as pd
 from bokeh.plotting import figure, show
-from bokeh.io import output_file
-from bokeh.models import NumeralTickFormatter
+from bokeh.io import output_file, save
+from bokeh.models import HoverTool, NumeralTickFormatter, Range1d
 import config
+from plot_utils import load_merged_results, build_shared_source, attach_full_resolution_zoom
 
-def create_plot(server_csv, client_csv, output_html):
+def create_plot(server_csv, client_csv, output_html, show_plot=True):
     """
     Reads performance data from server and client CSV files and generates an interactive Bokeh plot.
+    Long series are LTTB-downsampled; zooming in restores full resolution.
 
     Args:
         server_csv (str): Path to the server's performance data CSV file.
         client_csv (str): Path to the client's performance data CSV file.
         output_html (str): Path to save the output HTML file.
+        show_plot (bool): Open the plot in a browser; when False the HTML is only written.
+
+    Returns:
+        The Bokeh figure, or None if the CSV files could not be read or are empty.
     """
     try:
-        df_server = pd.read_csv(server_csv)
-        df_client = pd.read_csv(client_csv)
+        data = load_merged_results(server_csv, client_csv)
     except FileNotFoundError as e:
         print(f"Error: {e}. Please provide valid file paths.")
-        return
+        return None
+    if len(data["iteration"]) == 0:
+        print(f"Error: {server_csv} and {client_csv} hold no iterations to plot.")
+        return None
+
+    source, full_data = build_shared_source(data, config.PLOT_DOWNSAMPLE_THRESHOLD)
 
     # Create a new plot with a title and axis labels
     p = figure(
         title="CPU Cycles per Iteration",
         x_axis_label="Iteration",
         y_axis_label="CPU Cycles",
+        x_range=Range1d(data["iteration"][0], data["iteration"][-1]),
         width=config.PLOT_WIDTH,
         height=config.PLOT_HEIGHT,
-        background_fill_color=config.PLOT_BG_COLOR
+        background_fill_color=config.PLOT_BG_COLOR,
+        output_backend="webgl"
     )
 
-    # Add line renderers with legend labels
-    p.line(
-        df_server["iteration"],
-        df_server["cycles"],
+    # Add line renderers with legend labels, all reading from the same source
+    server_cycles = p.line(
+        "iteration", "server_cycles",
+        source=source,
         legend_label="Server CPU Cycles",
         line_color="indigo",
         line_width=3,
         line_dash="dotdash"
     )
     p.line(
-        df_client["iteration"],
-        df_client["cycles"],
+        "iteration", "client_cycles",
+        source=source,
         legend_label="Client CPU Cycles",
         line_color="coral",
         line_width=3,
         line_dash="dashed"
     )
+    p.add_tools(HoverTool(
+        renderers=[server_cycles],
+        mode="vline",
+        tooltips=[
+            ("Iteration", "@iteration"),
+            ("Server Cycles", "@server_cycles{0,0}"),
+            ("Client Cycles", "@client_cycles{0,0}")
+        ]
+    ))
+
+    if full_data is not None:
+        attach_full_resolution_zoom(p, source, full_data, config.PLOT_DOWNSAMPLE_THRESHOLD, output_html)
 
     # Customize the plot
     p.yaxis.formatter = NumeralTickFormatter(format="0,0")  # Format y-axis numbers
@@ -56,8 +79,12 @@ def create_plot(server_csv, client_csv, output_html):
 
     # Specify the output file and show the plot
     output_file(output_html)
-    show(p)
+    if show_plot:
+        show(p)
+    else:
+        save(p)
     print(f"Plot saved to {output_html}")
+    return p
 
 def main():
     """
@@ -71,9 +98,13 @@ def main():
         default=config.DEFAULT_SINGLE_AXIS_PLOT_OUTPUT,
         help=f"Output HTML file name (default: {config.DEFAULT_SINGLE_AXIS_PLOT_OUTPUT})."
     )
+    parser.add_argument(
+        "--no-show", action="store_true",
+        help="Only write the HTML file; do not open a browser."
+    )
     args = parser.parse_args()
 
-    create_plot(args.server_csv, args.client_csv, args.output)
+    create_plot(args.server_csv, args.client_csv, args.output, show_plot=not args.no_show)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+import sys
+from array import array
+from results_files import sibling_filename, write_atomically
+
+FORMAT = "pqc-hdr-v1"
+DEFAULT_HIGHEST = 2 ** 44        # ~1.7e13: cycles of the slowest handshakes, with room to spare
+PERCENTILES = [50, 90, 99, 99.9, 99.99]
+
+class HdrHistogram:
+    """
+    High Dynamic Range histogram: log-linear buckets with a fixed relative error
+    (10^-significant_digits) between 1 and `highest`, in a fixed-size array of
+    counters. Memory does not grow with the number of recorded values, and two
+    histograms with the same parameters merge by adding their counters.
+    """
+
+    def __init__(self, highest=DEFAULT_HIGHEST, significant_digits=3):
+        self.highest = highest
+        self.significant_digits = significant_digits
+        largest_single_unit = 2 * 10 ** significant_digits
+        self.sub_bucket_count_magnitude = (largest_single_unit - 1).bit_length()
+        self.sub_bucket_half_count_magnitude = self.sub_bucket_count_magnitude - 1
+        self.sub_bucket_count = 1 << self.sub_bucket_count_magnitude
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+        bucket_count, smallest_untrackable = 1, self.sub_bucket_count
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = array("Q", [0]) * ((bucket_count + 1) * self.sub_bucket_half_count)
+        self.total_count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def index_of(self, value):
+        bucket_index = (value | self.sub_bucket_mask).bit_length() - (self.sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self.sub_bucket_half_count_magnitude) + sub_bucket_index - self.sub_bucket_half_count
+
+    def highest_equivalent_value(self, index):
+        """Largest value counted in a bucket (what the percentiles report)."""
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return ((sub_bucket_index + 1) << bucket_index) - 1
+
+    def record(self, value, count=1):
+        """Records a value; values outside [0, highest] are clamped to the range."""
+        value = min(max(int(value), 0), self.highest)
+        self.counts[self.index_of(value)] += count
+        self.total_count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Adds the counts of another histogram with the same parameters."""
+        if (other.highest, other.significant_digits) != (self.highest, self.significant_digits):
+            raise ValueError("Cannot merge HDR histograms with different highest/significant_digits.")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.total += other.total
+        for bound, pick in (("min", min), ("max", max)):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+
+    def value_at_percentile(self, percentile):
+        if not self.total_count:
+            return None
+        target = max(1, round(percentile / 100 * self.total_count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.highest_equivalent_value(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.total_count if self.total_count else None
+
+    def to_dict(self):
+        """Serializable form; only non-empty buckets are kept, so snapshots take kilobytes."""
+        return {
+            "highest": self.highest, "significant_digits": self.significant_digits,
+            "total_count": self.total_count, "total": self.total, "min": self.min, "max": self.max,
+            "counts": [[index, count] for index, count in enumerate(self.counts) if count],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["highest"], data["significant_digits"])
+        for index, count in data["counts"]:
+            histogram.counts[index] = count
+        histogram.total_count, histogram.total = data["total_count"], data["total"]
+        histogram.min, histogram.max = data["min"], data["max"]
+        return histogram
+
+def load_snapshot(path):
+    """Reads a snapshot file: metric -> HdrHistogram."""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("format") != FORMAT:
+        raise ValueError(f"{path} is not an HDR snapshot ({FORMAT}).")
+    return {metric: HdrHistogram.from_dict(h) for metric, h in data["metrics"].items()}
+
+def save_snapshot(path, histograms):
+    """Writes a snapshot atomically, so an interrupted run never leaves a broken file."""
+    write_atomically(path, json.dumps({"format": FORMAT, "metrics": {m: h.to_dict() for m, h in histograms.items()}}))
+
+class HdrRecorder:
+    """
+    Keeps one histogram per metric for a result file and snapshots them every
+    `snapshot_every` records. An existing snapshot is loaded first, so runs that
+    append to the same CSV also accumulate into the same histograms.
+    """
+
+    def __init__(self, output_file, metrics, significant_digits=3, snapshot_every=1):
+        self.path = sibling_filename(output_file, ".hdr.json")
+        self.snapshot_every = snapshot_every
+        self.pending = 0
+        self.histograms = load_snapshot(self.path) if os.path.isfile(self.path) else {}
+        for metric in metrics:
+            self.histograms.setdefault(metric, HdrHistogram(significant_digits=significant_digits))
+
+    def record(self, row):
+        for metric, histogram in self.histograms.items():
+            if row.get(metric) is not None:
+                histogram.record(row[metric])
+        self.pending += 1
+        if self.pending >= self.snapshot_every:
+            self.save()
+
+    def save(self):
+        if self.pending:
+            save_snapshot(self.path, self.histograms)
+            self.pending = 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge HDR histogram snapshots (runs, hosts) and print their percentiles.")
+    parser.add_argument("snapshots", nargs="+", help="'.hdr.json' snapshot files to merge.")
+    parser.add_argument("--output", help="Also write the merged snapshot to this file.")
+    args = parser.parse_args()
+
+    merged = {}
+    for path in args.snapshots:
+        try:
+            histograms = load_snapshot(path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        for metric, histogram in histograms.items():
+            if metric in merged:
+                merged[metric].merge(histogram)
+            else:
+                merged[metric] = histogram
+
+    print(f"[INFO] Merged {len(args.snapshots)} snapshot(s):")
+    for metric, histogram in merged.items():
+        percentiles = "  ".join(f"p{p}={histogram.value_at_percentile(p)}" for p in PERCENTILES)
+        print(f"   • {metric:<14} n={histogram.total_count:<10} mean={histogram.mean() or 0:.0f}  {percentiles}  max={histogram.max}")
+    if args.output:
+        save_snapshot(args.output, merged)
+        print(f"[INFO] Merged snapshot written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import datetime
+import glob
+import importlib.util
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from results_files import check_csv_header, test_label
+
+# This script does not use the config.py symlink: every test config is loaded from
+# config_files and moved to its own port. The measuring modules are imported lazily,
+# after sys.modules["config"] points to the test config they must read.
+
+# Run variants and collectors this script does not apply, turned off in every test
+# config: the client writes the plain CSV_FIELDS and no netem/build labels, and the
+# file names (test_label) must not claim a variant that was not run.
+UNSUPPORTED_OPTIONS = {
+    "NETEM_PROFILE": None, "BULK_TRANSFER": False, "BUILDS": None, "WIRE_CAPTURE": False,
+    "CGROUP_ACCOUNTING": False, "ENERGY_BACKEND": None, "SYSCALL_PROFILE": False,
+}
+MAX_ATTEMPTS = 5  # connections tried per (block, test) slot before the run is stopped
+
+def load_config(path):
+    """Loads one config_Test-*.py as a module (they only assign constants)."""
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def select_configs(config_dir, names):
+    """The config paths of the selected tests (all of config_dir by default), in a stable order."""
+    paths = sorted(glob.glob(os.path.join(config_dir, "config_Test-*.py")))
+    if names:
+        paths = [p for p in paths if load_config(p).TEST_NAME in names]
+    return paths
+
+def with_option(args, flag, value):
+    """Copy of an argument list with the value following `flag` replaced."""
+    args = list(args)
+    args[args.index(flag) + 1] = value
+    return args
+
+def retarget(cfg, port):
+    """
+    Moves a test config to its own port and signal file, so the servers of all
+    tests can wait side by side. The metrics exporter is disabled: concurrent
+    servers would share its port and textfile. So are the UNSUPPORTED_OPTIONS.
+    """
+    signal_file = f"{cfg.SIGNAL_FILE}-{port}"
+    remote_command = cfg.REMOTE_COMMAND.replace(cfg.SIGNAL_FILE, signal_file)
+    cfg.SERVER_ARGS = with_option(cfg.SERVER_ARGS, "-p", str(port))
+    cfg.CLIENT_ARGS = [remote_command if arg == cfg.REMOTE_COMMAND else arg
+                       for arg in with_option(cfg.CLIENT_ARGS, "-p", str(port))]
+    cfg.SIGNAL_FILE, cfg.REMOTE_COMMAND = signal_file, remote_command
+    cfg.PORT_TO_CHECK = cfg.CLIENT_SSH_PORT = port
+    cfg.METRICS_EXPORTER = None
+    for name, value in UNSUPPORTED_OPTIONS.items():
+        setattr(cfg, name, value)
+    return cfg
+
+def unsupported_options(path):
+    """The UNSUPPORTED_OPTIONS a test config enables (retarget turns them off)."""
+    cfg = load_config(path)
+    return [name for name in UNSUPPORTED_OPTIONS if getattr(cfg, name, None)]
+
+def randomized_blocks(tests, blocks, seed):
+    """
+    Randomized block design: every block runs each test once, in a fresh random
+    order. Drift then spreads evenly over all tests instead of following the
+    sequence in which they run.
+
+    Returns:
+        list: (block, test) pairs in execution order.
+    """
+    rng = random.Random(seed)
+    schedule = []
+    for block in range(blocks):
+        order = list(tests)
+        rng.shuffle(order)
+        schedule += [(block, test) for test in order]
+    return schedule
+
+def serve_iteration(config_path, port, iteration):
+    """Worker process: one measured server run of a retargeted test config."""
+    sys.modules["config"] = retarget(load_config(config_path), port)
+    import server_perf
+    server_perf.run_server_benchmark(iteration)
+
+def supervise(config_path, port, iterations, stop):
+    """Keeps the server of one test up: restarts a worker after every measured connection."""
+    name = os.path.basename(config_path)
+    for iteration in range(iterations):
+        if stop.is_set():
+            return
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--serve", config_path,
+                                 "--port", str(port), "--iteration", str(iteration)])
+        if result.returncode != 0:
+            print(f"[ERROR] Server of {name} (port {port}) exited with status {result.returncode}. Stopping it.")
+            return
+        time.sleep(0.3)
+    print(f"[INFO] Server of {name} (port {port}) finished {iterations} iterations.")
+
+def run_servers(paths, base_port, iterations):
+    stop = threading.Event()
+    threads = []
+    for index, path in enumerate(paths):
+        thread = threading.Thread(target=supervise, args=(path, base_port + index, iterations, stop), daemon=True)
+        thread.start()
+        threads.append(thread)
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        # The workers get the same SIGINT and shut their servers down themselves
+        print("\n[INFO] CTRL+C detected! Stopping the server supervisors...")
+        stop.set()
+
+def client_output_filename(cfg):
+    """Same name as client_perf.py would use for this test, so the rows join the usual result set."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d")
+    return os.path.join(cfg.RESULTS_DIR, f"{socket.gethostname()}-{timestamp}-client-{test_label(cfg)}.csv")
+
+def run_clients(paths, base_port, iterations, seed):
+    configs = {path: retarget(load_config(path), base_port + index) for index, path in enumerate(paths)}
+    sys.modules["config"] = configs[paths[0]]  # general settings (DEBUG_MODE) of client_perf helpers
+    from client_perf import CSV_FIELDS, execute_perf_on_client, parse_perf_output
+
+    files, writers = {}, {}
+    for path, cfg in configs.items():
+        os.makedirs(cfg.RESULTS_DIR, exist_ok=True)
+        output_file = client_output_filename(cfg)
+        file_exists = os.path.isfile(output_file)
+        if file_exists:
+            check_csv_header(output_file, CSV_FIELDS)
+        files[path] = open(output_file, "a", newline="")
+        writers[path] = csv.DictWriter(files[path], fieldnames=CSV_FIELDS, extrasaction="ignore")
+        if not file_exists:
+            writers[path].writeheader()
+
+    schedule = randomized_blocks(paths, iterations, seed)
+    timeouts = 0
+    try:
+        for position, (block, path) in enumerate(schedule):
+            cfg = configs[path]
+            print(f"\n--- Block {block}, {cfg.TEST_NAME} (port {cfg.PORT_TO_CHECK}) [{position + 1}/{len(schedule)}] ---")
+            command = cfg.PERF_COMMAND + ["--", cfg.CLIENT_BINARY] + cfg.CLIENT_ARGS
+            # The server of the test waits for exactly one signalling connection per
+            # block, so a failed one is retried in the same slot
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                # Same pause as client_perf.py, so the server of the test is back up
+                time.sleep(2)
+                perf_output, return_code = execute_perf_on_client(command)
+                timed_out = "Timeout" in perf_output
+                if not timed_out and return_code == 0:
+                    break
+                if timed_out:
+                    timeouts += 1
+                reason = "timed out" if timed_out else f"exited with status {return_code}"
+                print(f"Client measurement {reason} (attempt {attempt}/{MAX_ATTEMPTS}). Retrying...")
+            else:
+                print(f"Error: {cfg.TEST_NAME} failed {MAX_ATTEMPTS} times in block {block}; "
+                      "its server would wait forever. Stopping the run.", file=sys.stderr)
+                break
+            metrics = parse_perf_output(perf_output)
+            metrics["iteration"] = block
+            metrics["timestamp"] = datetime.datetime.now().isoformat()
+            writers[path].writerow(metrics)
+            files[path].flush()
+    except KeyboardInterrupt:
+        print("\n[INFO] Interruption detected! Exiting script safely...")
+    finally:
+        for f in files.values():
+            f.close()
+    print(f"\n[INFO] Interleaved run finished ({timeouts} timeouts, retried). Results appended to the per-test files in:")
+    for cfg in configs.values():
+        print(f"   • {client_output_filename(cfg)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several tests interleaved in randomized blocks, one server per port.")
+    parser.add_argument("--role", choices=["client", "server"], help="Side to run (start the servers first).")
+    parser.add_argument("--config-dir", default="config_files", help="Directory with the config_Test-*.py files.")
+    parser.add_argument("--tests", nargs="*", help="TEST_NAMEs to include (default: all). Must match on both hosts.")
+    parser.add_argument("--base-port", type=int, default=2300, help="Port of the first test; the others follow in order (default: 2300).")
+    parser.add_argument("--iterations", type=int, default=None, help="Iterations per test (default: ITERATIONS of the configs).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the block order (default: random, printed).")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--iteration", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_iteration(args.serve, args.port, args.iteration)
+        return
+    if not args.role:
+        parser.error("--role is required")
+
+    paths = select_configs(args.config_dir, args.tests)
+    if not paths:
+        print(f"Error: no test configs selected in {args.config_dir}.", file=sys.stderr)
+        sys.exit(1)
+    iterations = args.iterations or load_config(paths[0]).ITERATIONS
+    print(f"[INFO] {len(paths)} tests, {iterations} iterations each:")
+    for index, path in enumerate(paths):
+        print(f"   • {load_config(path).TEST_NAME}: port {args.base_port + index}")
+        disabled = unsupported_options(path)
+        if disabled:
+            print(f"[WARN] Not supported in interleaved runs, disabled for {load_config(path).TEST_NAME}: {', '.join(disabled)}")
+
+    if args.role == "server":
+        run_servers(paths, args.base_port, iterations)
+    else:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        print(f"[INFO] Block order seed: {seed}")
+        run_clients(paths, args.base_port, iterations, seed)
+
+if __name__ == "__main__":
+    main()
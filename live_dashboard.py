@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import io
+import os
+from collections import deque
+from functools import partial
+import numpy as np
+from bokeh.application import Application
+from bokeh.application.handlers.function import FunctionHandler
+from bokeh.layouts import column, row
+from bokeh.models import ColumnDataSource, Div, NumeralTickFormatter
+from bokeh.plotting import figure
+from bokeh.server.server import Server
+import config
+from results_files import find_result_files
+
+class CsvTailer:
+    """
+    Follows a growing CSV file by byte offset. Each poll reads only the bytes
+    appended since the previous one, so the cost is O(new rows) regardless of
+    the file size. A partially written last line is kept until it is completed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.header = None
+        self.partial = b""
+
+    def read_new_rows(self):
+        """Returns the rows appended since the last call as a list of dicts."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            # New or truncated file: start over from the beginning
+            self.inode, self.offset, self.header, self.partial = st.st_ino, 0, None, b""
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        self.offset += len(chunk)
+
+        data = self.partial + chunk
+        complete, _, self.partial = data.rpartition(b"\n")
+        if not complete:
+            self.partial = data
+            return []
+
+        lines = complete.decode("utf-8-sig").splitlines()
+        if self.header is None:
+            self.header = [h.strip().replace("-", "_") for h in next(csv.reader([lines[0]]))]
+            lines = lines[1:]
+        return [dict(zip(self.header, values)) for values in csv.reader(io.StringIO("\n".join(lines))) if values]
+
+class RollingStats:
+    """
+    Rolling median and variance over the last `window` values, plus drift
+    detection against the median of the first `baseline` values.
+    Variance is maintained incrementally; the median is computed over the fixed
+    window, so each update costs O(window) independent of the run length.
+    """
+
+    def __init__(self, window, baseline, threshold):
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.baseline_values = []
+        self.baseline_size = baseline
+        self.baseline = None
+        self.threshold = threshold
+
+    def add(self, value):
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        if self.baseline is None:
+            self.baseline_values.append(value)
+            if len(self.baseline_values) >= self.baseline_size:
+                self.baseline = float(np.median(self.baseline_values))
+                self.baseline_values = None
+
+        n = len(self.values)
+        mean = self.total / n
+        variance = max(self.total_sq / n - mean * mean, 0.0) * n / (n - 1) if n > 1 else 0.0
+        median = float(np.median(self.values))
+        drift = self.baseline is not None and abs(median - self.baseline) / self.baseline > self.threshold
+        return median, variance, drift
+
+def find_active_files(results_dir):
+    """Picks the most recently modified client and server result CSVs in results_dir."""
+    latest = {}
+    for info in find_result_files(results_dir):
+        mtime = os.path.getmtime(info["path"])
+        if info["role"] not in latest or mtime > latest[info["role"]][0]:
+            latest[info["role"]] = (mtime, info["path"])
+    return [path for _, path in latest.values()]
+
+def build_dashboard(doc, paths, metric):
+    """Builds the dashboard document: one row of plots per tailed CSV file."""
+    panels = []
+    updaters = []
+    for path in paths:
+        tailer = CsvTailer(path)
+        stats = RollingStats(config.LIVE_WINDOW, config.LIVE_BASELINE, config.LIVE_DRIFT_THRESHOLD)
+        source = ColumnDataSource(data={"n": [], "value": [], "median": [], "std": [], "color": []})
+        status = Div(text=f"<b>{os.path.basename(path)}</b>: waiting for data…")
+
+        values_plot = figure(
+            title=f"{metric} — {os.path.basename(path)}",
+            x_axis_label="Row", y_axis_label=metric,
+            width=config.PLOT_WIDTH, height=config.PLOT_HEIGHT // 2,
+            background_fill_color=config.PLOT_BG_COLOR, output_backend="webgl"
+        )
+        values_plot.scatter("n", "value", source=source, size=4, color="color", alpha=0.6)
+        values_plot.line("n", "median", source=source, line_color="black", line_width=2,
+                         legend_label=f"Rolling median ({config.LIVE_WINDOW})")
+        values_plot.yaxis.formatter = NumeralTickFormatter(format="0,0")
+        values_plot.legend.location = "top_left"
+
+        std_plot = figure(
+            title="Rolling standard deviation",
+            x_axis_label="Row", y_axis_label=metric,
+            x_range=values_plot.x_range,
+            width=config.PLOT_WIDTH // 3, height=config.PLOT_HEIGHT // 2,
+            background_fill_color=config.PLOT_BG_COLOR, output_backend="webgl"
+        )
+        std_plot.line("n", "std", source=source, line_color="coral", line_width=2)
+        std_plot.yaxis.formatter = NumeralTickFormatter(format="0,0")
+
+        panels.append(column(status, row(values_plot, std_plot)))
+        updaters.append({"tailer": tailer, "stats": stats, "source": source, "status": status, "rows": 0})
+
+    def update():
+        for state in updaters:
+            tailer, stats, source, status = state["tailer"], state["stats"], state["source"], state["status"]
+            new = {"n": [], "value": [], "median": [], "std": [], "color": []}
+            drift = False
+            for raw in tailer.read_new_rows():
+                try:
+                    value = float(raw[metric])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                median, variance, drift = stats.add(value)
+                new["n"].append(state["rows"])
+                state["rows"] += 1
+                new["value"].append(value)
+                new["median"].append(median)
+                new["std"].append(variance ** 0.5)
+                new["color"].append("red" if drift else "indigo")
+            if not new["n"]:
+                continue
+            source.stream(new, rollover=config.LIVE_ROLLOVER)
+            flag = "<span style='color:red'>DRIFT</span>" if drift else "<span style='color:green'>stable</span>"
+            baseline = f"{stats.baseline:,.0f}" if stats.baseline is not None else "collecting"
+            status.text = (f"<b>{os.path.basename(tailer.path)}</b>: rows={new['n'][-1] + 1} "
+                           f"median={new['median'][-1]:,.0f} std={new['std'][-1]:,.0f} "
+                           f"baseline={baseline} — {flag}")
+
+    doc.add_root(column(*panels))
+    doc.title = "PQC Live Benchmark Dashboard"
+    update()
+    doc.add_periodic_callback(update, config.LIVE_POLL_MS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Live Bokeh dashboard that tails result CSVs during a run.")
+    parser.add_argument("csv_files", nargs="*", help="CSV files to tail (default: newest client and server files in RESULTS_DIR).")
+    parser.add_argument("--metric", default="cycles", help="Column to plot (default: cycles).")
+    parser.add_argument("--port", type=int, default=5006, help="Dashboard port (default: 5006).")
+    parser.add_argument("--allow-origin", action="append", default=[], help="Extra allowed websocket origin (host:port).")
+    args = parser.parse_args()
+
+    paths = args.csv_files or find_active_files(config.RESULTS_DIR)
+    if not paths:
+        print(f"Error: no result files found in {config.RESULTS_DIR}.")
+        return
+    for path in paths:
+        print(f"[INFO] Tailing {path}")
+
+    metric = args.metric.replace("-", "_")
+    app = Application(FunctionHandler(partial(build_dashboard, paths=paths, metric=metric)))
+    server = Server({"/": app}, port=args.port, allow_websocket_origin=[f"localhost:{args.port}"] + args.allow_origin)
+    server.start()
+    print(f"[INFO] Dashboard running at http://localhost:{args.port}/")
+    server.io_loop.start()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import atexit
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+from results_files import write_atomically
+
+# Per-iteration counters exposed as Prometheus counters/gauges
+TRACKED_METRICS = ["cycles", "instructions"]
+
+class MetricsExporter:
+    """
+    Publishes in-flight benchmark telemetry in the Prometheus text format, either
+    over HTTP or as a node_exporter textfile.
+
+    All state is allocated up front: scalar counters and a fixed-size ring buffer
+    per tracked metric. The measurement loop only calls observe()/record_*(),
+    which store a few numbers; formatting, statistics and I/O happen in a
+    background daemon thread, off the hot path. No lock is taken: single slot
+    writes are atomic under the GIL and the exporter only reads a copy.
+    """
+
+    def __init__(self, role, mode, window, interval):
+        self.role = role
+        self.mode = mode
+        self.window = window
+        self.interval = interval
+        self.labels = f'role="{role}",test="{config.TEST_NAME}",host="{socket.gethostname()}"'
+        self.iterations = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.last = {metric: 0.0 for metric in TRACKED_METRICS}
+        self.last_timestamp = 0.0
+        self.rings = {metric: array("d", [0.0] * window) for metric in TRACKED_METRICS}
+        self.ring_index = 0
+        self.ring_size = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.http_server = None
+        self.textfile = os.path.join(config.METRICS_TEXTFILE_DIR, f"pqc_{role}.prom")
+        self.state_file = self.textfile + ".state.json"
+
+    # --- Hot path ---
+
+    def observe(self, metrics):
+        """Records one completed iteration."""
+        slot = self.ring_index
+        for metric in TRACKED_METRICS:
+            value = metrics.get(metric, 0)
+            self.last[metric] = value
+            self.rings[metric][slot] = value
+        self.ring_index = (slot + 1) % self.window
+        if self.ring_size < self.window:
+            self.ring_size += 1
+        self.last_timestamp = time.time()
+        self.iterations += 1
+
+    def record_timeout(self):
+        self.timeouts += 1
+
+    def record_failure(self):
+        self.failures += 1
+
+    # --- Background side ---
+
+    def render(self):
+        """Formats the current state in the Prometheus text exposition format."""
+        size = self.ring_size
+        lines = []
+
+        def emit(name, kind, help_text, value, extra_labels=""):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            labels = self.labels + ("," + extra_labels if extra_labels else "")
+            lines.append(f"{name}{{{labels}}} {value}")
+
+        emit("pqc_iterations_total", "counter", "Completed benchmark iterations.", self.iterations)
+        emit("pqc_timeouts_total", "counter", "Iterations that timed out.", self.timeouts)
+        emit("pqc_failures_total", "counter", "Iterations whose measured command failed.", self.failures)
+        emit("pqc_last_iteration_timestamp_seconds", "gauge", "Unix time of the last completed iteration.", self.last_timestamp)
+        for metric in TRACKED_METRICS:
+            values = self.rings[metric][:size]
+            emit(f"pqc_last_{metric}", "gauge", f"{metric} counted in the last iteration.", self.last[metric])
+            if size:
+                name = f"pqc_rolling_{metric}"
+                lines.append(f"# HELP {name} Rolling statistics of {metric} over the last {self.window} iterations.")
+                lines.append(f"# TYPE {name} gauge")
+                stats = {
+                    "mean": statistics.fmean(values),
+                    "median": statistics.median(values),
+                    "min": min(values),
+                    "max": max(values),
+                    "stddev": statistics.stdev(values) if size > 1 else 0.0,
+                }
+                for stat, value in stats.items():
+                    lines.append(f'{name}{{{self.labels},stat="{stat}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        """Atomically replaces the textfile (node_exporter ignores partially written files)."""
+        write_atomically(self.textfile, self.render())
+        state = {
+            "test": config.TEST_NAME,
+            "iterations": self.iterations,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "last": self.last,
+            "last_timestamp": self.last_timestamp,
+            "rings": {metric: list(self.rings[metric]) for metric in TRACKED_METRICS},
+            "ring_index": self.ring_index,
+            "ring_size": self.ring_size,
+        }
+        write_atomically(self.state_file, json.dumps(state))
+
+    def restore_state(self):
+        """
+        Restores counters, the last-iteration gauges and the rolling window written
+        by a previous process of the same test, so one-process-per-iteration runs
+        keep monotonic counters and never export empty "last" gauges.
+        """
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if state.get("test") != config.TEST_NAME or len(next(iter(state["rings"].values()), [])) != self.window:
+            return
+        self.iterations, self.timeouts, self.failures = state["iterations"], state["timeouts"], state["failures"]
+        # States written before the gauges were persisted lack them
+        self.last.update({metric: value for metric, value in state.get("last", {}).items() if metric in self.last})
+        self.last_timestamp = state.get("last_timestamp", self.last_timestamp)
+        for metric in TRACKED_METRICS:
+            self.rings[metric] = array("d", state["rings"][metric])
+        self.ring_index, self.ring_size = state["ring_index"], state["ring_size"]
+
+    def start(self):
+        if self.mode == "http":
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = exporter.render().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self.http_server = ThreadingHTTPServer(("", config.METRICS_HTTP_PORT), Handler)
+            self.thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        elif self.mode == "textfile":
+            os.makedirs(config.METRICS_TEXTFILE_DIR, exist_ok=True)
+            self.restore_state()
+            self.thread = threading.Thread(target=self._textfile_loop, daemon=True)
+        else:
+            raise ValueError(f"Unknown METRICS_EXPORTER mode: {self.mode}")
+        self.thread.start()
+
+    def _textfile_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.write_textfile()
+
+    def stop(self):
+        """Stops the background thread; in textfile mode the final state is flushed."""
+        self.stop_event.set()
+        if self.http_server:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+        elif self.mode == "textfile":
+            self.thread.join()
+            self.write_textfile()
+
+def start_exporter(role):
+    """
+    Starts the exporter configured by config.METRICS_EXPORTER, or returns None when
+    disabled. The exporter is stopped (and its textfile flushed) at interpreter exit.
+    """
+    if not config.METRICS_EXPORTER:
+        return None
+    exporter = MetricsExporter(role, config.METRICS_EXPORTER, config.METRICS_WINDOW, config.METRICS_INTERVAL)
+    try:
+        exporter.start()
+    except OSError as e:
+        print(f"[WARN] Metrics exporter disabled: {e}", file=sys.stderr)
+        return None
+    atexit.register(exporter.stop)
+    return exporter
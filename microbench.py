@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import datetime
+import glob
+import importlib.util
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import config
+from results_files import find_test_pairs
+
+MICROBENCH_FIELDS = [
+    "timestamp", "host", "test_name", "kind", "algorithm", "operation", "backend",
+    "cores", "ops", "seconds", "ops_per_sec", "cycles_per_op", "instructions_per_op"
+]
+
+# SSH algorithm names -> primitives: (kind, algorithm) pairs
+SIGNATURE_PRIMITIVES = {
+    "ssh-ed25519": ["Ed25519"],
+    "ssh-falcon512": ["Falcon-512"],
+    "ssh-falcon1024": ["Falcon-1024"],
+    "ssh-mldsa44": ["ML-DSA-44"],
+    "ssh-mldsa65": ["ML-DSA-65"],
+    "ssh-mldsa87": ["ML-DSA-87"],
+    "ssh-sphincssha2128fsimple": ["SPHINCS+-SHA2-128f-simple"],
+    "ssh-sphincssha2256fsimple": ["SPHINCS+-SHA2-256f-simple"],
+    "ssh-rsa3072-falcon512": ["RSA-3072", "Falcon-512"],
+    "ssh-rsa3072-mldsa44": ["RSA-3072", "ML-DSA-44"],
+    "ssh-rsa3072-sphincssha2128fsimple": ["RSA-3072", "SPHINCS+-SHA2-128f-simple"],
+}
+KEX_PRIMITIVES = {
+    "curve25519-sha256@libssh.org": ["X25519"],
+    "mlkem768x25519-sha256": ["ML-KEM-768", "X25519"],
+    "mlkem1024-sha384": ["ML-KEM-1024"],
+    "sntrup761x25519-sha512@openssh.com": ["sntrup761", "X25519"],
+}
+OPERATIONS = {
+    "signature": ["keygen", "sign", "verify"],
+    "kem": ["keygen", "encaps", "decaps"],
+}
+
+# Operations each side performs in one handshake (host key and user key share KEY_TYPE in every test)
+HANDSHAKE_OPERATIONS = {
+    "client": {"kem": ["keygen", "decaps"], "signature": ["verify", "sign"]},
+    "server": {"kem": ["encaps"], "signature": ["sign", "verify"]},
+}
+
+MESSAGE = b"\x5a" * 64  # Roughly the size of the SSH exchange hash that gets signed
+
+def load_test_configs(config_dir):
+    """Loads every config_Test-*.py of config_dir as a module (they only assign constants)."""
+    configs = []
+    for path in sorted(glob.glob(os.path.join(config_dir, "config_Test-*.py"))):
+        spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        configs.append(module)
+    return configs
+
+def primitives_for(test_config):
+    """
+    Returns the primitives used by one test: a list of (kind, algorithm).
+    Plain 'ssh-rsa' takes its modulus size from TEST_NAME (e.g. Test-NH-Rsa-3072).
+    """
+    primitives = []
+    if test_config.KEY_TYPE == "ssh-rsa":
+        size = re.search(r"Rsa\w*-(\d+)", test_config.TEST_NAME)
+        primitives.append(("signature", f"RSA-{size.group(1) if size else 3072}"))
+    else:
+        primitives += [("signature", alg) for alg in SIGNATURE_PRIMITIVES.get(test_config.KEY_TYPE, [])]
+    primitives += [("kem", alg) for alg in KEX_PRIMITIVES.get(test_config.ALGORITHMS, [])]
+    return primitives
+
+def backend_for(algorithm):
+    """Classical primitives run through OpenSSL (cryptography), the others through liboqs."""
+    return "openssl" if algorithm in ("Ed25519", "X25519") or algorithm.startswith("RSA-") else "liboqs"
+
+def make_operation(algorithm, operation):
+    """
+    Prepares one primitive operation and returns a zero-argument callable that
+    performs it once. Keys, signatures and ciphertexts the operation consumes are
+    created here, outside the timed loop.
+    """
+    if backend_for(algorithm) == "liboqs":
+        import oqs
+        if algorithm in oqs.get_enabled_kem_mechanisms():
+            kem = oqs.KeyEncapsulation(algorithm)
+            public_key = kem.generate_keypair()
+            ciphertext, _ = kem.encap_secret(public_key)
+            return {"keygen": kem.generate_keypair,
+                    "encaps": lambda: kem.encap_secret(public_key),
+                    "decaps": lambda: kem.decap_secret(ciphertext)}[operation]
+        signer = oqs.Signature(algorithm)
+        public_key = signer.generate_keypair()
+        signature = signer.sign(MESSAGE)
+        return {"keygen": signer.generate_keypair,
+                "sign": lambda: signer.sign(MESSAGE),
+                "verify": lambda: signer.verify(MESSAGE, signature, public_key)}[operation]
+
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa, x25519
+    if algorithm == "X25519":
+        private_key = x25519.X25519PrivateKey.generate()
+        peer_key = x25519.X25519PrivateKey.generate().public_key()
+        # KEM view of ECDH: encaps = ephemeral key + shared secret, decaps = shared secret
+        return {"keygen": x25519.X25519PrivateKey.generate,
+                "encaps": lambda: x25519.X25519PrivateKey.generate().exchange(peer_key),
+                "decaps": lambda: private_key.exchange(peer_key)}[operation]
+    if algorithm == "Ed25519":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        public_key = private_key.public_key()
+        signature = private_key.sign(MESSAGE)
+        return {"keygen": ed25519.Ed25519PrivateKey.generate,
+                "sign": lambda: private_key.sign(MESSAGE),
+                "verify": lambda: public_key.verify(signature, MESSAGE)}[operation]
+    # RSA-<bits> with rsa-sha2-512 (PKCS#1 v1.5 over SHA-512), OpenSSH's default RSA signature
+    bits = int(algorithm.split("-")[1])
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=bits)
+    public_key = private_key.public_key()
+    signature = private_key.sign(MESSAGE, padding.PKCS1v15(), hashes.SHA512())
+    return {"keygen": lambda: rsa.generate_private_key(public_exponent=65537, key_size=bits),
+            "sign": lambda: private_key.sign(MESSAGE, padding.PKCS1v15(), hashes.SHA512()),
+            "verify": lambda: public_key.verify(signature, MESSAGE, padding.PKCS1v15(), hashes.SHA512())}[operation]
+
+def run_worker(algorithm, operation, seconds):
+    """Worker mode: repeats one operation for `seconds` and prints '<ops> <elapsed>'."""
+    op = make_operation(algorithm, operation)
+    ops = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        op()
+        ops += 1
+    print(f"{ops} {time.perf_counter() - start}")
+
+def parse_perf_csv(output):
+    """Parses 'perf stat -x,' output into {event: count}."""
+    counts = {}
+    for line in output.splitlines():
+        fields = line.split(",")
+        if len(fields) > 2 and fields[0].strip().isdigit():
+            counts[fields[2].split(":")[0]] = int(fields[0])
+    return counts
+
+def worker_command(algorithm, operation, seconds, core):
+    return ["taskset", "-c", str(core), sys.executable, os.path.abspath(__file__),
+            "--worker", algorithm, operation, str(seconds)]
+
+def measure_single_core(algorithm, operation, seconds, core):
+    """
+    Runs the worker under 'perf stat' twice, once for `seconds` and once with an
+    empty loop. Subtracting the second run removes interpreter startup, imports and
+    setup, leaving the cycles and instructions of the operations themselves.
+
+    Returns:
+        dict: ops, seconds, ops_per_sec, cycles_per_op, instructions_per_op; or None on failure.
+    """
+    perf = ["perf", "stat", "-x", ",", "-e", "cycles,instructions", "--"]
+    runs = []
+    for duration in (seconds, 0):
+        result = subprocess.run(perf + worker_command(algorithm, operation, duration, core),
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            reason = (result.stderr.strip().splitlines() or ["worker failed"])[-1]
+            print(f"[WARN] {algorithm} {operation} skipped: {reason}")
+            return None
+        ops, elapsed = result.stdout.split()
+        runs.append((int(ops), float(elapsed), parse_perf_csv(result.stderr)))
+    (ops, elapsed, counts), (_, _, baseline) = runs
+    if not ops:
+        return None
+    return {
+        "ops": ops, "seconds": round(elapsed, 6), "ops_per_sec": round(ops / elapsed, 2),
+        "cycles_per_op": round((counts.get("cycles", 0) - baseline.get("cycles", 0)) / ops),
+        "instructions_per_op": round((counts.get("instructions", 0) - baseline.get("instructions", 0)) / ops),
+    }
+
+def measure_multi_core(algorithm, operation, seconds, cores):
+    """Runs one pinned worker per core concurrently and returns the aggregate throughput."""
+    processes = [subprocess.Popen(worker_command(algorithm, operation, seconds, core),
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                 for core in range(cores)]
+    ops_total, rate_total = 0, 0.0
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            return None
+        ops, elapsed = output.split()
+        ops_total += int(ops)
+        rate_total += int(ops) / float(elapsed)
+    return {"ops": ops_total, "seconds": seconds, "ops_per_sec": round(rate_total, 2),
+            "cycles_per_op": None, "instructions_per_op": None}
+
+def handshake_crypto_cycles(primitives, per_op, side):
+    """Sums the single-core cycles of the operations `side` performs in one handshake."""
+    total = 0
+    for kind, algorithm in primitives:
+        for operation in HANDSHAKE_OPERATIONS[side][kind]:
+            result = per_op.get((algorithm, operation, 1))
+            if result is None:
+                return None
+            total += result["cycles_per_op"]
+    return total
+
+def print_overhead_summary(configs, per_op, results_dir):
+    """
+    Prints the estimated crypto cycles per handshake of each test and, when
+    end-to-end results are available, the share of the measured median they represent.
+    """
+    pairs = find_test_pairs(results_dir) if results_dir else {}
+    print("\n[INFO] Crypto cycles per handshake (estimated from the microbenchmarks):")
+    for test_config in configs:
+        primitives = primitives_for(test_config)
+        line = f"   • {test_config.TEST_NAME}:"
+        for side in ("client", "server"):
+            crypto = handshake_crypto_cycles(primitives, per_op, side)
+            if crypto is None:
+                line += f" {side}=n/a"
+                continue
+            line += f" {side}={crypto:,}"
+            path = pairs.get(test_config.TEST_NAME, {}).get(side)
+            if path:
+                with open(path, newline="") as f:
+                    cycles = [int(row["cycles"]) for row in csv.DictReader(f) if row.get("cycles", "").isdigit()]
+                if cycles:
+                    median = statistics.median(cycles)
+                    line += f" ({100 * crypto / median:.1f}% of {median:,.0f}, overhead {median - crypto:,.0f})"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark the signature and KEM primitives used by each test config, outside SSH.")
+    parser.add_argument("--worker", nargs=3, metavar=("ALGORITHM", "OPERATION", "SECONDS"), help=argparse.SUPPRESS)
+    parser.add_argument("--config-dir", default="config_files", help="Directory with the config_Test-*.py files (default: config_files).")
+    parser.add_argument("--tests", nargs="+", help="Only these TEST_NAMEs (default: all).")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Measurement time per operation (default: 2).")
+    parser.add_argument("--core", type=int, default=0, help="Core used for the single-core measurements (default: 0).")
+    parser.add_argument("--cores", type=int, default=os.cpu_count(), help="Cores used for the scaling measurement (default: all; 1 disables it).")
+    parser.add_argument("--output", help="Output CSV (default: RESULTS_DIR/<host>-<YYYYMMDD>-microbench.csv).")
+    parser.add_argument("--compare", metavar="DIR", help="Results directory with end-to-end runs to compute the SSH overhead against.")
+    args = parser.parse_args()
+
+    if args.worker:
+        algorithm, operation, seconds = args.worker
+        run_worker(algorithm, operation, float(seconds))
+        return
+
+    configs = [c for c in load_test_configs(args.config_dir) if not args.tests or c.TEST_NAME in args.tests]
+    if not configs:
+        print(f"Error: no test configs found in {args.config_dir}.")
+        return
+
+    # Tests share primitives (e.g. ML-KEM-768 + X25519), so each one is measured once
+    unique = sorted({p for c in configs for p in primitives_for(c)})
+    per_op = {}
+    for kind, algorithm in unique:
+        for operation in OPERATIONS[kind]:
+            print(f"[INFO] {algorithm} {operation}…")
+            result = measure_single_core(algorithm, operation, args.seconds, args.core)
+            if result is None:
+                continue
+            per_op[(algorithm, operation, 1)] = result
+            print(f"   • 1 core: {result['cycles_per_op']:,} cycles/op, {result['ops_per_sec']:,.1f} ops/s")
+            if args.cores > 1:
+                scaled = measure_multi_core(algorithm, operation, args.seconds, args.cores)
+                if scaled:
+                    per_op[(algorithm, operation, args.cores)] = scaled
+                    print(f"   • {args.cores} cores: {scaled['ops_per_sec']:,.1f} ops/s")
+
+    host = socket.gethostname()
+    output = args.output or os.path.join(config.RESULTS_DIR, f"{host}-{datetime.datetime.now():%Y%m%d}-microbench.csv")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    timestamp = datetime.datetime.now().isoformat()
+    with open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MICROBENCH_FIELDS)
+        writer.writeheader()
+        for test_config in configs:
+            for kind, algorithm in primitives_for(test_config):
+                for (alg, operation, cores), result in per_op.items():
+                    if alg == algorithm:
+                        writer.writerow(dict(result, timestamp=timestamp, host=host, test_name=test_config.TEST_NAME,
+                                             kind=kind, algorithm=algorithm, operation=operation,
+                                             backend=backend_for(algorithm), cores=cores))
+    print(f"\n[INFO] Microbenchmark results written to: {output}")
+
+    print_overhead_summary(configs, per_op, args.compare)
+
+if __name__ == "__main__":
+    main()
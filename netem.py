@@ -0,0 +1,72 @@
+import atexit
+import subprocess
+import sys
+
+# Named network conditions. rtt_ms is the round-trip time added to every
+# connection; the delay applied on the shaped interface is derived from it.
+PROFILES = {
+    "lan":              {"rtt_ms": 0.5,  "jitter_ms": 0.1, "loss_pct": 0.0, "rate": None},
+    "datacenter":       {"rtt_ms": 1,    "jitter_ms": 0.2, "loss_pct": 0.0, "rate": None},
+    "metro":            {"rtt_ms": 10,   "jitter_ms": 1,   "loss_pct": 0.0, "rate": None},
+    "cross-region":     {"rtt_ms": 80,   "jitter_ms": 2,   "loss_pct": 0.0, "rate": None},
+    "intercontinental": {"rtt_ms": 200,  "jitter_ms": 5,   "loss_pct": 0.0, "rate": None},
+    "lossy-mobile":     {"rtt_ms": 120,  "jitter_ms": 30,  "loss_pct": 2.0, "rate": "10mbit"},
+    "satellite":        {"rtt_ms": 600,  "jitter_ms": 20,  "loss_pct": 0.5, "rate": "20mbit"},
+}
+
+def netem_arguments(profile, interface):
+    """
+    Builds the 'tc ... netem' arguments of a profile. Only egress is shaped: on a
+    real interface the delay is added once per round trip, while on loopback
+    both directions cross the same qdisc, so each direction gets half of it.
+    """
+    spec = PROFILES[profile]
+    share = 0.5 if interface == "lo" else 1.0
+    args = ["delay", f"{spec['rtt_ms'] * share}ms"]
+    if spec["jitter_ms"]:
+        args += [f"{spec['jitter_ms'] * share}ms"]
+    if spec["loss_pct"]:
+        args += ["loss", f"{spec['loss_pct'] * share}%"]
+    if spec["rate"]:
+        args += ["rate", spec["rate"]]
+    return args
+
+def route_interface(host):
+    """The interface the kernel routes traffic to `host` through ('ip route get'), or None."""
+    result = subprocess.run(["ip", "-o", "route", "get", host], capture_output=True, text=True)
+    fields = result.stdout.split()
+    return fields[fields.index("dev") + 1] if "dev" in fields else None
+
+def clear_profile(interface):
+    """Removes the netem qdisc, restoring the interface's default queueing."""
+    subprocess.run(["tc", "qdisc", "del", "dev", interface, "root"],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def apply_profile(profile, interface, host):
+    """
+    Applies a named profile for the rest of the process (requires root) on the
+    interface that carries the traffic to `host`: the given one, or the routed
+    one when `interface` is None. An interface the traffic does not cross is
+    refused, since the run would be labelled with a profile it never had. The
+    qdisc is removed again when the interpreter exits.
+    """
+    if profile not in PROFILES:
+        print(f"Error: unknown netem profile '{profile}'. Available: {', '.join(PROFILES)}", file=sys.stderr)
+        sys.exit(1)
+    routed = route_interface(host)
+    if routed is None:
+        print(f"Error: no route to {host}; cannot tell which interface to shape.", file=sys.stderr)
+        sys.exit(1)
+    if interface is None:
+        interface = routed
+    elif interface != routed:
+        print(f"Error: traffic to {host} leaves through {routed}, not NETEM_INTERFACE = '{interface}'. "
+              "Set NETEM_INTERFACE to None or to that interface.", file=sys.stderr)
+        sys.exit(1)
+    command = ["tc", "qdisc", "replace", "dev", interface, "root", "netem"] + netem_arguments(profile, interface)
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Error: could not apply netem profile '{profile}' on {interface}: {result.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+    atexit.register(clear_profile, interface)
+    print(f"[INFO] Network profile '{profile}' applied on {interface}: {' '.join(command[6:])}")
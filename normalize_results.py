@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from results_files import find_result_files, find_test_pairs
+
+SERVER_CONFIG_SUFFIX_RE = re.compile(r"-sshd_config[^/]*\.csv$")
+
+def normalized_name(path):
+    """Server files drop the '-sshd_config_*' suffix; client names are already final."""
+    return SERVER_CONFIG_SUFFIX_RE.sub(".csv", path)
+
+def normalize_header(header_line):
+    """Hyphens become underscores (cache-misses -> cache_misses)."""
+    return header_line.replace("-", "_")
+
+def is_normalized(path, header_line):
+    """A file is normalized when it has the iteration column, no hyphens in the header and its final name."""
+    return (header_line.split(",", 1)[0] == "iteration" and "-" not in header_line
+            and normalized_name(path) == path)
+
+def normalize_file(src, dest, remove_source=False):
+    """
+    Normalizes one result CSV in a single read/write pass:
+      - adds the 'iteration' column (0-based) when missing (server files),
+      - replaces hyphens with underscores in the header,
+      - writes to a temporary file next to `dest` and atomically renames it.
+    With remove_source (in-place mode), a source renamed to a new name is removed.
+
+    Returns:
+        str: 'normalized' or 'skipped'.
+    """
+    with open(src, "r", encoding="utf-8-sig", newline="") as fin:
+        header = fin.readline().rstrip("\r\n")
+        if src == dest and is_normalized(src, header):
+            return "skipped"
+
+        add_iteration = header.split(",", 1)[0] != "iteration"
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as fout:
+            fout.write(("iteration," if add_iteration else "") + normalize_header(header) + "\n")
+            iteration = 0
+            for line in fin:
+                line = line.rstrip("\r\n")
+                if not line:
+                    continue
+                fout.write(f"{iteration},{line}\n" if add_iteration else line + "\n")
+                iteration += 1
+
+    os.replace(tmp, dest)
+    if remove_source and src != dest:
+        os.remove(src)
+    return "normalized"
+
+def destination_for(path, base, dest_base):
+    """Maps a source file to its normalized path (in place, or mirrored under dest_base)."""
+    target = normalized_name(path)
+    if dest_base:
+        target = os.path.join(dest_base, os.path.relpath(target, base))
+    return target
+
+def csv_header(path):
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+def union(columns, new_columns):
+    """Appends the columns not seen yet, keeping the first-seen order."""
+    columns += [c for c in new_columns if c not in columns]
+
+def write_paired_dataset(base, output_csv):
+    """
+    Joins the client and server rows of every test by iteration into one CSV:
+    test_name, iteration, client_<column>..., server_<column>...
+    Each side keeps its own columns (e.g. server phase/breakdown fields), united
+    over all tests; a test without a column leaves it empty. Only the headers
+    are read up front; server rows are indexed in memory (one test at a time)
+    and client rows are streamed.
+    """
+    pairs = {}
+    client_columns, server_columns = [], []
+    for test_name, pair in find_test_pairs(base).items():
+        if not pair["client"] or not pair["server"]:
+            print(f"[INFO] Skipping {test_name} in the paired dataset: missing {'client' if not pair['client'] else 'server'} results.")
+            continue
+        pairs[test_name] = pair
+        union(client_columns, [c for c in csv_header(pair["client"]) if c != "iteration"])
+        union(server_columns, [c for c in csv_header(pair["server"]) if c != "iteration"])
+
+    rows_written = 0
+    with open(output_csv, "w", newline="") as fout:
+        fieldnames = (["test_name", "iteration"] + [f"client_{c}" for c in client_columns]
+                      + [f"server_{c}" for c in server_columns])
+        writer = csv.DictWriter(fout, fieldnames=fieldnames)
+        writer.writeheader()
+        for test_name, pair in pairs.items():
+            with open(pair["server"], newline="") as f:
+                server_rows = {row["iteration"]: row for row in csv.DictReader(f)}
+            with open(pair["client"], newline="") as f:
+                for client_row in csv.DictReader(f):
+                    server_row = server_rows.get(client_row["iteration"])
+                    if server_row is None:
+                        continue
+                    paired = {"test_name": test_name, "iteration": client_row["iteration"]}
+                    paired.update({f"client_{c}": client_row.get(c) for c in client_columns})
+                    paired.update({f"server_{c}": server_row.get(c) for c in server_columns})
+                    writer.writerow(paired)
+                    rows_written += 1
+    print(f"[INFO] Paired dataset written to {output_csv} ({rows_written} rows).")
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize result CSVs (iteration column, header names, file names) in a single pass per file.")
+    parser.add_argument("base", nargs="?", default="Results-Static", help="Results directory to normalize (default: Results-Static).")
+    parser.add_argument("--dest", help="Write normalized files under this directory instead of in place.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Files processed concurrently (default: all CPUs).")
+    parser.add_argument("--paired", metavar="CSV", help="Also write a client/server dataset joined by iteration.")
+    args = parser.parse_args()
+
+    files = [info["path"] for info in find_result_files(args.base)]
+    print(f"[INFO] {len(files)} result file(s) found in {args.base}.")
+
+    def process(path):
+        target = destination_for(path, args.base, args.dest)
+        return path, target, normalize_file(path, target, remove_source=not args.dest)
+
+    counts = {"normalized": 0, "skipped": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for future, path in [(pool.submit(process, path), path) for path in files]:
+            try:
+                _, target, status = future.result()
+            except (OSError, UnicodeDecodeError) as e:
+                counts["failed"] += 1
+                print(f"[ERROR] {path}: {e}")
+                continue
+            counts[status] += 1
+            if status == "normalized":
+                print(f"   • {os.path.basename(path)}  →  {os.path.basename(target)}")
+
+    print(f"[INFO] Normalized {counts['normalized']}, already normalized {counts['skipped']}, failed {counts['failed']}.")
+
+    if args.paired:
+        write_paired_dataset(args.dest or args.base, args.paired)
+
+if __name__ == "__main__":
+    main()
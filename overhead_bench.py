@@ -0,0 +1,273 @@
+#!/usr/bin/python3
+
+import argparse
+import atexit
+import csv
+import datetime
+import importlib.util
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Like interleaved_run.py, this script builds its own config (a test config with
+# stand-in binaries and one collection backend) and installs it as sys.modules["config"]
+# before the harness modules are imported, each stage in a fresh worker process.
+
+OVERHEAD_FIELDS = [
+    "timestamp", "host", "stage", "backend", "iterations", "wall_ms_per_iteration",
+    "cycles_per_iteration", "measured_cycles_median", "status"
+]
+
+# Collection backends, as config overrides on top of a plain run
+CLIENT_BACKENDS = {
+    "plain": {},
+    "wire": {"WIRE_CAPTURE": True},
+    "cgroup": {"CGROUP_ACCOUNTING": True},
+    "energy": {"ENERGY_BACKEND": "auto"},
+    "hdr": {"HDR_HISTOGRAMS": True},
+    "syscalls": {"SYSCALL_PROFILE": True},
+}
+SERVER_BACKENDS = {
+    "plain": {},
+    "phase-split": {"SERVER_PHASE_SPLIT": True},
+    "breakdown": {"SERVER_PROCESS_BREAKDOWN": True},
+    "cgroup": {"CGROUP_ACCOUNTING": True},
+    "energy": {"ENERGY_BACKEND": "auto"},
+    "hdr": {"HDR_HISTOGRAMS": True},
+    "syscalls": {"SYSCALL_PROFILE": True},
+}
+# Stages: what one iteration of each part of the pipeline costs on its own
+STAGES = {
+    "exec": ["plain"],                 # fork/exec of the stand-in from Python
+    "perf": ["plain"],                 # the same under 'perf stat', output parsed
+    "launch": ["plain"],               # one interpreter start + imports, as each interleaved_run.py server worker
+    "client": list(CLIENT_BACKENDS),   # a full client_perf.py iteration against 'true'
+    "server": list(SERVER_BACKENDS),   # a server_perf.py loop iteration against a loopback echo server
+}
+
+CLIENT_PAUSE_S = 2  # fixed pause of every client_perf.py iteration, subtracted from its wall time
+
+# Stand-in for sshd: accepts connections on loopback, echoes them and signals the
+# harness on the first one, like the REMOTE_COMMAND of a real test
+ECHO_SERVER = """
+import socket, sys
+port, signal_file = int(sys.argv[1]), sys.argv[2]
+listener = socket.socket()
+listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+listener.bind(("127.0.0.1", port))
+listener.listen()
+while True:
+    connection, _ = listener.accept()
+    with connection:
+        while data := connection.recv(4096):
+            connection.sendall(data)
+    open(signal_file, "w").close()
+"""
+
+def load_config(path):
+    spec = importlib.util.spec_from_file_location("config", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def stand_in_config(base_config, workdir, backend_overrides, port):
+    """A test config measuring stand-ins, with every optional collector off except the backend's."""
+    cfg = load_config(base_config)
+    echo_path = os.path.join(workdir, "echo_server.py")
+    with open(echo_path, "w") as f:
+        f.write(ECHO_SERVER)
+    signal_file = os.path.join(workdir, "signal")
+    overrides = {
+        "DEBUG_MODE": False, "RESULTS_DIR": os.path.join(workdir, "results"), "SIGNAL_FILE": signal_file,
+        "CLIENT_BINARY": shutil.which("true"), "CLIENT_ARGS": [], "CLIENT_SSH_HOST": "127.0.0.1", "CLIENT_SSH_PORT": port,
+        "SERVER_BINARY": sys.executable, "SERVER_ARGS": [echo_path, str(port), signal_file], "PORT_TO_CHECK": port,
+        "METRICS_EXPORTER": None, "NETEM_PROFILE": None, "BUILDS": None, "BULK_TRANSFER": False,
+        "WIRE_CAPTURE": False, "CGROUP_ACCOUNTING": False, "ENERGY_BACKEND": None, "HDR_HISTOGRAMS": False,
+        "SYSCALL_PROFILE": False, "SERVER_PHASE_SPLIT": False, "SERVER_PROCESS_BREAKDOWN": False,
+        "ENV_FINGERPRINT": False,
+    }
+    overrides.update(backend_overrides)
+    for name, value in overrides.items():
+        setattr(cfg, name, value)
+    return cfg
+
+def poke(port, timeout=30):
+    """Plays the client of one server iteration: connects once the stand-in listens, exchanges a message."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as connection:
+                connection.sendall(b"ping")
+                connection.recv(4)
+            return
+        except OSError:
+            time.sleep(0.01)
+
+def run_stage(stage, backend, iterations, base_config, port):
+    """
+    Worker: runs `iterations` iterations of one stage with one backend and returns
+    the wall time and the cycles the harness's own perf counted for the stand-in.
+    """
+    workdir = tempfile.mkdtemp(prefix="pqc-overhead-")
+    # Registered first, so it runs after the harness's own atexit snapshots (HDR, syscall profile)
+    atexit.register(shutil.rmtree, workdir, True)
+    overrides = (CLIENT_BACKENDS if stage == "client" else SERVER_BACKENDS).get(backend, {})
+    cfg = stand_in_config(base_config, workdir, overrides, port)
+    sys.modules["config"] = cfg
+    measured = []
+    started = time.monotonic()
+    if stage == "exec":
+        for _ in range(iterations):
+            subprocess.run([cfg.CLIENT_BINARY])
+    elif stage == "perf":
+        from client_perf import execute_perf_on_client, parse_perf_output
+        for _ in range(iterations):
+            output, _ = execute_perf_on_client(cfg.PERF_COMMAND + ["--", cfg.CLIENT_BINARY])
+            measured.append(parse_perf_output(output)["cycles"])
+    elif stage == "launch":
+        shutil.copy(base_config, os.path.join(workdir, "config.py"))
+        repo = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([workdir, repo]))
+        for _ in range(iterations):
+            subprocess.run([sys.executable, "-c", "import server_perf"], cwd=workdir, env=env, check=True)
+    elif stage == "client":
+        import client_perf
+        cfg.ITERATIONS = iterations
+        client_perf.run_client_benchmark()
+        with open(client_perf.generate_output_filename(), newline="") as f:
+            measured = [int(row["cycles"]) for row in csv.DictReader(f)]
+    elif stage == "server":
+        import server_perf
+        # As run_server_loop.sh: one run, a fresh stand-in server per iteration
+        run = server_perf.open_run()
+        try:
+            for iteration in range(iterations):
+                client = threading.Thread(target=poke, args=(port,), daemon=True)
+                client.start()
+                server_perf.serve_iteration(run, iteration)
+                client.join()
+        finally:
+            server_perf.close_run(run)
+        with open(server_perf.generate_output_filename(), newline="") as f:
+            measured = [int(row["cycles"]) for row in csv.DictReader(f)]
+    wall = time.monotonic() - started
+    if stage == "client":
+        wall -= CLIENT_PAUSE_S * iterations
+    return {"wall_s": wall, "measured": measured}
+
+def measure(stage, backend, iterations, base_config, port):
+    """
+    Runs one worker under an outer 'perf stat', which counts the cycles of the
+    whole tree (interpreter, nested perf, stand-ins, collectors).
+
+    Returns:
+        dict: wall seconds, total cycles and the harness-measured cycles, or None on failure.
+    """
+    command = ["perf", "stat", "-x", ",", "-e", "cycles", "--", sys.executable, os.path.abspath(__file__),
+               "--worker", stage, backend, str(iterations), "--config", base_config, "--port", str(port)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        tail = (result.stderr.strip().splitlines() or ["?"])[-1]
+        print(f"[WARN] {stage}/{backend} failed: {tail}")
+        return None
+    cycles = None
+    for line in result.stderr.splitlines():
+        fields = line.split(",")
+        if len(fields) > 2 and fields[2].startswith("cycles"):
+            cycles = int(fields[0]) if fields[0].isdigit() else None
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return dict(report, cycles=cycles)
+
+def generate_output_filename(results_dir):
+    timestamp = datetime.datetime.now().strftime("%Y%m%d")
+    return os.path.join(results_dir, f"{socket.gethostname()}-{timestamp}-overhead.csv")
+
+def compare_with_baseline(rows, baseline_path):
+    """Prints the change of every stage/backend against a previous overhead CSV."""
+    with open(baseline_path, newline="") as f:
+        baseline = {(r["stage"], r["backend"]): r for r in csv.DictReader(f) if r["status"] == "ok"}
+    print(f"\n[INFO] Against baseline {baseline_path}:")
+    for row in rows:
+        before = baseline.get((row["stage"], row["backend"]))
+        if not before or row["status"] != "ok":
+            continue
+        wall_delta = row["wall_ms_per_iteration"] - float(before["wall_ms_per_iteration"])
+        cycles_delta = ""
+        if row["cycles_per_iteration"] is not None and before["cycles_per_iteration"]:
+            change = row["cycles_per_iteration"] / float(before["cycles_per_iteration"]) - 1
+            cycles_delta = f", cycles {change:+.1%}"
+        print(f"   • {row['stage']}/{row['backend']}: wall {wall_delta:+.2f} ms/iteration{cycles_delta}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the harness's own overhead per iteration against stand-in binaries.")
+    parser.add_argument("--config", default="config_files/config_Test-T-Ed25519.py", help="Test config the stand-in runs are based on.")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations per stage and backend (default: 20).")
+    parser.add_argument("--stages", nargs="*", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--port", type=int, default=2399, help="Loopback port of the echo stand-in (default: 2399).")
+    parser.add_argument("--results-dir", default="Results", help="Where to write the overhead CSV (default: Results).")
+    parser.add_argument("--baseline", help="Previous overhead CSV to compare against.")
+    parser.add_argument("--worker", nargs=3, metavar=("STAGE", "BACKEND", "ITERATIONS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        stage, backend, iterations = args.worker
+        report = run_stage(stage, backend, int(iterations), os.path.abspath(args.config), args.port)
+        # The harness prints its own progress; the report is the last stdout line
+        print(json.dumps(report))
+        return
+
+    if not shutil.which("perf"):
+        print("Error: perf is required.", file=sys.stderr)
+        sys.exit(1)
+    config_path = os.path.abspath(args.config)
+    # Interpreter start-up of the worker itself, subtracted from every stage
+    startup = measure("exec", "plain", 0, config_path, args.port)
+    if not startup:
+        print("Error: could not run the overhead worker under perf.", file=sys.stderr)
+        sys.exit(1)
+
+    rows = []
+    for stage in args.stages:
+        for backend in STAGES[stage]:
+            print(f"[INFO] {stage}/{backend}: {args.iterations} iterations...")
+            result = measure(stage, backend, args.iterations, config_path, args.port)
+            row = {"timestamp": datetime.datetime.now().isoformat(), "host": socket.gethostname(),
+                   "stage": stage, "backend": backend, "iterations": args.iterations,
+                   "wall_ms_per_iteration": None, "cycles_per_iteration": None,
+                   "measured_cycles_median": None, "status": "failed"}
+            if result:
+                row["wall_ms_per_iteration"] = round(result["wall_s"] * 1000 / args.iterations, 3)
+                if result["cycles"] is not None and startup["cycles"] is not None:
+                    row["cycles_per_iteration"] = round((result["cycles"] - startup["cycles"]) / args.iterations)
+                if result["measured"]:
+                    row["measured_cycles_median"] = round(statistics.median(result["measured"]))
+                row["status"] = "ok"
+            rows.append(row)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    output_file = generate_output_filename(args.results_dir)
+    with open(output_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=OVERHEAD_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print("\n[INFO] Harness overhead per iteration (stand-ins: 'true' and a loopback echo server):")
+    for row in rows:
+        if row["status"] != "ok":
+            print(f"   • {row['stage']:<7} {row['backend']:<12} failed")
+            continue
+        print(f"   • {row['stage']:<7} {row['backend']:<12} wall {row['wall_ms_per_iteration']:>9.2f} ms   "
+              f"cycles {row['cycles_per_iteration'] or 0:>14,}   measured by perf {row['measured_cycles_median'] or '-'}")
+    print(f"\n[INFO] Overhead results written to: {output_file}")
+    if args.baseline:
+        compare_with_baseline(rows, args.baseline)
+
+if __name__ == "__main__":
+    main()
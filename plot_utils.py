@@ -0,0 +1,180 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from bokeh.models import ColumnDataSource, CustomJS
+
+# Columns loaded from each result CSV; they are prefixed with the role in the shared source.
+PLOT_METRICS = ["cycles", "instructions"]
+
+def lttb_indices(x, y, n_out):
+    """
+    Selects the indices of the points kept by the Largest-Triangle-Three-Buckets
+    algorithm, preserving the visual shape (peaks and dips) of the series.
+
+    Args:
+        x (np.ndarray): Monotonic x values.
+        y (np.ndarray): y values, same length as x.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted integer indices into x/y.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Bucket boundaries for the n - 2 interior points
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+def downsample_indices(x, columns, n_out):
+    """
+    Computes a common set of row indices for several series sharing one x axis,
+    so they can stay in a single ColumnDataSource. Each series is reduced with
+    LTTB over its non-missing values and the selections are merged.
+    """
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    selected = [np.array([0, len(x) - 1])]
+    for y in columns:
+        valid = np.flatnonzero(~np.isnan(y))
+        if len(valid):
+            selected.append(valid[lttb_indices(x[valid], y[valid], n_out)])
+    return np.unique(np.concatenate(selected))
+
+def load_merged_results(server_csv, client_csv, metrics=PLOT_METRICS):
+    """
+    Reads the server and client CSVs and outer-joins them on the iteration column.
+
+    Returns:
+        dict: Column name -> float64 array ('iteration', 'server_<metric>', 'client_<metric>').
+              Iterations missing on one side are NaN, which Bokeh renders as gaps.
+    """
+    df_server = pd.read_csv(server_csv, usecols=["iteration"] + metrics)
+    df_client = pd.read_csv(client_csv, usecols=["iteration"] + metrics)
+    merged = pd.merge(
+        df_server.add_prefix("server_").rename(columns={"server_iteration": "iteration"}),
+        df_client.add_prefix("client_").rename(columns={"client_iteration": "iteration"}),
+        on="iteration", how="outer"
+    ).sort_values("iteration")
+    # Plain float64 arrays are sent to the browser as binary buffers instead of JSON lists
+    return {column: merged[column].to_numpy(dtype=np.float64) for column in merged.columns}
+
+def build_shared_source(data, threshold):
+    """
+    Builds the ColumnDataSource shared by every renderer of a plot. Series longer
+    than `threshold` points are LTTB-downsampled.
+
+    Returns:
+        tuple: (source, full_data) where full_data is the full-resolution data
+               if it was downsampled, or None otherwise.
+    """
+    x = data["iteration"]
+    if len(x) <= threshold:
+        return ColumnDataSource(data=data), None
+
+    columns = [values for name, values in data.items() if name != "iteration"]
+    keep = downsample_indices(x, columns, threshold)
+    reduced = {name: values[keep] for name, values in data.items()}
+    return ColumnDataSource(data=reduced), data
+
+def full_data_filename(output_html):
+    """Sidecar script with the full-resolution rows, next to the plot HTML."""
+    return os.path.splitext(output_html)[0] + ".full.js"
+
+def write_full_data(full_data, output_html):
+    """
+    Writes the full-resolution rows to the sidecar script, which registers them
+    under its file name in window.PQC_FULL_DATA. A <script> tag also loads from
+    file:// pages, where fetch/AjaxDataSource are blocked.
+
+    Returns:
+        str: the sidecar file name (relative to the HTML).
+    """
+    path = full_data_filename(output_html)
+    name = os.path.basename(path)
+    # NaN (iterations missing on one side) becomes null, which Bokeh also renders as a gap;
+    # counters are integral and written without a fraction
+    columns = {column: [None if v != v else int(v) if v.is_integer() else v for v in values.tolist()]
+               for column, values in full_data.items()}
+    with open(path, "w") as f:
+        f.write(f"(window.PQC_FULL_DATA = window.PQC_FULL_DATA || {{}})[{json.dumps(name)}] = {json.dumps(columns)};\n")
+    return name
+
+def attach_full_resolution_zoom(p, source, full_data, threshold, output_html):
+    """
+    Swaps the full-resolution rows into `source` when the visible x window holds
+    at most `threshold` points, and restores the downsampled view otherwise.
+    The full rows are not embedded in the HTML (which would undo the size gain
+    of downsampling): they go to a sidecar script loaded on the first zoom, to
+    be kept next to the HTML. The downsampled rows are kept in the page on the
+    first swap, not serialized a second time.
+    """
+    name = write_full_data(full_data, output_html)
+    x = full_data["iteration"]
+    callback = CustomJS(args=dict(source=source, threshold=threshold, range=p.x_range, name=name,
+                                  n_full=len(x), x_min=float(x[0]), x_max=float(x[-1])), code="""
+        const store = window.PQC_FULL_DATA = window.PQC_FULL_DATA || {};
+        const update = () => {
+            const start = range.start;
+            const end = range.end;
+            const full = store[name];
+            if (full === undefined) {
+                // Iterations are near-uniform: estimate the visible rows before loading anything
+                const estimate = n_full * (end - start) / Math.max(x_max - x_min, 1);
+                if (estimate <= threshold && !store["loading:" + name]) {
+                    store["loading:" + name] = true;
+                    const script = document.createElement("script");
+                    script.src = name;
+                    script.onload = update;
+                    script.onerror = () => console.warn("Full-resolution data not found: " + name);
+                    document.head.appendChild(script);
+                }
+                return;
+            }
+            const x = full.iteration;
+            let lo = 0, hi = x.length;
+            while (lo < hi) { const mid = (lo + hi) >> 1; if (x[mid] < start) lo = mid + 1; else hi = mid; }
+            const first = lo;
+            hi = x.length;
+            while (lo < hi) { const mid = (lo + hi) >> 1; if (x[mid] <= end) lo = mid + 1; else hi = mid; }
+            const last = lo;
+            const reduced = "reduced:" + name;
+            if (last - first <= threshold) {
+                if (!(reduced in store)) {
+                    store[reduced] = source.data;
+                }
+                const data = {};
+                for (const key of Object.keys(full)) {
+                    data[key] = full[key].slice(Math.max(first - 1, 0), Math.min(last + 1, x.length));
+                }
+                source.data = data;
+                store["zoomed:" + name] = true;
+            } else if (store["zoomed:" + name]) {
+                source.data = Object.assign({}, store[reduced]);
+                store["zoomed:" + name] = false;
+            }
+        };
+        update();
+    """)
+    p.x_range.js_on_change("start", callback)
+    p.x_range.js_on_change("end", callback)
+    return name
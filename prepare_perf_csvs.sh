@@ -1,30 +1,9 @@
 #!/usr/bin/env bash
 set -euo pipefail
-BASE="Results-Static"               # pasta raiz
-
-echo "➜ 1/3  Adicionando coluna iteration aos arquivos server..."
-for f in "$BASE/server-results/"*.csv; do
-  echo "   • $f"
-  tmp=$(mktemp)
-  awk 'BEGIN{FS=OFS=","}
-       NR==1   {print "iteration,"$0; next}
-       {print NR-2","$0}' "$f" > "$tmp"
-  mv "$tmp" "$f"
-done
-
-echo "➜ 2/3  Padronizando cabeçalhos (hífen → sublinhado)..."
-for dir in client-results server-results; do
-  for f in "$BASE/$dir"/*.csv; do
-    sed -i '1s/-/_/g' "$f"
-  done
-done
-
-echo "➜ 3/3  Renomeando arquivos server (removendo -sshd_config_*)..."
-for f in "$BASE/server-results/"*-sshd_config_*.csv; do
-  new="$(echo "$f" | sed -E 's/-sshd_config[^/]*\.csv$/.csv/')"
-  echo "   • $(basename "$f")  →  $(basename "$new")"
-  mv "$f" "$new"
-done
-
-echo "✔  Concluído."
+BASE="${1:-Results-Static}"         # pasta raiz
 
+# A normalização (coluna iteration, cabeçalhos hífen → sublinhado e remoção do
+# sufixo -sshd_config_* dos arquivos server) é feita em uma única passada por
+# arquivo, com substituição atômica, pelo normalize_results.py. Executar de novo
+# é seguro: arquivos já normalizados são ignorados.
+exec python3 "$(dirname "$0")/normalize_results.py" "$BASE"
@@ -0,0 +1,97 @@
+import re
+import subprocess
+
+# Roles in the OpenSSH server process tree, by position under the listener:
+#   listener -> per-connection privsep monitor -> unprivileged pre-auth child (first fork)
+#                                              -> post-auth session child (later forks) -> shell/command
+ROLES = ["listener", "monitor", "preauth", "session"]
+BREAKDOWN_METRICS = ["cycles", "instructions"]
+
+FORK_RE = re.compile(r"PERF_RECORD_FORK\((\d+):(\d+)\):\((\d+):(\d+)\)")
+
+def breakdown_fields():
+    """Per-role CSV columns (listener_cycles, ..., session_instructions)."""
+    return [f"{role}_{metric}" for role in ROLES for metric in BREAKDOWN_METRICS]
+
+def record_command(perf_command, data_path):
+    """
+    Turns the configured 'perf stat -e <events>' into 'perf record -s', which keeps
+    exact per-thread counts of the same events. The sampling period is set so high
+    that (almost) no samples are taken: only the counts are used.
+    """
+    events = perf_command[perf_command.index("-e") + 1]
+    return ["perf", "record", "-s", "-q", "-c", "1000000000", "-e", events, "-o", data_path]
+
+def per_thread_counts(data_path):
+    """
+    Reads the per-thread counts of a 'perf record -s' file ('perf report -T').
+
+    Returns:
+        dict: tid -> {"pid": pid, <event>: count, ...}
+    """
+    result = subprocess.run(["perf", "report", "-T", "--stdio", "-i", data_path],
+                            capture_output=True, text=True)
+    counts, header = {}, None
+    for line in result.stdout.splitlines():
+        tokens = line.lstrip("#").split()
+        if line.startswith("#") and tokens[:2] == ["PID", "TID"]:
+            header = [token.split(":")[0] for token in tokens]
+            continue
+        if header and len(tokens) == len(header) and all(t.isdigit() for t in tokens):
+            row = dict(zip(header, map(int, tokens)))
+            counts[row["TID"]] = {"pid": row["PID"], **{e: v for e, v in row.items() if e not in ("PID", "TID")}}
+    return counts
+
+def fork_tree(data_path):
+    """
+    Reads fork events from the recording ('perf script --show-task-events').
+
+    Returns:
+        dict: child pid -> parent pid, in fork order (thread creations are skipped).
+    """
+    result = subprocess.run(["perf", "script", "--show-task-events", "-i", data_path],
+                            capture_output=True, text=True)
+    parents = {}
+    for match in FORK_RE.finditer(result.stdout):
+        child_pid, child_tid, parent_pid, _ = map(int, match.groups())
+        if child_pid == child_tid and child_pid != parent_pid:
+            parents.setdefault(child_pid, parent_pid)
+    return parents
+
+def classify_roles(listener_pid, parents):
+    """Maps every process below (and including) the listener to one of ROLES."""
+    roles = {listener_pid: "listener"}
+    first_child = {}
+    for pid, parent in parents.items():  # fork order, so parents are classified first
+        parent_role = roles.get(parent)
+        if parent_role is None:
+            continue
+        if parent_role == "listener":
+            roles[pid] = "monitor"
+        elif parent_role == "monitor":
+            # The monitor forks the unprivileged pre-auth child first and the session child after authentication
+            roles[pid] = "preauth" if first_child.setdefault(parent, pid) == pid else "session"
+        else:
+            roles[pid] = parent_role  # shells and commands count towards the process that spawned them
+    return roles
+
+def breakdown(data_path, listener_pid):
+    """
+    Attributes the recorded counts to the server roles.
+
+    Returns:
+        dict: the per-role columns plus totals of every recorded event.
+    """
+    roles = classify_roles(listener_pid, fork_tree(data_path))
+    result = dict.fromkeys(breakdown_fields(), 0)
+    totals = {}
+    for thread in per_thread_counts(data_path).values():
+        role = roles.get(thread["pid"])
+        for event, value in thread.items():
+            if event == "pid":
+                continue
+            totals[event] = totals.get(event, 0) + value
+            if role and event in BREAKDOWN_METRICS:
+                result[f"{role}_{event}"] += value
+    result.update(totals)
+    return result
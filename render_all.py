@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bokeh.io import reset_output
+import config
+from graph import create_plot
+from dual_axis_graph import create_dual_axis_plot
+from distribution_graph import create_distribution_plot, METRIC_LABELS
+from results_files import find_result_files, find_test_pairs
+
+MANIFEST_NAME = ".render_manifest.json"
+
+# Plot kind -> (function, output filename suffix)
+PLOT_KINDS = {
+    "single": (create_plot, "cycles"),
+    "dual": (create_dual_axis_plot, "dual-axis"),
+}
+
+def input_signature(paths):
+    """Returns a {path: [size, mtime_ns]} fingerprint of the plot inputs."""
+    signature = {}
+    for path in paths:
+        st = os.stat(path)
+        signature[path] = [st.st_size, st.st_mtime_ns]
+    return signature
+
+def load_manifest(output_dir):
+    """Loads the signatures recorded by the previous render, if any."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    """Writes the manifest atomically so an interrupted render never corrupts it."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def export_static(p, output_html):
+    """
+    Writes SVG and PNG copies next to the HTML file. Both require selenium and a
+    browser driver; when they are missing the export is skipped with a note.
+    """
+    base, _ = os.path.splitext(output_html)
+    notes = []
+    try:
+        from bokeh.io import export_png, export_svg
+        export_png(p, filename=f"{base}.png")
+        p.output_backend = "svg"
+        export_svg(p, filename=f"{base}.svg")
+    except Exception as e:
+        notes.append(f"static export skipped ({e.__class__.__name__}: {e})")
+    return notes
+
+def render_job(kind, server_csv, client_csv, output_html, static):
+    """Renders one plot without opening a browser. Runs inside a worker process."""
+    plot_function, _ = PLOT_KINDS[kind]
+    p = plot_function(server_csv, client_csv, output_html, show_plot=False)
+    notes = []
+    if p is not None and static:
+        notes = export_static(p, output_html)
+    reset_output()
+    return output_html, p is not None, notes
+
+def render_distribution_job(results_dir, role, metric, output_html):
+    """Renders the sweep-wide distribution views of one role/metric. Runs inside a worker process."""
+    layout = create_distribution_plot(results_dir, output_html, role, metric, show_plot=False)
+    reset_output()
+    return output_html, layout is not None, []
+
+def plan_distribution_jobs(results_dir, output_dir, manifest, force):
+    """One distribution page per role and metric, re-rendered when any input CSV changed."""
+    signature = input_signature([info["path"] for info in find_result_files(results_dir)])
+    jobs, skipped = [], 0
+    for role in ["client", "server"]:
+        for metric in sorted(METRIC_LABELS):
+            output_html = os.path.join(output_dir, f"distribution-{role}-{metric}.html")
+            recorded = manifest.get(output_html)
+            if not force and os.path.exists(output_html) and recorded and recorded.get("inputs") == signature:
+                skipped += 1
+                continue
+            jobs.append((results_dir, role, metric, output_html, signature))
+    return jobs, skipped
+
+def plan_jobs(results_dir, output_dir, kinds, static, manifest, force):
+    """Builds the list of plots to render, skipping those whose inputs are unchanged."""
+    jobs, skipped = [], 0
+    for test_name, pair in find_test_pairs(results_dir).items():
+        if not pair["client"] or not pair["server"]:
+            print(f"[INFO] Skipping {test_name}: missing {'client' if not pair['client'] else 'server'} results.")
+            continue
+        signature = input_signature([pair["server"], pair["client"]])
+        for kind in kinds:
+            output_html = os.path.join(output_dir, f"{test_name}-{PLOT_KINDS[kind][1]}.html")
+            recorded = manifest.get(output_html)
+            if (not force and os.path.exists(output_html) and recorded
+                    and recorded.get("inputs") == signature and (recorded.get("static") or not static)):
+                skipped += 1
+                continue
+            jobs.append((kind, pair["server"], pair["client"], output_html, static, signature))
+    return jobs, skipped
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every plot of a results sweep to HTML without opening a browser.")
+    parser.add_argument("results_dir", nargs="?", default=config.RESULTS_DIR, help=f"Results directory to scan (default: {config.RESULTS_DIR}).")
+    parser.add_argument("-o", "--output-dir", default="plots", help="Directory for the rendered files (default: plots).")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Number of worker processes (default: all CPUs).")
+    parser.add_argument("--kind", choices=sorted(PLOT_KINDS), action="append", help="Plot kind to render (repeatable; default: all).")
+    parser.add_argument("--static", action="store_true", help="Also export SVG/PNG (requires selenium and a browser driver).")
+    parser.add_argument("--distributions", action="store_true", help="Also render the sweep-wide distribution views (distribution_graph.py).")
+    parser.add_argument("--force", action="store_true", help="Render even if the input CSVs have not changed.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = load_manifest(args.output_dir)
+    jobs, skipped = plan_jobs(args.results_dir, args.output_dir, args.kind or sorted(PLOT_KINDS), args.static, manifest, args.force)
+    distribution_jobs = []
+    if args.distributions:
+        distribution_jobs, distribution_skipped = plan_distribution_jobs(args.results_dir, args.output_dir, manifest, args.force)
+        skipped += distribution_skipped
+    print(f"[INFO] {len(jobs) + len(distribution_jobs)} plot(s) to render, {skipped} unchanged.")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {pool.submit(render_job, *job[:5]): job for job in jobs}
+        for job in distribution_jobs:
+            results_dir, role, metric, output_html, signature = job
+            futures[pool.submit(render_distribution_job, results_dir, role, metric, output_html)] = (
+                f"distribution-{role}-{metric}", None, None, output_html, False, signature
+            )
+        for future in as_completed(futures):
+            kind, _, _, output_html, static, signature = futures[future]
+            try:
+                _, ok, notes = future.result()
+            except Exception as e:
+                ok, notes = False, [f"{e.__class__.__name__}: {e}"]
+            for note in notes:
+                print(f"[WARN] {os.path.basename(output_html)}: {note}")
+            if ok:
+                manifest[output_html] = {"kind": kind, "inputs": signature, "static": static and not notes}
+            else:
+                failed += 1
+                print(f"[ERROR] Failed to render {output_html}")
+
+    save_manifest(args.output_dir, manifest)
+    print(f"[INFO] Done. Rendered {len(futures) - failed}, skipped {skipped}, failed {failed}.")
+
+if __name__ == "__main__":
+    main()
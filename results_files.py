@@ -0,0 +1,100 @@
+import csv
+import os
+import re
+import sys
+import glob
+
+# <hostname>-<YYYYMM or YYYYMMDD>-<role>-<TEST_NAME>[-sshd_config_*].csv
+# Auxiliary outputs use a dotted suffix (e.g. ".syscalls.csv") so they never match.
+RESULT_FILE_RE = re.compile(
+    r"^(?P<host>.+?)-(?P<stamp>\d{8}|\d{6})-(?P<role>client|server)-"
+    r"(?P<test>Test-[^.]+?)(?:-(?P<server_config>sshd_config_[^.]+))?\.csv$"
+)
+
+def test_label(cfg):
+    """
+    TEST_NAME plus the suffixes of the run variants enabled in the config, as used
+    in result filenames (e.g. Test-P-Ml-dsa-44-netem-metro, Test-P-Ml-dsa-44-bulk).
+    Client and server derive it the same way so both sides of a variant pair up.
+    """
+    label = cfg.TEST_NAME
+    if cfg.NETEM_PROFILE:
+        label += f"-netem-{cfg.NETEM_PROFILE}"
+    if cfg.BULK_TRANSFER:
+        label += "-bulk"
+    return label
+
+def sibling_filename(output_file, suffix):
+    """
+    Auxiliary output next to a result CSV: the same name with a dotted suffix
+    (e.g. '.hdr.json'), which RESULT_FILE_RE never matches.
+    """
+    return output_file[:-len(".csv")] + suffix
+
+def write_atomically(path, text):
+    """
+    Replaces `path` with `text` through a temporary file and a rename, so readers
+    and an interrupted run only ever see the previous or the complete file.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w") as f:
+            f.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+def check_csv_header(path, fields):
+    """Refuses to append rows to an existing CSV whose columns differ from the current ones."""
+    with open(path, newline='') as f:
+        header = next(csv.reader(f), [])
+    if header and header != fields:
+        print(f"Error: {path} has columns {header}, expected {fields}. "
+              "Use a different RESULTS_DIR or TEST_NAME when enabling collectors.", file=sys.stderr)
+        sys.exit(1)
+
+def parse_result_filename(path):
+    """
+    Parses a result CSV filename as written by client_perf.py / server_perf.py.
+
+    Returns:
+        dict: host, stamp, role, test and server_config (or None), or None if the
+              name does not follow the harness convention.
+    """
+    match = RESULT_FILE_RE.match(os.path.basename(path))
+    return match.groupdict() if match else None
+
+def find_result_files(base_dir):
+    """Lists every harness result CSV below base_dir with its parsed name fields."""
+    results = []
+    for path in sorted(glob.glob(os.path.join(base_dir, "**", "*.csv"), recursive=True)):
+        info = parse_result_filename(path)
+        if info:
+            info["path"] = path
+            results.append(info)
+    return results
+
+def find_test_pairs(base_dir):
+    """
+    Groups the result files below base_dir by test name.
+
+    When several files exist for the same test and role (e.g. runs on different
+    days), the most recent one by date stamp is used.
+
+    Returns:
+        dict: TEST_NAME -> {"client": path or None, "server": path or None}
+    """
+    pairs = {}
+    for info in find_result_files(base_dir):
+        entry = pairs.setdefault(info["test"], {"client": None, "server": None, "_stamp": {}})
+        previous = entry["_stamp"].get(info["role"])
+        if previous is not None:
+            print(f"[INFO] Multiple {info['role']} files for {info['test']}; using the most recent.")
+        if previous is None or info["stamp"] >= previous:
+            entry[info["role"]] = info["path"]
+            entry["_stamp"][info["role"]] = info["stamp"]
+    for entry in pairs.values():
+        del entry["_stamp"]
+    return dict(sorted(pairs.items()))
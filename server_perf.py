@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 
+import argparse
 import subprocess
 import csv
 import sys
@@ -8,8 +9,30 @@ import datetime
 import socket
 import time
 import signal
+import tempfile
 import psutil
 import config
+from builds import build_for_slot, configured_builds
+from cgroup_stats import CGROUP_FIELDS, IterationCgroup
+from energy import ENERGY_FIELDS, EnergyMeter, detect_backend
+from env_fingerprint import fingerprint_run
+from hdr_histogram import HdrRecorder
+from metrics_exporter import start_exporter
+from process_breakdown import breakdown, breakdown_fields, record_command
+from results_files import check_csv_header, test_label
+from server_phases import PhaseWatcher, interval_perf_command, parse_perf_intervals, phase_fields, split_phases
+from syscall_profile import SYSCALL_FIELDS, SyscallProfile, SyscallTrace
+
+CSV_FIELDS = [
+    "timestamp", "cycles", "instructions", "cache-misses", "branch-misses",
+    "page-faults", "context-switches", "cpu-migrations"
+]
+HDR_METRICS = ["cycles", "instructions"]
+RESTART_PAUSE_S = 0.3   # between iterations of a loop, as the shell loop did
+MAX_SERVER_RESTARTS = 3 # consecutive unexpected sshd exits on one iteration before a loop gives up
+
+# Outcomes of serve_iteration
+SERVED, INTERRUPTED, SERVER_DIED = "served", "interrupted", "server died"
 
 def debug(msg):
     """Prints a debug message if DEBUG_MODE is True."""
@@ -45,7 +68,9 @@ def generate_output_filename():
     config_path = get_config_from_args(config.SERVER_ARGS)
     config_filename = os.path.basename(config_path) if config_path else "generic"
     hostname = socket.gethostname()
-    return os.path.join(config.RESULTS_DIR, f"{hostname}-{timestamp}-server-{config.TEST_NAME}-{config_filename}.csv")
+    # Same test label as the client, so both sides of a netem/bulk run pair up
+    test_name = test_label(config)
+    return os.path.join(config.RESULTS_DIR, f"{hostname}-{timestamp}-server-{test_name}-{config_filename}.csv")
 
 def parse_perf_output(output):
     """Parses the stderr output from 'perf stat' to extract metrics."""
@@ -65,42 +90,156 @@ def parse_perf_output(output):
                     metrics[key] = 0
     return metrics
 
-def write_results(metrics, output_file):
-    file_exists = os.path.isfile(output_file)
-    with open(output_file, "a", newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow([
-                "timestamp", "cycles", "instructions", "cache-misses", "branch-misses",
-                "page-faults", "context-switches", "cpu-migrations"
-            ])
-        writer.writerow([
-            datetime.datetime.now().isoformat(), metrics["cycles"], metrics["instructions"], metrics["cache-misses"],
-            metrics["branch-misses"], metrics["page-faults"], metrics["context-switches"], metrics["cpu-migrations"]
-        ])
-    print(f"Server results appended to: {output_file}")
-
-def run_server_benchmark():
+def csv_fields():
+    """Returns the server CSV columns: the perf metrics plus the optional run labels."""
+    fields = list(CSV_FIELDS)
+    if config.BUILDS:
+        fields.append("build")
+    if config.NETEM_PROFILE:
+        fields.append("netem_profile")
+    if config.BULK_TRANSFER:
+        fields.append("transfer_id")
+    if config.SERVER_PHASE_SPLIT:
+        fields += phase_fields(CSV_FIELDS[1:])
+    if config.SERVER_PROCESS_BREAKDOWN:
+        fields += breakdown_fields()
+    if config.CGROUP_ACCOUNTING:
+        fields += CGROUP_FIELDS
+    if config.ENERGY_BACKEND:
+        fields += ENERGY_FIELDS
+    if config.SYSCALL_PROFILE:
+        fields += SYSCALL_FIELDS
+    return fields
+
+def open_run():
+    """
+    Setup shared by every iteration of a server run: port check, results file,
+    exporter, fingerprints and run-wide collectors. A loop of iterations pays it
+    once instead of once per interpreter start.
+
+    Returns:
+        dict: the run state passed to `serve_iteration` and `close_run`.
+    """
+    if config.SERVER_PHASE_SPLIT and config.SERVER_PROCESS_BREAKDOWN:
+        print("Error: SERVER_PHASE_SPLIT and SERVER_PROCESS_BREAKDOWN cannot be enabled together.", file=sys.stderr)
+        sys.exit(1)
     if is_port_in_use(config.PORT_TO_CHECK):
         print(f"Error: Port {config.PORT_TO_CHECK} is already in use.", file=sys.stderr)
         sys.exit(1)
 
     setup_results_dir()
+    output_file = generate_output_filename()
+    builds = configured_builds(config)
+    if config.ENV_FINGERPRINT:
+        # Cached in '<result file>.env.json': only the first run after a reboot or rebuild captures it
+        for build, _, server_binary in builds:
+            fingerprint = fingerprint_run(output_file, "server", server_binary, config.PERF_COMMAND, build)
+            debug(f"Environment fingerprint {fingerprint['fingerprint_id']}: {fingerprint['cpu_model']}, "
+                  f"{fingerprint['measured_mhz']} MHz, {fingerprint['openssh_version']}")
+
+    fields = csv_fields()
+    file_exists = os.path.isfile(output_file)
+    if file_exists:
+        check_csv_header(output_file, fields)
+    # One handle for the whole run, flushed every SERVER_FLUSH_EVERY rows (live_dashboard.py tails it) and on close
+    results = open(output_file, "a", newline='')
+    writer = csv.DictWriter(results, fieldnames=fields, extrasaction="ignore")
+    if not file_exists:
+        writer.writeheader()
+
+    return {
+        "output_file": output_file, "builds": builds, "exporter": start_exporter("server"),
+        "results": results, "writer": writer, "unflushed": 0, "check_port": False,
+        "recorder": HdrRecorder(output_file, HDR_METRICS, config.HDR_SIGNIFICANT_DIGITS,
+                                config.HDR_SNAPSHOT_EVERY) if config.HDR_HISTOGRAMS else None,
+        "syscall_profile": SyscallProfile(output_file) if config.SYSCALL_PROFILE else None,
+    }
+
+def close_run(run):
+    """Flushes the rows, the HDR snapshot and the syscall profile still pending."""
+    run["results"].close()
+    if run["recorder"]:
+        run["recorder"].save()
+    if run["syscall_profile"]:
+        run["syscall_profile"].save()
+
+def write_results(run, metrics, build=None):
+    row = dict(metrics, timestamp=datetime.datetime.now().isoformat(), netem_profile=config.NETEM_PROFILE, build=build)
+    run["writer"].writerow(row)
+    run["unflushed"] += 1
+    if run["unflushed"] >= config.SERVER_FLUSH_EVERY:
+        run["results"].flush()
+        run["unflushed"] = 0
+    if run["recorder"]:
+        run["recorder"].record(row)
+    print(f"Server results appended to: {run['output_file']}")
+
+def serve_iteration(run, iteration):
+    """
+    One measured iteration: a fresh sshd under perf, stopped once the client
+    signals the end of its connection.
+
+    Returns:
+        str: SERVED once a row is written; INTERRUPTED on CTRL+C, so a loop stops;
+        SERVER_DIED when sshd exited before the client signalled. No row is written
+        then: the client's connection failed too and it repeats its slot (the slot
+        only advances on exit 0), so the loop must serve the same iteration again
+        to stay on the same build.
+    """
+    if run["check_port"] and is_port_in_use(config.PORT_TO_CHECK):
+        print(f"Error: Port {config.PORT_TO_CHECK} is still in use after the previous iteration.", file=sys.stderr)
+        sys.exit(1)
+    exporter = run["exporter"]
 
     if os.path.exists(config.SIGNAL_FILE):
         os.remove(config.SIGNAL_FILE)
 
-    server_command = [config.SERVER_BINARY] + config.SERVER_ARGS
-    full_command = config.PERF_COMMAND + ["--"] + server_command
+    # With BUILDS, the loop iteration selects the build of this run (see builds.build_for_slot)
+    build, _, server_binary = build_for_slot(run["builds"], iteration)
+    server_command = [server_binary] + config.SERVER_ARGS
+    perf_command = config.PERF_COMMAND
+    intervals_file = perf_data = None
+    if config.SERVER_PHASE_SPLIT:
+        # Interval counts are split at the listen/accept boundaries after the run
+        fd, intervals_file = tempfile.mkstemp(prefix="pqc-server-", suffix=".intervals")
+        os.close(fd)
+        perf_command = interval_perf_command(config.PERF_COMMAND, config.SERVER_PHASE_INTERVAL_MS, intervals_file)
+    elif config.SERVER_PROCESS_BREAKDOWN:
+        # Per-thread counts are attributed to listener/monitor/preauth/session after the run
+        fd, perf_data = tempfile.mkstemp(prefix="pqc-server-", suffix=".data")
+        os.close(fd)
+        perf_command = record_command(config.PERF_COMMAND, perf_data)
+    full_command = perf_command + ["--"] + server_command
 
-    output_file = generate_output_filename()
+    trace = None
+    if run["syscall_profile"]:
+        # perf trace wraps perf and the whole sshd tree; the perf threads are left out of the summary
+        trace = SyscallTrace(run["syscall_profile"])
+        full_command = trace.wrap(full_command)
 
     try:
-        print(f"Starting server binary '{config.SERVER_BINARY}' with perf...")
+        print(f"Starting server binary '{server_binary}' with perf...")
         debug(f"Running command: {' '.join(full_command)}")
 
-        server_process = subprocess.Popen(full_command, stderr=subprocess.PIPE, text=True)
-        debug(f"'perf {os.path.basename(config.SERVER_BINARY)}' server started with PID: {server_process.pid}")
+        cgroup = None
+        if config.CGROUP_ACCOUNTING:
+            # perf and the whole sshd tree run in a transient cgroup read after the iteration
+            cgroup = IterationCgroup(config.CGROUP_PARENT, f"server-{os.getpid()}-{iteration}")
+            cgroup.create()
+        energy = None
+        if config.ENERGY_BACKEND:
+            # Covers the whole server run, idle wait for the client included (see energy_window_us)
+            energy = EnergyMeter(detect_backend(config.ENERGY_BACKEND))
+            energy.start()
+        started_at = time.monotonic()
+        server_process = subprocess.Popen(full_command, stderr=subprocess.PIPE, text=True,
+                                          preexec_fn=cgroup.preexec_fn if cgroup else None)
+        debug(f"'perf {os.path.basename(server_binary)}' server started with PID: {server_process.pid}")
+        watcher = None
+        if config.SERVER_PHASE_SPLIT:
+            watcher = PhaseWatcher(server_process.pid, os.path.basename(server_binary), started_at,
+                                   poll_s=config.SERVER_PHASE_INTERVAL_MS / 2000)
+            watcher.start()
 
         master_sshd_process = None
         try:
@@ -109,7 +248,7 @@ def run_server_benchmark():
             for _ in range(10):
                 children = perf_process.children(recursive=True)
                 for p in children:
-                    if p.name() == os.path.basename(config.SERVER_BINARY):
+                    if p.name() == os.path.basename(server_binary):
                         master_sshd_process = p
                         break
                 if master_sshd_process:
@@ -124,13 +263,22 @@ def run_server_benchmark():
             server_process.kill()
             sys.exit(1)
 
+        server_died = False
         while not os.path.exists(config.SIGNAL_FILE):
             time.sleep(1)
             if server_process.poll() is not None:
                 print("Error: The server process terminated unexpectedly.", file=sys.stderr)
+                if exporter:
+                    exporter.record_failure()
+                server_died = True
                 break
-
-        print("\n[INFO] Signal received to stop the server.")
+        else:
+            print("\n[INFO] Signal received to stop the server.")
+        transfer_id = None
+        if config.BULK_TRANSFER and os.path.exists(config.SIGNAL_FILE):
+            # bulk_transfer.py writes the id of the transfer into the signal file
+            with open(config.SIGNAL_FILE) as f:
+                transfer_id = f.read().strip() or None
 
         try:
             all_children = master_sshd_process.children(recursive=True)
@@ -151,23 +299,114 @@ def run_server_benchmark():
             _, stderr_output = server_process.communicate(timeout=2)
         except subprocess.TimeoutExpired:
             print("Timeout waiting for the server to terminate. Forcefully killing.", file=sys.stderr)
+            # Only perf is killed: an sshd left behind would hold the port of the next iteration
+            run["check_port"] = True
+            if exporter:
+                exporter.record_timeout()
             server_process.kill()
             _, stderr_output = server_process.communicate()
 
         debug(f"Final perf stderr output:\n{stderr_output}")
 
-        metrics = parse_perf_output(stderr_output or "")
-        write_results(metrics, output_file)
+        if server_died:
+            if watcher:
+                watcher.stop()
+            if cgroup:
+                cgroup.release()
+            if energy:
+                energy.stop()
+            return SERVER_DIED
+
+        if watcher:
+            watcher.stop()
+            debug(f"Phase boundaries: listen at {watcher.listen_at} s, accept at {watcher.accept_at} s")
+            with open(intervals_file) as f:
+                intervals = f.read()
+            metrics = split_phases(parse_perf_intervals(intervals), CSV_FIELDS[1:],
+                                   config.SERVER_PHASE_INTERVAL_MS / 1000, watcher.listen_at, watcher.accept_at)
+        elif config.SERVER_PROCESS_BREAKDOWN:
+            metrics = dict.fromkeys(CSV_FIELDS[1:], 0)
+            metrics.update(breakdown(perf_data, master_sshd_process.pid))
+        else:
+            metrics = parse_perf_output(stderr_output or "")
+        if cgroup:
+            cgroup.release()
+            metrics.update(cgroup.stats)
+        if energy:
+            energy.stop()
+            metrics.update(energy.stats)
+        if trace:
+            trace.collect()
+            metrics.update(trace.stats)
+        if config.BULK_TRANSFER:
+            metrics["transfer_id"] = transfer_id
+        write_results(run, metrics, build)
+        if exporter:
+            exporter.observe(metrics)
 
     except KeyboardInterrupt:
         print("\n[INFO] CTRL+C detected! Shutting down the server safely...")
         if 'server_process' in locals() and server_process.poll() is None:
             server_process.send_signal(signal.SIGINT)
             server_process.wait()
+        return INTERRUPTED
     finally:
+        # Also on CTRL+C, a failed discovery or a failed breakdown: perf record data is large
+        for temporary in (intervals_file, perf_data, trace and trace.trace_path):
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
         if os.path.exists(config.SIGNAL_FILE):
             os.remove(config.SIGNAL_FILE)
         print("Server has shut down.")
+    return SERVED
+
+def run_server_benchmark(iteration=0):
+    """A single measured iteration in this process (interleaved_run.py workers, overhead_bench.py)."""
+    run = open_run()
+    try:
+        return serve_iteration(run, iteration)
+    finally:
+        close_run(run)
+
+def run_server_loop(iterations, first=0):
+    """
+    Every iteration in one process, restarting sshd for each: the setup of
+    `open_run` and the interpreter start are paid once, not once per iteration.
+    An iteration whose sshd exits unexpectedly is served again, up to
+    MAX_SERVER_RESTARTS times in a row. Stops at the first failing iteration
+    (sys.exit) or on CTRL+C.
+    """
+    run = open_run()
+    try:
+        iteration, restarts = first, 0
+        while iteration < first + iterations:
+            print(f"--- Starting server iteration {iteration + 1} ---")
+            status = serve_iteration(run, iteration)
+            if status == INTERRUPTED:
+                break
+            if status == SERVER_DIED:
+                restarts += 1
+                if restarts > MAX_SERVER_RESTARTS:
+                    print(f"Error: The server exited unexpectedly {restarts} times on iteration {iteration + 1}. Stopping.", file=sys.stderr)
+                    sys.exit(1)
+                print(f"[WARN] Serving iteration {iteration + 1} again ({restarts}/{MAX_SERVER_RESTARTS}).")
+            else:
+                iteration, restarts = iteration + 1, 0
+            print(f"--- Server iteration finished. Restarting in {RESTART_PAUSE_S} seconds... ---")
+            time.sleep(RESTART_PAUSE_S)
+    except KeyboardInterrupt:
+        print("\n[INFO] CTRL+C detected! Stopping the server loop.")
+    finally:
+        close_run(run)
+    print("Server loop finished.")
 
 if __name__ == "__main__":
-    run_server_benchmark()
+    parser = argparse.ArgumentParser(description="Run measured server iterations.")
+    parser.add_argument("--iteration", type=int, default=0, help="Loop iteration (selects the build when BUILDS is set).")
+    parser.add_argument("--loop", action="store_true",
+                        help="Run all ITERATIONS iterations (from --iteration on) in this process.")
+    args = parser.parse_args()
+    if args.loop:
+        run_server_loop(config.ITERATIONS - args.iteration, args.iteration)
+    else:
+        run_server_benchmark(args.iteration)
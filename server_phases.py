@@ -0,0 +1,109 @@
+import sys
+import threading
+import time
+import psutil
+
+# Server lifetime phases: exec -> listening socket, and first accepted connection -> session exit.
+# The time between listen and accept is the server idling until the client connects.
+PHASES = ["startup", "connection"]
+
+def phase_fields(metrics):
+    """Per-phase CSV columns (startup_cycles, ..., connection_cpu-migrations) plus the startup duration."""
+    return [f"{phase}_{metric}" for phase in PHASES for metric in metrics] + ["startup_us"]
+
+def interval_perf_command(perf_command, interval_ms, output_file):
+    """
+    Turns 'perf stat ...' into interval mode with CSV output written to a file
+    ('perf stat -I <ms> -x , -o <file> ...'). On a pipe, the intervals of a server
+    idling until the client connects would fill it and block perf.
+    """
+    return perf_command[:2] + ["-I", str(interval_ms), "-x", ",", "-o", output_file] + perf_command[2:]
+
+def parse_perf_intervals(output):
+    """
+    Parses 'perf stat -I -x,' output.
+
+    Returns:
+        list: (end of interval in seconds since perf start, event, count) tuples.
+    """
+    samples = []
+    for line in output.splitlines():
+        fields = line.strip().split(",")
+        if len(fields) < 4:
+            continue
+        try:
+            timestamp, value = float(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # "<not counted>" / "<not supported>" or a non-CSV line
+        samples.append((timestamp, fields[3].split(":")[0], value))
+    return samples
+
+def split_phases(samples, metrics, interval_s, listen_at, accept_at):
+    """
+    Sums interval counts into totals and per-phase counters. Each interval is
+    assigned by its midpoint: before listen_at -> startup, after accept_at ->
+    connection. The boundaries are therefore exact to half an interval.
+
+    Returns:
+        dict: the totals under the plain metric names and the phase columns
+              (None for a phase whose boundary was not observed).
+    """
+    observed = {"startup": listen_at is not None, "connection": accept_at is not None}
+    result = dict.fromkeys(metrics, 0)
+    for phase in PHASES:
+        result.update({f"{phase}_{metric}": 0 if observed[phase] else None for metric in metrics})
+    for timestamp, event, value in samples:
+        if event not in metrics:
+            continue
+        result[event] += value
+        midpoint = timestamp - interval_s / 2
+        if listen_at is not None and midpoint <= listen_at:
+            result[f"startup_{event}"] += value
+        elif accept_at is not None and midpoint >= accept_at:
+            result[f"connection_{event}"] += value
+    result["startup_us"] = round(listen_at * 1e6) if listen_at is not None else None
+    return result
+
+class PhaseWatcher(threading.Thread):
+    """
+    Polls the process tree under perf to timestamp the phase boundaries, in
+    seconds since `started_at` (taken right before perf was spawned):
+    `listen_at` when the master server has a listening TCP socket and
+    `accept_at` when it forks its first connection child. Polling faster than
+    half a perf interval adds load on the measured host without making the
+    split more exact.
+    """
+
+    def __init__(self, perf_pid, server_name, started_at, poll_s=0.005):
+        super().__init__(daemon=True)
+        self.perf_pid = perf_pid
+        self.server_name = server_name
+        self.started_at = started_at
+        self.poll_s = poll_s
+        self.listen_at = None
+        self.accept_at = None
+        self.stop_event = threading.Event()
+
+    def run(self):
+        master = None
+        try:
+            perf = psutil.Process(self.perf_pid)
+            while not self.stop_event.is_set() and self.accept_at is None:
+                if master is None:
+                    master = next((p for p in perf.children(recursive=True) if p.name() == self.server_name), None)
+                elif self.listen_at is None:
+                    # Process.connections() was renamed net_connections() in psutil 6.0
+                    connections = getattr(master, "net_connections", master.connections)
+                    if any(c.status == psutil.CONN_LISTEN for c in connections(kind="tcp")):
+                        self.listen_at = time.monotonic() - self.started_at
+                elif master.children():
+                    self.accept_at = time.monotonic() - self.started_at
+                time.sleep(self.poll_s)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+        except Exception as e:
+            print(f"[WARN] Phase watcher stopped: {e}. The phase split of this iteration will be incomplete.", file=sys.stderr)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=1)
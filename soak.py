@@ -0,0 +1,276 @@
+#!/usr/bin/python3
+
+import argparse
+import csv
+import datetime
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import psutil
+import config
+from client_perf import debug, execute_perf_on_client, parse_perf_output, setup_results_dir
+from results_files import check_csv_header, test_label, write_atomically
+
+SOAK_FIELDS = {
+    "client": ["timestamp", "active_s", "cycles", "instructions", "elapsed_us"],
+    "server": ["timestamp", "active_s", "listener_pid", "listener_rss_bytes", "listener_vms_bytes",
+               "listener_cpu_ms", "listener_fds", "restarts"],
+}
+# Metrics whose windowed trend is tested for growth
+TREND_METRICS = {
+    "client": ["cycles", "instructions", "elapsed_us"],
+    "server": ["listener_rss_bytes", "listener_vms_bytes", "listener_fds"],
+}
+
+def checkpoint_filename(role):
+    """Checkpoint of the soak of this host/role/test; undated, so a resume finds it on another day."""
+    return os.path.join(config.RESULTS_DIR, f"{socket.gethostname()}-{role}-{test_label(config)}.soak-state.json")
+
+def generate_output_filename(role):
+    """Dated like the regular result files, with a '.soak.csv' suffix so it is never taken for one."""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d")
+    return os.path.join(config.RESULTS_DIR, f"{socket.gethostname()}-{timestamp}-{role}-{test_label(config)}.soak.csv")
+
+def load_checkpoint(role):
+    path = checkpoint_filename(role)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_checkpoint(role, state):
+    """Written atomically: a crash leaves the previous checkpoint intact."""
+    write_atomically(checkpoint_filename(role), json.dumps(state))
+
+def start_or_resume(role, duration_s, fresh):
+    """
+    Returns the soak state: the unfinished checkpoint of this role/test, or a new
+    one. Only active time counts towards the duration, so time the harness was
+    down is not lost.
+    """
+    state = None if fresh else load_checkpoint(role)
+    if state and not state["finished"]:
+        print(f"[INFO] Resuming soak from checkpoint: {state['active_s'] / 3600:.2f} h of {state['duration_s'] / 3600:.2f} h done.")
+        return state
+    return {"role": role, "test": test_label(config), "output_file": generate_output_filename(role),
+            "duration_s": duration_s, "active_s": 0.0, "samples": 0, "failures": 0,
+            "restarts": 0, "listener": None, "finished": False}
+
+def open_output(state):
+    fields = SOAK_FIELDS[state["role"]]
+    file_exists = os.path.isfile(state["output_file"])
+    if file_exists:
+        check_csv_header(state["output_file"], fields)
+    f = open(state["output_file"], "a", newline="")
+    writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+    if not file_exists:
+        writer.writeheader()
+    return f, writer
+
+def soak_client(state, pause_s):
+    """Back-to-back measured connections until the soak duration is used up."""
+    command = config.PERF_COMMAND + ["--", config.CLIENT_BINARY] + config.CLIENT_ARGS
+    f, writer = open_output(state)
+    resumed_at = time.monotonic() - state["active_s"]
+    with f:
+        while state["active_s"] < state["duration_s"]:
+            perf_output, _ = execute_perf_on_client(command)
+            state["active_s"] = time.monotonic() - resumed_at
+            if "Timeout" in perf_output:
+                state["failures"] += 1
+            else:
+                row = parse_perf_output(perf_output)
+                row.update(timestamp=datetime.datetime.now().isoformat(), active_s=round(state["active_s"], 3))
+                writer.writerow(row)
+                f.flush()
+                state["samples"] += 1
+            save_checkpoint("client", state)
+            time.sleep(pause_s)
+
+def adopt_listener(state):
+    """The sshd of a previous harness process, if it is still the same process (pid and start time)."""
+    listener = state["listener"]
+    if not listener:
+        return None
+    try:
+        process = psutil.Process(listener["pid"])
+        if abs(process.create_time() - listener["create_time"]) < 0.01:
+            return process
+    except psutil.NoSuchProcess:
+        pass
+    return None
+
+def start_listener(state):
+    """
+    Starts the persistent sshd in its own session, so it survives a restart of
+    the harness and can be adopted from the checkpoint.
+    """
+    command = [config.SERVER_BINARY] + config.SERVER_ARGS
+    debug(f"Running command: {' '.join(command)}")
+    # -D -e logs every connection: discarded, an unread pipe would block sshd within hours
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    time.sleep(0.5)
+    listener = psutil.Process(process.pid)
+    state["listener"] = {"pid": listener.pid, "create_time": listener.create_time()}
+    return listener
+
+def soak_server(state, sample_s):
+    """Samples the listener's memory, CPU time and descriptors while the client drives connections."""
+    listener = adopt_listener(state)
+    if listener:
+        print(f"[INFO] Adopted running sshd listener (PID {listener.pid}).")
+    else:
+        if state["listener"]:
+            state["restarts"] += 1
+            print("[WARN] The previous sshd listener is gone; starting a new one (counted in 'restarts').")
+        listener = start_listener(state)
+        print(f"[INFO] Started sshd listener (PID {listener.pid}).")
+    f, writer = open_output(state)
+    resumed_at = time.monotonic() - state["active_s"]
+    with f:
+        while state["active_s"] < state["duration_s"]:
+            try:
+                with listener.oneshot():
+                    memory, cpu = listener.memory_info(), listener.cpu_times()
+                    fds = listener.num_fds()
+            except psutil.NoSuchProcess:
+                print("Error: the sshd listener terminated during the soak.", file=sys.stderr)
+                save_checkpoint("server", state)
+                sys.exit(1)
+            state["active_s"] = time.monotonic() - resumed_at
+            writer.writerow({
+                "timestamp": datetime.datetime.now().isoformat(), "active_s": round(state["active_s"], 3),
+                "listener_pid": listener.pid, "listener_rss_bytes": memory.rss, "listener_vms_bytes": memory.vms,
+                "listener_cpu_ms": round((cpu.user + cpu.system) * 1000), "listener_fds": fds,
+                "restarts": state["restarts"],
+            })
+            f.flush()
+            state["samples"] += 1
+            save_checkpoint("server", state)
+            time.sleep(sample_s)
+    listener.terminate()
+
+def regularized_beta(a, b, x):
+    """Regularized incomplete beta function I_x(a, b) (continued fraction, as in Numerical Recipes)."""
+    if x <= 0 or x >= 1:
+        return max(0.0, min(1.0, x))
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+    if x > (a + 1) / (a + b + 2):
+        return 1 - regularized_beta(b, a, 1 - x)
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > 1e-300 else 1e-300)
+    result = d
+    for m in range(1, 200):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > 1e-300 else 1e-300)
+            c = 1 + numerator / c
+            c = c if abs(c) > 1e-300 else 1e-300
+            result *= c * d
+        if abs(c * d - 1) < 1e-12:
+            break
+    return front * result / a
+
+def linear_trend(xs, ys):
+    """
+    Ordinary least squares fit y = intercept + slope * x.
+
+    Returns:
+        dict: intercept, slope and the one-sided p-value of slope > 0 (Student t, n - 2 df).
+    """
+    n = len(xs)
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    intercept = mean_y - slope * mean_x
+    residual = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+    df = n - 2
+    if residual == 0:
+        p_value = 0.0 if slope > 0 else 1.0
+    else:
+        t = slope / math.sqrt(residual / df / sxx)
+        two_sided = regularized_beta(df / 2, 0.5, df / (df + t * t))
+        p_value = two_sided / 2 if t > 0 else 1 - two_sided / 2
+    return {"intercept": intercept, "slope": slope, "p_value": p_value}
+
+def windowed(rows, metric, window_s):
+    """Median of a metric per window of active time: list of (window center in hours, median, n)."""
+    windows = {}
+    for row in rows:
+        if row.get(metric) not in (None, ""):
+            windows.setdefault(int(float(row["active_s"]) // window_s), []).append(float(row[metric]))
+    return [((index + 0.5) * window_s / 3600, statistics.median(values), len(values))
+            for index, values in sorted(windows.items())]
+
+def analyze(output_file, role, window_min, alpha, growth_pct):
+    """
+    Prints the windowed medians and the trend of every metric of the role. The
+    fit uses one median per window rather than every sample, which removes most
+    of the autocorrelation between consecutive samples. Growth is flagged when the
+    slope is significantly positive and the fitted increase over the run exceeds
+    `growth_pct`.
+
+    Returns:
+        list: the metrics flagged as growing.
+    """
+    with open(output_file, newline="") as f:
+        rows = list(csv.DictReader(f))
+    flagged = []
+    print(f"[INFO] Soak analysis of {output_file} ({len(rows)} samples, {window_min} min windows):")
+    for metric in TREND_METRICS[role]:
+        windows = windowed(rows, metric, window_min * 60)
+        if len(windows) < 3:
+            print(f"   • {metric}: not enough windows for a trend ({len(windows)}).")
+            continue
+        hours = [w[0] for w in windows]
+        trend = linear_trend(hours, [w[1] for w in windows])
+        growth = 100 * trend["slope"] * (hours[-1] - hours[0]) / trend["intercept"] if trend["intercept"] else 0.0
+        growing = trend["p_value"] < alpha and growth > growth_pct
+        if growing:
+            flagged.append(metric)
+        print(f"   • {metric:<20} first {windows[0][1]:.0f}  last {windows[-1][1]:.0f}  "
+              f"slope {trend['slope']:+.1f}/h  growth {growth:+.2f}%  p={trend['p_value']:.2g}"
+              f"{'  GROWING' if growing else ''}")
+    return flagged
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-duration soak against one persistent sshd, with windowed trends and checkpoints.")
+    parser.add_argument("--role", choices=["client", "server"], required=True, help="Start the server side first.")
+    parser.add_argument("--hours", type=float, default=config.SOAK_DURATION_H, help="Active duration of the soak.")
+    parser.add_argument("--fresh", action="store_true", help="Ignore an unfinished checkpoint and start a new soak.")
+    parser.add_argument("--analyze", metavar="SOAK_CSV", help="Only analyze an existing '.soak.csv' of this role.")
+    args = parser.parse_args()
+
+    if args.analyze:
+        flagged = analyze(args.analyze, args.role, config.SOAK_WINDOW_MIN, config.SOAK_ALPHA, config.SOAK_GROWTH_PCT)
+        sys.exit(1 if flagged else 0)
+
+    setup_results_dir()
+    state = start_or_resume(args.role, args.hours * 3600, args.fresh)
+    print(f"[INFO] Soak of {state['test']} ({args.role}) writing to {state['output_file']}")
+    try:
+        if args.role == "client":
+            soak_client(state, config.SOAK_PAUSE_S)
+        else:
+            soak_server(state, config.SOAK_SAMPLE_S)
+    except KeyboardInterrupt:
+        # The checkpoint is current: running the same command again resumes
+        print("\n[INFO] Interrupted; run the same command again to resume the soak.")
+        sys.exit(0)
+
+    state["finished"] = True
+    save_checkpoint(args.role, state)
+    print(f"[INFO] Soak finished: {state['samples']} samples, {state['failures']} failures, {state['restarts']} listener restarts.")
+    flagged = analyze(state["output_file"], args.role, config.SOAK_WINDOW_MIN, config.SOAK_ALPHA, config.SOAK_GROWTH_PCT)
+    if flagged:
+        print(f"[WARN] Significant growth in: {', '.join(flagged)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import csv
+import os
+import re
+import tempfile
+from results_files import sibling_filename
+
+# Columns added to the client/server CSV when SYSCALL_PROFILE is enabled
+SYSCALL_FIELDS = ["syscalls", "syscall_errors", "syscall_time_us"]
+PROFILE_FIELDS = ["syscall", "calls", "errors", "total_us", "calls_per_iteration", "us_per_iteration", "iterations"]
+
+PROCESS_RE = re.compile(r"^\s*(?P<comm>\S.*?) \((?P<pid>\d+)\), (?P<events>\d+) events")
+SYSCALL_RE = re.compile(r"^\s+(?P<name>[a-z_0-9]+)\s+(?P<calls>\d+)\s+(?:(?P<errors>\d+)\s+)?(?P<total>\d+\.\d+)\s")
+
+def parse_trace_summary(text, exclude=("perf",)):
+    """
+    Parses a 'perf trace -s' summary (one block per thread) into totals per
+    syscall. Threads whose comm is in `exclude` are skipped: the perf processes
+    wrapping the measured command are traced too.
+
+    Returns:
+        dict: syscall -> {"calls", "errors", "total_us"}
+    """
+    syscalls, keep = {}, False
+    for line in text.splitlines():
+        process = PROCESS_RE.match(line)
+        if process:
+            keep = process.group("comm") not in exclude
+            continue
+        match = SYSCALL_RE.match(line)
+        if keep and match:
+            entry = syscalls.setdefault(match.group("name"), {"calls": 0, "errors": 0, "total_us": 0.0})
+            entry["calls"] += int(match.group("calls"))
+            entry["errors"] += int(match.group("errors") or 0)
+            entry["total_us"] += float(match.group("total")) * 1000
+    return syscalls
+
+class SyscallProfile:
+    """
+    Syscall totals of every iteration of a test, stored per result file. An
+    existing profile is loaded first, so runs appending to the same CSV also
+    accumulate into the same profile.
+    """
+
+    def __init__(self, output_file):
+        self.path = sibling_filename(output_file, ".syscalls.csv")
+        self.syscalls = {}
+        self.iterations = 0
+        self.pending = False
+        if os.path.isfile(self.path):
+            with open(self.path, newline="") as f:
+                for row in csv.DictReader(f):
+                    self.syscalls[row["syscall"]] = {"calls": int(row["calls"]), "errors": int(row["errors"]),
+                                                     "total_us": float(row["total_us"])}
+                    self.iterations = int(row["iterations"])
+
+    def add(self, syscalls):
+        for name, values in syscalls.items():
+            entry = self.syscalls.setdefault(name, {"calls": 0, "errors": 0, "total_us": 0.0})
+            for key, value in values.items():
+                entry[key] += value
+        self.iterations += 1
+        self.pending = True
+
+    def save(self):
+        """Writes the profile, most expensive syscalls first."""
+        if not self.pending:
+            return
+        with open(self.path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+            writer.writeheader()
+            for name, entry in sorted(self.syscalls.items(), key=lambda item: -item[1]["total_us"]):
+                writer.writerow({
+                    "syscall": name, "calls": entry["calls"], "errors": entry["errors"],
+                    "total_us": round(entry["total_us"], 3),
+                    "calls_per_iteration": round(entry["calls"] / self.iterations, 3),
+                    "us_per_iteration": round(entry["total_us"] / self.iterations, 3),
+                    "iterations": self.iterations,
+                })
+        self.pending = False
+
+class SyscallTrace:
+    """
+    Traces the syscalls of one measured command with 'perf trace -s'. The tracer
+    wraps the perf stat command (see `wrap`), so its overhead shows up in the
+    counters of the same iteration: use it in dedicated runs. The per-syscall
+    totals go to `profile` and the iteration totals to `stats`. The output file
+    only exists between `wrap` and `collect`; a caller that may stop in between
+    removes `trace_path` itself.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.stats = dict.fromkeys(SYSCALL_FIELDS, None)
+        self.trace_path = None
+
+    def wrap(self, command):
+        fd, self.trace_path = tempfile.mkstemp(prefix="pqc-trace-", suffix=".txt")
+        os.close(fd)
+        return ["perf", "trace", "-s", "-o", self.trace_path, "--"] + command
+
+    def collect(self):
+        """Reads the summary once the traced command has exited."""
+        if self.trace_path is None:
+            return
+        try:
+            with open(self.trace_path) as f:
+                syscalls = parse_trace_summary(f.read())
+        finally:
+            os.remove(self.trace_path)
+            self.trace_path = None
+        if syscalls:
+            self.profile.add(syscalls)
+            self.stats = {
+                "syscalls": sum(s["calls"] for s in syscalls.values()),
+                "syscall_errors": sum(s["errors"] for s in syscalls.values()),
+                "syscall_time_us": round(sum(s["total_us"] for s in syscalls.values())),
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.collect()
+        return False
@@ -0,0 +1,163 @@
+import os
+import select
+import signal
+import struct
+import subprocess
+import tempfile
+
+# Columns added to the client CSV when WIRE_CAPTURE is enabled
+WIRE_FIELDS = ["bytes_sent", "bytes_received", "packets_sent", "packets_received", "round_trips"]
+
+# pcap link-layer types -> offset of the network header and how to find its protocol
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = 0x8100
+
+TCP_SYN = 0x02
+
+def network_layer(linktype, packet):
+    """Returns (ip_version, offset of the IP header) for a captured frame, or (None, None)."""
+    if linktype == LINKTYPE_ETHERNET:
+        offset, ethertype = 14, struct.unpack_from("!H", packet, 12)[0]
+        if ethertype == ETHERTYPE_VLAN:
+            offset, ethertype = 18, struct.unpack_from("!H", packet, 16)[0]
+    elif linktype == LINKTYPE_LINUX_SLL:
+        offset, ethertype = 16, struct.unpack_from("!H", packet, 14)[0]
+    elif linktype == LINKTYPE_LINUX_SLL2:
+        offset, ethertype = 20, struct.unpack_from("!H", packet, 0)[0]
+    elif linktype in (LINKTYPE_NULL, LINKTYPE_RAW, 12):
+        offset = 4 if linktype == LINKTYPE_NULL else 0
+        version = packet[offset] >> 4 if len(packet) > offset else None
+        return version, offset
+    else:
+        return None, None
+    if ethertype == ETHERTYPE_IPV4:
+        return 4, offset
+    if ethertype == ETHERTYPE_IPV6:
+        return 6, offset
+    return None, None
+
+def parse_tcp_segments(linktype, packet):
+    """
+    Extracts (src_port, dst_port, payload_length, flags) from one frame. The payload
+    length comes from the IP length fields, so a short snaplen is enough.
+    """
+    version, offset = network_layer(linktype, packet)
+    if version == 4:
+        ihl = (packet[offset] & 0x0F) * 4
+        total_length, = struct.unpack_from("!H", packet, offset + 2)
+        if packet[offset + 9] != 6:
+            return None
+        tcp, ip_payload = offset + ihl, total_length - ihl
+    elif version == 6:
+        payload_length, = struct.unpack_from("!H", packet, offset + 4)
+        if packet[offset + 6] != 6:
+            return None
+        tcp, ip_payload = offset + 40, payload_length
+    else:
+        return None
+    src_port, dst_port = struct.unpack_from("!HH", packet, tcp)
+    data_offset = (packet[tcp + 12] >> 4) * 4
+    flags = packet[tcp + 13]
+    return src_port, dst_port, max(ip_payload - data_offset, 0), flags
+
+def read_pcap(path):
+    """Yields (linktype, frame bytes) for every record of a classic pcap file."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+        if len(header) < 24:
+            return
+        magic = header[:4]
+        if magic in (b"\xd4\xc3\xb2\xa1", b"\x4d\x3c\xb2\xa1"):
+            endian = "<"
+        elif magic in (b"\xa1\xb2\xc3\xd4", b"\xa1\xb2\x3c\x4d"):
+            endian = ">"
+        else:
+            raise ValueError(f"Not a pcap file: {path}")
+        linktype = struct.unpack(endian + "I", header[20:24])[0] & 0x0FFFFFFF
+        record = struct.Struct(endian + "IIII")
+        while True:
+            raw = f.read(16)
+            if len(raw) < 16:
+                return
+            _, _, incl_len, _ = record.unpack(raw)
+            yield linktype, f.read(incl_len)
+
+def summarize_capture(path, server_port):
+    """
+    Aggregates a capture of one SSH connection from the client's point of view.
+
+    Round trips are counted from the flight structure of the connection: every
+    time a client flight (SYN or payload) is answered by a server flight, one
+    round trip has elapsed. Pure ACKs are ignored.
+    """
+    stats = dict.fromkeys(WIRE_FIELDS, 0)
+    flights = []
+    for linktype, packet in read_pcap(path):
+        try:
+            segment = parse_tcp_segments(linktype, packet)
+        except (struct.error, IndexError):
+            continue
+        if segment is None:
+            continue
+        src_port, dst_port, payload, flags = segment
+        if dst_port == server_port:
+            direction = "sent"
+        elif src_port == server_port:
+            direction = "received"
+        else:
+            continue
+        stats[f"bytes_{direction}"] += payload
+        stats[f"packets_{direction}"] += 1
+        if (payload or flags & TCP_SYN) and (not flights or flights[-1] != direction):
+            flights.append(direction)
+    stats["round_trips"] = sum(1 for a, b in zip(flights, flights[1:]) if a == "sent" and b == "received")
+    return stats
+
+class WireCapture:
+    """
+    Captures the SSH connection of one iteration with tcpdump, outside the
+    process tree counted by perf, and summarizes it when the context exits.
+    tcpdump still shares the host, so enable it only in dedicated wire-size runs.
+    """
+
+    def __init__(self, interface, host, port):
+        self.interface = interface
+        self.host = host
+        self.port = port
+        self.process = None
+        self.path = None
+        self.stats = dict.fromkeys(WIRE_FIELDS, None)
+
+    def __enter__(self):
+        fd, self.path = tempfile.mkstemp(prefix="pqc-wire-", suffix=".pcap")
+        os.close(fd)
+        command = [
+            "tcpdump", "-i", self.interface, "-n", "-U", "-s", "128", "-w", self.path,
+            f"tcp and host {self.host} and port {self.port}"
+        ]
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        # tcpdump reports "listening on ..." once the capture is active
+        ready, _, _ = select.select([self.process.stderr], [], [], 5)
+        if ready:
+            self.process.stderr.readline()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.process.send_signal(signal.SIGINT)
+            self.process.wait(timeout=5)
+            self.stats = summarize_capture(self.path, self.port)
+        except (subprocess.TimeoutExpired, OSError, ValueError) as e:
+            print(f"[WARN] Wire capture failed: {e}")
+            self.process.kill()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        return False